@@ -7,13 +7,17 @@ Páginas:
 1. Sistema Preditivo - Formulário para predição de nível de obesidade
 2. Dashboard Analítico - Insights e visualizações dos dados
 3. Sobre o Projeto - Informações sobre metodologia e modelo
+
+Dependências pesadas (pandas, plotly e o próprio modelo) são importadas
+apenas pelas páginas que as usam; o modelo é carregado em segundo plano
+assim que a primeira sessão do processo é iniciada.
 """
 
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-import joblib
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 
 # Configuração da página
@@ -28,17 +32,126 @@ st.set_page_config(
 PROJECT_ROOT = Path(__file__).resolve().parent
 MODEL_PATH = PROJECT_ROOT / "modelo.joblib"
 ENCODER_PATH = PROJECT_ROOT / "label_encoder.joblib"
+DATA_PATH = PROJECT_ROOT / "data" / "Obesity.csv"
 PLOTS_DIR = PROJECT_ROOT / "plots"
 
+# Módulos auxiliares de inferência ficam em scripts/
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+# Instrumentação (só biblioteca padrão, barata de importar). As métricas são
+# servidas em formato Prometheus quando OBESIDADE_METRICAS_PORTA está definida;
+# OBESIDADE_METRICAS=0 desliga o registro.
+from instrumentacao import REGISTRO, contar, medir  # noqa: E402
+
+
+def assinatura_artefatos() -> tuple:
+    """Identifica a versão dos artefatos em disco (mtime e tamanho)."""
+    return tuple(
+        (p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None
+        for p in (MODEL_PATH, ENCODER_PATH)
+    )
+
 
-@st.cache_resource
-def carregar_modelo():
-    """Carrega o modelo e o encoder do disco."""
-    modelo = joblib.load(MODEL_PATH)
-    encoder = joblib.load(ENCODER_PATH)
+def _carregar_e_compilar(versao: tuple):
+    """Carrega e compila os artefatos, invalidando o cache de predições."""
+    from artefatos import carregar_modelo_compilado
+    from cache_predicao import CACHE_PREDICAO
+
+    with medir("app.compilar_modelo"):
+        modelo, encoder = carregar_modelo_compilado(MODEL_PATH, ENCODER_PATH)
+    CACHE_PREDICAO.vincular_modelo(versao)
     return modelo, encoder
 
 
+@st.cache_resource(max_entries=1)
+def aquecer_modelo(versao: tuple = None) -> Future:
+    """Inicia o carregamento do modelo em uma thread de segundo plano.
+
+    Chamado no início de toda sessão; só a primeira chamada de cada
+    ``versao`` dispara o carregamento, as demais reaproveitam o Future.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aquecimento-modelo")
+    futuro = executor.submit(_carregar_e_compilar, versao)
+    executor.shutdown(wait=False)
+    return futuro
+
+
+def carregar_modelo(versao: tuple = None):
+    """Retorna o modelo e o encoder, aguardando o aquecimento se necessário.
+
+    O pré-processador e o RandomForest são compilados (tabelas de consulta e
+    arrays contíguos) para reduzir a latência da predição de um único paciente.
+    Uma nova ``versao`` recarrega os artefatos e invalida o cache de predições.
+    """
+    try:
+        with medir("app.carregar_modelo"):
+            return aquecer_modelo(versao).result()
+    except Exception:
+        # Não mantém em cache um carregamento que falhou
+        aquecer_modelo.clear()
+        raise
+
+
+@st.cache_resource(max_entries=1)
+def carregar_agregados(assinatura: tuple) -> dict:
+    """Agregados do dashboard para a versão do dataset em disco.
+
+    O armazenamento em disco é indexado pelo hash do conteúdo do CSV; a
+    ``assinatura`` (mtime e tamanho) só evita recalcular o hash a cada rerun.
+    """
+    from agregados_dashboard import obter_agregados
+
+    with medir("dashboard.agregados"):
+        return obter_agregados(DATA_PATH)
+
+
+@st.cache_resource(max_entries=1)
+def carregar_monitor_drift(assinatura: tuple):
+    """Monitor de drift do processo, com a base do dataset em disco.
+
+    Compartilhado entre sessões; a ``assinatura`` (mtime e tamanho do CSV)
+    recalcula a base quando o dataset muda. Retorna None sem dataset.
+    """
+    if not DATA_PATH.exists():
+        return None
+    from monitor_drift import criar_monitor
+
+    with medir("drift.base"):
+        return criar_monitor(DATA_PATH)
+
+
+@st.cache_resource(max_entries=1)
+def iniciar_auditoria():
+    """Gravador da trilha de auditoria, um por processo (None se desligado)."""
+    from auditoria import AUDITORIA_DIR, INTERVALO_FLUSH, RegistroAuditoria, auditoria_ativa
+
+    if not auditoria_ativa():
+        return None
+    return RegistroAuditoria(
+        Path(os.environ.get("OBESIDADE_AUDITORIA_DIR", AUDITORIA_DIR)),
+        intervalo=float(os.environ.get("OBESIDADE_AUDITORIA_INTERVALO", INTERVALO_FLUSH)),
+    )
+
+
+@st.cache_resource(max_entries=1)
+def versao_modelo(versao: tuple) -> str:
+    """Identificação do modelo gravada na auditoria (hash dos artefatos)."""
+    from auditoria import identificar_modelo
+
+    return identificar_modelo(MODEL_PATH, ENCODER_PATH)
+
+
+@st.cache_resource(max_entries=1)
+def iniciar_exportador_metricas():
+    """Serve ``/metrics`` (Prometheus) uma vez por processo, se configurado."""
+    porta = os.environ.get("OBESIDADE_METRICAS_PORTA")
+    if not porta or not REGISTRO.ativo:
+        return None
+    from instrumentacao import servir_metricas
+
+    return servir_metricas(int(porta), os.environ.get("OBESIDADE_METRICAS_HOST", "127.0.0.1"))
+
+
 # Descrições amigáveis para os níveis de obesidade
 DESCRICOES_OBESIDADE = {
     "Insufficient_Weight": {
@@ -103,11 +216,101 @@ LABELS_PT = {
     "TUE": "Tempo usando dispositivos eletrônicos (0-2)",
     "CALC": "Consumo de álcool",
     "MTRANS": "Meio de transporte principal",
+    "BMI": "IMC",
 }
 
+# Variáveis exibidas no gráfico de fatores do diagnóstico
+QUANTIDADE_FATORES = 8
+
+
+@st.cache_resource(max_entries=1)
+def carregar_atribuidor(versao: tuple = None):
+    """Tabelas de atribuição por folha da floresta carregada (uma por versão)."""
+    from atribuicao_floresta import AtribuidorFloresta
+
+    modelo, _ = carregar_modelo(versao)
+    with medir("app.compilar_atribuidor"):
+        return AtribuidorFloresta.de_modelo(modelo)
+
+
+def exibir_atribuicoes(dados: dict, versao: tuple):
+    """Mostra quanto cada variável empurrou a probabilidade da classe prevista."""
+    import plotly.graph_objects as go
+
+    atribuidor = carregar_atribuidor(versao)
+    with medir("predicao.atribuicao"):
+        probas, contribuicoes = atribuidor.contribuicoes(dados)
+    classe = int(probas[0].argmax())
+    valores = contribuicoes[0, classe]
+    ordem = sorted(range(len(valores)), key=lambda i: abs(valores[i]))[-QUANTIDADE_FATORES:]
+
+    st.markdown("### Fatores que mais influenciaram")
+    fig = go.Figure(
+        go.Bar(
+            x=valores[ordem] * 100,
+            y=[LABELS_PT.get(atribuidor.campos[i], atribuidor.campos[i]) for i in ordem],
+            orientation="h",
+            marker_color=["#e74c3c" if v > 0 else "#3498db" for v in valores[ordem]],
+        )
+    )
+    fig.update_layout(
+        xaxis_title="Contribuição para a probabilidade (p.p.)",
+        height=320,
+        margin=dict(l=10, r=10, t=10, b=10),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"Probabilidade média do modelo para esta classe: {atribuidor.base[classe]:.0%}; "
+        "as contribuições de todas as variáveis somam a diferença até a probabilidade estimada para o paciente."
+    )
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def simular_perfil(dados: dict, versao: tuple, _modelo, _encoder):
+    """Simulação de hábitos de um perfil, reaproveitada por versão do modelo."""
+    from simulacao_habitos import simular_habitos
+
+    with medir("predicao.simulacao"):
+        return simular_habitos(_modelo, _encoder, dados)
+
+
+def exibir_simulacao(modelo, encoder, dados: dict, versao: tuple):
+    """Mostra as menores mudanças de hábito que melhoram a classe prevista."""
+    from simulacao_habitos import descrever_alteracoes
+
+    st.markdown("### Simulação de Mudanças de Hábitos")
+    with st.spinner("Avaliando combinações de hábitos..."):
+        resultado = simular_perfil(dados, versao, modelo, encoder)
+
+    if not resultado.sugestoes:
+        st.success(
+            "Nenhuma combinação simulada aproxima a classe prevista do peso normal."
+            if resultado.classe_atual != "Normal_Weight"
+            else "O paciente já está na classe de peso normal."
+        )
+    else:
+        st.dataframe(
+            [
+                {
+                    "Mudanças": descrever_alteracoes(sugestao),
+                    "Nova classe": DESCRICOES_OBESIDADE[sugestao.classe]["nome"],
+                    "Probabilidade": f"{sugestao.probabilidade:.0%}",
+                }
+                for sugestao in resultado.sugestoes
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.caption(
+        f"{resultado.variantes} combinações avaliadas em uma única predição em lote "
+        f"({resultado.segundos * 1000:.0f} ms); {resultado.melhoram} melhoram a classe prevista."
+    )
+
 
 def pagina_predicao():
     """Página do sistema preditivo."""
+    from cache_predicao import CACHE_PREDICAO, chave_predicao
+
     st.title("Sistema Preditivo de Obesidade")
     st.markdown("---")
     st.markdown(
@@ -119,7 +322,8 @@ def pagina_predicao():
         """
     )
 
-    modelo, encoder = carregar_modelo()
+    versao = assinatura_artefatos()
+    modelo, encoder = carregar_modelo(versao)
 
     # Formulário dividido em colunas
     col1, col2, col3 = st.columns(3)
@@ -177,40 +381,66 @@ def pagina_predicao():
 
     st.markdown("---")
 
+    simular = st.checkbox(
+        "Simular mudanças de hábitos após o diagnóstico",
+        help="Avalia em lote milhares de combinações de hábitos e peso e mostra as menores mudanças que melhoram a classe prevista.",
+    )
+
     # Botão de predição
     if st.button("Realizar Diagnóstico", type="primary", use_container_width=True):
-        # Calcular BMI
-        bmi = weight / (height**2)
+        with medir("predicao.montagem"):
+            # Calcular BMI
+            bmi = weight / (height**2)
+
+            # Montar registro (codificado diretamente, sem DataFrame)
+            dados = {
+                "Gender": gender,
+                "Age": age,
+                "Height": height,
+                "Weight": weight,
+                "family_history": family_history,
+                "FAVC": favc,
+                "FCVC": fcvc,
+                "NCP": ncp,
+                "CAEC": caec,
+                "SMOKE": smoke,
+                "CH2O": ch2o,
+                "SCC": scc,
+                "FAF": faf,
+                "TUE": tue,
+                "CALC": calc,
+                "MTRANS": mtrans,
+                "BMI": bmi,
+            }
+            chave = chave_predicao(dados)
+
+        # Predição (reaproveita o cache quando o perfil já foi avaliado)
+        resultado = CACHE_PREDICAO.obter(chave)
+        contar("predicoes_total", cache="acerto" if resultado is not None else "falha")
+        if resultado is None:
+            with medir("predicao.predict_proba"):
+                probas = modelo.predict_proba(dados)[0]
+            with medir("predicao.inverse_transform"):
+                pred_encoded = modelo.classes_.take([probas.argmax()])
+                pred_label = encoder.inverse_transform(pred_encoded)[0]
+            resultado = (pred_label, tuple(probas.tolist()))
+            CACHE_PREDICAO.guardar(chave, resultado)
+        pred_label, probas = resultado
+        info = DESCRICOES_OBESIDADE[pred_label]
 
-        # Montar DataFrame
-        dados = pd.DataFrame(
-            [
-                {
-                    "Gender": gender,
-                    "Age": age,
-                    "Height": height,
-                    "Weight": weight,
-                    "family_history": family_history,
-                    "FAVC": favc,
-                    "FCVC": fcvc,
-                    "NCP": ncp,
-                    "CAEC": caec,
-                    "SMOKE": smoke,
-                    "CH2O": ch2o,
-                    "SCC": scc,
-                    "FAF": faf,
-                    "TUE": tue,
-                    "CALC": calc,
-                    "MTRANS": mtrans,
-                    "BMI": bmi,
-                }
-            ]
-        )
+        registro_auditoria = iniciar_auditoria()
+        if registro_auditoria is not None:
+            from auditoria import montar_evento
 
-        # Predição
-        pred_encoded = modelo.predict(dados)
-        pred_label = encoder.inverse_transform(pred_encoded)[0]
-        info = DESCRICOES_OBESIDADE[pred_label]
+            with medir("auditoria.registro"):
+                classes = encoder.classes_.take(modelo.classes_)
+                registro_auditoria.registrar(montar_evento(dados, pred_label, probas, classes, versao_modelo(versao)))
+
+        estado = DATA_PATH.stat() if DATA_PATH.exists() else None
+        monitor = carregar_monitor_drift((estado.st_mtime_ns, estado.st_size) if estado else None)
+        if monitor is not None:
+            with medir("drift.registro"):
+                monitor.registrar(dados, pred_label)
 
         # Exibir resultado
         st.markdown("---")
@@ -230,6 +460,7 @@ def pagina_predicao():
                 ">
                     <h2 style="margin: 0; color: white;">{info['nome']}</h2>
                     <p style="margin: 10px 0 0 0; font-size: 14px;">IMC calculado: {bmi:.1f}</p>
+                    <p style="margin: 5px 0 0 0; font-size: 14px;">Probabilidade estimada: {max(probas):.0%}</p>
                 </div>
                 """,
                 unsafe_allow_html=True,
@@ -240,11 +471,30 @@ def pagina_predicao():
             st.markdown(f"**Diagnóstico:** {info['descricao']}")
             st.markdown(f"**Recomendação:** {info['recomendacao']}")
 
+        exibir_atribuicoes(dados, versao)
+
         st.info("Este é um sistema de apoio à decisão. O diagnóstico final deve ser realizado por um profissional de saúde.")
 
+        if simular:
+            exibir_simulacao(modelo, encoder, dados, versao)
+
+        estatisticas = CACHE_PREDICAO.estatisticas()
+        st.caption(
+            f"Cache de predições: {estatisticas['acertos']} acertos, "
+            f"{estatisticas['falhas']} falhas ({estatisticas['taxa_acerto']:.0%})"
+        )
+
+        if monitor is not None:
+            with st.expander("Monitor de drift (predições desde o início do processo × dados de treino)"):
+                st.dataframe(monitor.relatorio(), use_container_width=True, hide_index=True)
+                st.caption("PSI < 0.1 estável, 0.1–0.25 moderado, > 0.25 alto; abaixo de 30 amostras o status é insuficiente.")
+
 
 def pagina_dashboard():
     """Página do dashboard analítico com gráficos interativos."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     st.title("Dashboard Analítico")
     st.markdown("---")
     st.markdown(
@@ -256,20 +506,34 @@ def pagina_dashboard():
     )
 
     # Carregar dados
-    DATA_PATH = PROJECT_ROOT / "data" / "Obesity.csv"
     if not DATA_PATH.exists():
         st.error("Dataset não encontrado. Verifique o arquivo data/Obesity.csv")
         return
 
+    from dataset_colunar import caminho_dataset
+
     @st.cache_data
-    def carregar_dados():
-        df = pd.read_csv(DATA_PATH)
-        df.drop_duplicates(inplace=True)
-        # Criar BMI
-        df["BMI"] = df["Weight"] / (df["Height"] ** 2)
+    def carregar_dados(caminho):
+        # Parquet tipado (dataset_colunar.py) quando atualizado, senão o CSV
+        from artefatos import carregar_preprocessing
+
+        preprocessing = carregar_preprocessing()
+        df = preprocessing.carregar_dados(caminho)
+        if preprocessing.BMI_COLUMN not in df:
+            df = preprocessing.criar_bmi(df)
         return df
 
-    df = carregar_dados()
+    @st.cache_resource(max_entries=1)
+    def indice_filtros(caminho, _df):
+        from explorador_dados import IndiceFiltros
+
+        return IndiceFiltros(_df, ["Gender", "Obesity"], "Age")
+
+    caminho = caminho_dataset(DATA_PATH)
+    with medir("dashboard.carregar_dados"):
+        df = carregar_dados(caminho)
+    estado = DATA_PATH.stat()
+    agregados = carregar_agregados((estado.st_mtime_ns, estado.st_size))
 
     # Tabs para organizar os gráficos
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -282,9 +546,8 @@ def pagina_dashboard():
     with tab1:
         st.subheader("Distribuição dos Níveis de Obesidade na População")
         
-        # Gráfico de barras interativo
-        contagem = df["Obesity"].value_counts().reset_index()
-        contagem.columns = ["Nível de Obesidade", "Quantidade"]
+        # Gráfico de barras interativo (contagens pré-calculadas)
+        contagem = agregados["contagem_classes"]
         
         fig_target = px.bar(
             contagem,
@@ -353,17 +616,31 @@ def pagina_dashboard():
             var_selecionada = st.selectbox("Selecione a variável:", list(variaveis_numericas.keys()))
             coluna = variaveis_numericas[var_selecionada]
             
-            # Boxplot interativo
-            fig_box = px.box(
-                df,
-                x="Obesity",
-                y=coluna,
-                color="Obesity",
-                color_discrete_sequence=px.colors.qualitative.Set2,
+            # Boxplot interativo a partir dos quantis pré-calculados por classe
+            quantis = agregados["quantis"][coluna]
+            cores = px.colors.qualitative.Set2
+            fig_box = go.Figure()
+            for i, classe in enumerate(agregados["ordem_classes"]):
+                estatisticas = quantis.loc[classe]
+                fig_box.add_trace(
+                    go.Box(
+                        x=[classe],
+                        name=classe,
+                        q1=[estatisticas["q1"]],
+                        median=[estatisticas["mediana"]],
+                        q3=[estatisticas["q3"]],
+                        lowerfence=[estatisticas["limite_inferior"]],
+                        upperfence=[estatisticas["limite_superior"]],
+                        marker_color=cores[i % len(cores)],
+                    )
+                )
+            fig_box.update_layout(
                 title=f"{var_selecionada} por Nível de Obesidade",
-                category_orders={"Obesity": df["Obesity"].value_counts().index.tolist()}
+                xaxis_title="Obesity",
+                yaxis_title=coluna,
+                showlegend=False,
+                height=500,
             )
-            fig_box.update_layout(showlegend=False, height=500)
             st.plotly_chart(fig_box, use_container_width=True)
             
             # Histograma por grupo
@@ -384,8 +661,8 @@ def pagina_dashboard():
             var_selecionada = st.selectbox("Selecione a variável:", list(variaveis_categoricas.keys()))
             coluna = variaveis_categoricas[var_selecionada]
             
-            # Gráfico de barras empilhadas
-            contagem_cat = df.groupby([coluna, "Obesity"]).size().reset_index(name="Quantidade")
+            # Gráfico de barras empilhadas (tabela cruzada pré-calculada)
+            contagem_cat = agregados["tabelas_cruzadas"][coluna]
             
             fig_bar = px.bar(
                 contagem_cat,
@@ -414,12 +691,9 @@ def pagina_dashboard():
     with tab3:
         st.subheader("Matriz de Correlação entre Variáveis Numéricas")
         
-        # Selecionar apenas colunas numéricas
+        # Colunas numéricas e correlação pré-calculada
         colunas_num = ["Age", "Height", "Weight", "BMI", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
-        df_num = df[colunas_num]
-        
-        # Calcular correlação
-        corr_matrix = df_num.corr()
+        corr_matrix = agregados["correlacao"].loc[colunas_num, colunas_num]
         
         # Heatmap interativo
         fig_corr = px.imshow(
@@ -481,19 +755,38 @@ def pagina_dashboard():
                 default=list(df["Obesity"].unique())
             )
         
-        # Aplicar filtros
-        df_filtrado = df[
-            (df["Gender"].isin(generos)) &
-            (df["Age"] >= idade_range[0]) &
-            (df["Age"] <= idade_range[1]) &
-            (df["Obesity"].isin(obesidade_filtro))
-        ]
+        # Aplicar filtros via índice de bitmaps (construído uma vez por dataset)
+        with medir("dashboard.filtros"):
+            indice = indice_filtros(caminho, _df=df)
+            posicoes = indice.filtrar({"Gender": generos, "Obesity": obesidade_filtro}, idade_range)
+            df_filtrado = df.iloc[posicoes]
         
         st.markdown(f"**Registros filtrados:** {len(df_filtrado)} de {len(df)}")
-        
-        # Gráfico 3D
+
+        from explorador_dados import (
+            ORCAMENTO_PONTOS,
+            TAMANHO_PAGINA,
+            amostrar_estratificado,
+            obter_pagina,
+            total_paginas,
+        )
+
+        # Gráfico 3D com no máximo `orcamento` pontos, estratificados por classe
+        orcamento = st.select_slider(
+            "Máximo de pontos no gráfico:",
+            options=[1000, 2000, ORCAMENTO_PONTOS, 10000, 20000, 50000],
+            value=ORCAMENTO_PONTOS,
+        )
+        with medir("dashboard.amostragem"):
+            df_grafico = amostrar_estratificado(df_filtrado, "Obesity", orcamento)
+        if len(df_grafico) < len(df_filtrado):
+            st.caption(
+                f"Exibindo amostra estratificada de {len(df_grafico)} pontos "
+                f"({len(df_grafico) / len(df_filtrado):.1%} dos registros filtrados)."
+            )
+
         fig_3d = px.scatter_3d(
-            df_filtrado,
+            df_grafico,
             x="Weight",
             y="Height",
             z="Age",
@@ -502,12 +795,20 @@ def pagina_dashboard():
             title="Visualização 3D: Peso × Altura × Idade",
             hover_data=["BMI", "FAF"]
         )
+        fig_3d.update_traces(marker=dict(size=3, line=dict(width=0)))
         fig_3d.update_layout(height=600)
         st.plotly_chart(fig_3d, use_container_width=True)
         
-        # Tabela de dados
+        # Tabela de dados: apenas a página selecionada é enviada ao navegador
         if st.checkbox("Mostrar dados filtrados"):
-            st.dataframe(df_filtrado, use_container_width=True)
+            paginas = total_paginas(len(df_filtrado))
+            pagina = st.number_input(
+                f"Página (de {paginas}):", min_value=1, max_value=paginas, value=1, step=1
+            )
+            df_pagina, pagina = obter_pagina(df_filtrado, int(pagina))
+            inicio = (pagina - 1) * TAMANHO_PAGINA
+            st.dataframe(df_pagina, use_container_width=True)
+            st.caption(f"Linhas {inicio + 1}–{inicio + len(df_pagina)} de {len(df_filtrado)}")
 
     # Métricas resumidas
     st.markdown("---")
@@ -582,10 +883,15 @@ def main():
     st.sidebar.title("Sistema de Diagnóstico")
     st.sidebar.markdown("---")
 
+    # Aquece o modelo em segundo plano, qualquer que seja a página inicial
+    aquecer_modelo(assinatura_artefatos())
+    iniciar_exportador_metricas()
+
     pagina = st.sidebar.radio(
         "Navegação",
         ["Sistema Preditivo", "Dashboard Analítico", "Sobre"],
         label_visibility="collapsed",
+        key="pagina",
     )
 
     st.sidebar.markdown("---")
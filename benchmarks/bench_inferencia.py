@@ -0,0 +1,241 @@
+"""Harness de latência do caminho de inferência (registro único e lotes).
+
+Reproduz o caminho de ``pagina_predicao`` com pacientes sorteados de
+``Obesity.csv``, separado em três etapas:
+
+- ``montagem``: construção da entrada do modelo a partir dos registros
+  (DataFrame para o pipeline sklearn; dicionários para o motor compilado);
+- ``predict``: ``modelo.predict`` (inclui o pré-processamento);
+- ``inverse_transform``: ``encoder.inverse_transform`` dos rótulos.
+
+Os lotes são enviados por ``--concorrencia`` threads simultâneas (como
+sessões do Streamlit em um mesmo processo). Para cada backend e tamanho de
+lote são reportados p50/p95/p99/máximo por etapa e do total, além da vazão
+em registros por segundo.
+
+Backends disponíveis:
+
+- ``sklearn``: ``Pipeline`` serializado em ``modelo.joblib``;
+- ``compilado``: ``CodificadorCompilado`` + ``FlorestaCompilada`` compilados
+  do ``modelo.joblib`` (o motor exato da aplicação e do servidor);
+- ``binario``: o mesmo motor lido de ``modelo.bin`` (``formato_binario.py``),
+  com thresholds float32 e folhas quantizadas.
+
+Uso:
+    python benchmarks/bench_inferencia.py --lotes 1 8 64 1024 --concorrencia 4 --saida inferencia.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from artefatos import (  # noqa: E402
+    DATA_PATH,
+    carregar_artefatos,
+    carregar_preprocessing,
+    compilar_pipeline,
+)
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+criar_bmi = preprocessing_module.criar_bmi
+
+LOTES = [1, 8, 64, 1024]
+CONCORRENCIA = 4
+REQUISICOES = 500
+LINHAS_MAXIMAS = 100_000
+AQUECIMENTO = 5
+PERCENTIS = {"p50": 50, "p95": 95, "p99": 99}
+ETAPAS = ["montagem", "predict", "inverse_transform"]
+RANDOM_STATE = 42
+
+Registro = Dict[str, object]
+
+
+def _montar_dataframe(registros: List[Registro]) -> pd.DataFrame:
+    return pd.DataFrame(registros)
+
+
+def _montar_dicionarios(registros: List[Registro]) -> object:
+    # Um único paciente segue o caminho escalar do codificador compilado
+    if len(registros) == 1:
+        return registros[0]
+    return {coluna: [registro[coluna] for registro in registros] for coluna in registros[0]}
+
+
+def carregar_backends(nomes: List[str]) -> Dict[str, Tuple[Callable, object, object]]:
+    """Carrega os backends pedidos.
+
+    Args:
+        nomes: Subconjunto de ``sklearn``, ``compilado`` e ``binario``.
+
+    Returns:
+        Dicionário nome -> (função de montagem, modelo, encoder).
+
+    Raises:
+        ValueError: Caso algum nome não seja um backend conhecido ou o
+            arquivo binário não esteja disponível.
+    """
+    backends = {}
+    for nome in nomes:
+        if nome == "sklearn":
+            modelo, encoder = carregar_artefatos()
+            backends[nome] = (_montar_dataframe, modelo, encoder)
+        elif nome == "compilado":
+            # Sempre a floresta exata do joblib, mesmo com modelo_mmap/ ou modelo.bin
+            pipeline, encoder = carregar_artefatos()
+            modelo = compilar_pipeline(pipeline)
+            backends[nome] = (_montar_dicionarios, modelo, encoder)
+        elif nome == "binario":
+            from formato_binario import carregar_binario
+
+            binario = carregar_binario()
+            if binario is None:
+                raise ValueError("modelo.bin ausente ou desatualizado: rode scripts/formato_binario.py")
+            backends[nome] = (_montar_dicionarios, *binario)
+        else:
+            raise ValueError(f"Backend desconhecido: {nome}")
+    return backends
+
+
+def amostrar_registros(n: int, random_state: int = RANDOM_STATE) -> List[Registro]:
+    """Sorteia ``n`` pacientes do dataset (com BMI, sem o target)."""
+    df = criar_bmi(pd.read_csv(DATA_PATH)).drop(columns=[TARGET_COLUMN])
+    amostra = df.sample(n=n, replace=True, random_state=random_state)
+    return amostra.to_dict("records")
+
+
+def _processar_lote(montar: Callable, modelo: object, encoder: object, lote: List[Registro]) -> Dict[str, float]:
+    inicio = time.perf_counter()
+    entrada = montar(lote)
+    montado = time.perf_counter()
+    predicao = modelo.predict(entrada)
+    predito = time.perf_counter()
+    encoder.inverse_transform(predicao)
+    fim = time.perf_counter()
+    return {
+        "montagem": montado - inicio,
+        "predict": predito - montado,
+        "inverse_transform": fim - predito,
+        "total": fim - inicio,
+    }
+
+
+def medir(
+    montar: Callable,
+    modelo: object,
+    encoder: object,
+    registros: List[Registro],
+    tamanho_lote: int,
+    n_lotes: int,
+    concorrencia: int,
+) -> Dict[str, object]:
+    """Envia ``n_lotes`` lotes com ``concorrencia`` threads e resume as latências.
+
+    Args:
+        montar: Constrói a entrada do modelo a partir de uma lista de registros.
+        modelo: Modelo com ``predict``.
+        encoder: LabelEncoder do target.
+        registros: Pacientes usados para formar os lotes (reciclados).
+        tamanho_lote: Registros por lote.
+        n_lotes: Quantidade de lotes medidos.
+        concorrencia: Threads enviando lotes simultaneamente.
+
+    Returns:
+        Dicionário com percentis e máximo (ms) por etapa e a vazão.
+    """
+    lotes = [
+        [registros[(i * tamanho_lote + j) % len(registros)] for j in range(tamanho_lote)]
+        for i in range(n_lotes)
+    ]
+    for lote in lotes[:AQUECIMENTO]:
+        _processar_lote(montar, modelo, encoder, lote)
+
+    tempos: List[Dict[str, float]] = []
+    trava = threading.Lock()
+
+    def trabalhador(parte: List[List[Registro]]) -> None:
+        locais = [_processar_lote(montar, modelo, encoder, lote) for lote in parte]
+        with trava:
+            tempos.extend(locais)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        list(pool.map(trabalhador, [lotes[i::concorrencia] for i in range(concorrencia)]))
+    duracao = time.perf_counter() - inicio
+
+    resumo: Dict[str, object] = {"lote": tamanho_lote, "lotes": n_lotes}
+    for etapa in ETAPAS + ["total"]:
+        valores = np.array([t[etapa] for t in tempos]) * 1000
+        resumo[etapa] = {nome: float(np.percentile(valores, p)) for nome, p in PERCENTIS.items()}
+        resumo[etapa]["max"] = float(valores.max())
+    resumo["registros_por_segundo"] = n_lotes * tamanho_lote / duracao
+    return resumo
+
+
+def executar(
+    backends: Mapping[str, Tuple[Callable, object, object]],
+    lotes: List[int],
+    concorrencia: int,
+    requisicoes: int,
+) -> Dict[str, List[Dict[str, object]]]:
+    """Mede todos os backends em todos os tamanhos de lote."""
+    registros = amostrar_registros(max(requisicoes, max(lotes)))
+    resultados: Dict[str, List[Dict[str, object]]] = {}
+    for nome, (montar, modelo, encoder) in backends.items():
+        resultados[nome] = []
+        for tamanho_lote in lotes:
+            n_lotes = min(requisicoes, max(AQUECIMENTO * 2, LINHAS_MAXIMAS // tamanho_lote))
+            resultados[nome].append(medir(montar, modelo, encoder, registros, tamanho_lote, n_lotes, concorrencia))
+    return resultados
+
+
+def main() -> None:
+    """Executa o harness a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description="Latência do caminho de inferência")
+    parser.add_argument("--backends", nargs="+", default=["sklearn", "compilado"], help="Backends comparados")
+    parser.add_argument("--lotes", type=int, nargs="+", default=LOTES, help="Tamanhos de lote")
+    parser.add_argument("--concorrencia", type=int, default=CONCORRENCIA, help="Threads simultâneas")
+    parser.add_argument("--requisicoes", type=int, default=REQUISICOES, help="Lotes medidos por configuração")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("HARNESS DE LATÊNCIA DE INFERÊNCIA")
+    print("=" * 60)
+    print(f"     - Concorrência: {args.concorrencia} | Lotes: {args.lotes}")
+    resultados = executar(carregar_backends(args.backends), args.lotes, args.concorrencia, args.requisicoes)
+
+    for nome, medicoes in resultados.items():
+        print(f"\nBackend: {nome}")
+        print(f"{'Lote':>6} {'Etapa':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}   (ms)")
+        for medicao in medicoes:
+            for etapa in ETAPAS + ["total"]:
+                tempos = medicao[etapa]
+                print(
+                    f"{medicao['lote']:>6} {etapa:<18}{tempos['p50']:>9.3f}{tempos['p95']:>9.3f}"
+                    f"{tempos['p99']:>9.3f}{tempos['max']:>9.3f}"
+                )
+            print(f"{'':>6} {'vazão':<18}{medicao['registros_por_segundo']:>18,.0f} registros/s")
+
+    if args.saida:
+        saida = {"concorrencia": args.concorrencia, "backends": resultados}
+        args.saida.write_text(json.dumps(saida, indent=2))
+        print(f"\n     - Resultados salvos: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
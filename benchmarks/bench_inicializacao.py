@@ -0,0 +1,149 @@
+"""Benchmark de inicialização a frio da aplicação Streamlit.
+
+Em processos Python novos são medidos:
+
+- ``import_ms``: tempo para importar ``app.py`` (nível de módulo), em um
+  processo próprio, independente da página;
+- ``primeira_renderizacao_ms``: primeira execução do script com a página
+  selecionada, sem importar ``app.py`` antes; inclui portanto os imports do
+  módulo e os feitos pela própria página (só o ``streamlit`` já está
+  carregado, pelo ``AppTest``);
+- ``primeira_predicao_ms``: tempo desde sair da página inicial até exibir o
+  primeiro diagnóstico (navegação até "Sistema Preditivo" + clique).
+
+Cada medição roda em um subprocesso para que nenhum módulo já importado
+mascare o custo de inicialização. O resultado (mediana das repetições) é
+impresso e pode ser salvo em JSON.
+
+Uso:
+    python benchmarks/bench_inicializacao.py --repeticoes 5 --saida inicializacao.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = PROJECT_ROOT / "app.py"
+PAGINAS = ["Sistema Preditivo", "Dashboard Analítico", "Sobre"]
+PAGINA_PREDICAO = "Sistema Preditivo"
+TIMEOUT_S = 120
+
+
+def medir_importacao() -> Dict[str, float]:
+    """Mede o import de ``app.py`` no processo atual, que deve ser recém-criado."""
+    inicio = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("app_benchmark", APP_PATH)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return {"import_ms": (time.perf_counter() - inicio) * 1000}
+
+
+def medir_pagina(pagina: str) -> Dict[str, float]:
+    """Mede primeira renderização e primeira predição no processo atual.
+
+    Deve ser chamada em um processo recém-criado (ver ``main``); ``app.py``
+    não é importado antes, então a primeira renderização inclui seus imports.
+
+    Args:
+        pagina: Página selecionada na primeira execução.
+
+    Returns:
+        Dicionário com os tempos em milissegundos.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=TIMEOUT_S)
+    app.session_state["pagina"] = pagina
+    inicio = time.perf_counter()
+    app.run()
+    renderizacao_ms = (time.perf_counter() - inicio) * 1000
+    if app.exception:
+        raise RuntimeError(f"Falha ao renderizar {pagina}: {app.exception}")
+
+    inicio = time.perf_counter()
+    if pagina != PAGINA_PREDICAO:
+        app.sidebar.radio(key="pagina").set_value(PAGINA_PREDICAO).run()
+    app.button[0].click().run()
+    predicao_ms = (time.perf_counter() - inicio) * 1000
+    if app.exception:
+        raise RuntimeError(f"Falha na predição a partir de {pagina}: {app.exception}")
+
+    return {
+        "primeira_renderizacao_ms": renderizacao_ms,
+        "primeira_predicao_ms": predicao_ms,
+    }
+
+
+def _medianas(argumentos: List[str], repeticoes: int) -> Dict[str, float]:
+    """Roda ``repeticoes`` processos frios com ``argumentos`` e retorna as medianas."""
+    amostras: List[Dict[str, float]] = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, __file__, *argumentos],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=PROJECT_ROOT,
+        )
+        amostras.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {metrica: statistics.median(amostra[metrica] for amostra in amostras) for metrica in amostras[0]}
+
+
+def executar(repeticoes: int) -> Tuple[float, Dict[str, Dict[str, float]]]:
+    """Mede o import e cada página em processos frios.
+
+    Returns:
+        Tupla com a mediana do import de ``app.py`` (ms) e as medianas por página.
+    """
+    import_ms = _medianas(["--filho-import"], repeticoes)["import_ms"]
+    paginas = {pagina: _medianas(["--filho", pagina], repeticoes) for pagina in PAGINAS}
+    return import_ms, paginas
+
+
+def main() -> None:
+    """Executa o benchmark a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da aplicação")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Processos frios por página")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON para salvar os resultados")
+    parser.add_argument("--filho", help=argparse.SUPPRESS)
+    parser.add_argument("--filho-import", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho_import:
+        print(json.dumps(medir_importacao()))
+        return
+    if args.filho:
+        print(json.dumps(medir_pagina(args.filho)))
+        return
+
+    print("=" * 60)
+    print("BENCHMARK DE INICIALIZAÇÃO")
+    print("=" * 60)
+    import_ms, resultados = executar(args.repeticoes)
+
+    print(f"\n     - Import de app.py: {import_ms:.0f}ms")
+    print(f"\n{'Página':<22}{'1ª render':>12}{'1ª predição':>14}")
+    for pagina, tempos in resultados.items():
+        print(
+            f"{pagina:<22}{tempos['primeira_renderizacao_ms']:>10.0f}ms"
+            f"{tempos['primeira_predicao_ms']:>12.0f}ms"
+        )
+
+    if args.saida:
+        args.saida.write_text(
+            json.dumps({"repeticoes": args.repeticoes, "import_ms": import_ms, "paginas": resultados}, indent=2)
+        )
+        print(f"\n     - Resultados salvos: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
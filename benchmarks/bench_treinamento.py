@@ -0,0 +1,313 @@
+"""Benchmark de treinamento e inferência em datasets escalados.
+
+Para cada escala (múltiplo do tamanho de ``Obesity.csv``) o dataset é
+replicado com um ruído pequeno nas variáveis numéricas (para que as réplicas
+não sejam removidas como duplicatas) ou, com ``--sintetico``, gerado por
+``gerador_sintetico.py``; é gravado em CSV temporário e passa pelas etapas
+do pipeline de treinamento:
+
+- ``carregar_dados``, ``criar_bmi`` e ``obter_preprocessor().fit_transform``;
+- para cada tamanho de floresta: ``fit``, ``predict`` e ``predict_proba``
+  em lote (até ``LINHAS_PREDICAO`` linhas) e ``predict_proba`` de um registro.
+
+Cada etapa registra tempo (mediana das repetições) e pico de memória
+alocada (``tracemalloc``). O pico exige uma execução extra de cada etapa,
+que no ``fit`` de 1000x dobraria o tempo total; por isso só é medido até a
+escala ``--memoria-ate`` (acima dela, ``pico_mb`` fica nulo). Os resultados são salvos em JSON e podem ser
+comparados com uma execução anterior: etapas mais lentas que a tolerância
+são apontadas como regressão e o processo termina com código 1.
+
+Uso:
+    python benchmarks/bench_treinamento.py --escalas 1 10 100 --arvores 50 200 --saida atual.json
+    python benchmarks/bench_treinamento.py --escalas 1000 --memoria-ate 1000
+    python benchmarks/bench_treinamento.py --saida atual.json --comparar base.json --tolerancia 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from artefatos import DATA_PATH, carregar_preprocessing  # noqa: E402
+from gerador_sintetico import GeradorSintetico  # noqa: E402
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+
+spec = importlib.util.spec_from_file_location("training", PROJECT_ROOT / "scripts" / "3_training.py")
+training_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(training_module)
+PARAMETROS_MODELO = training_module.PARAMETROS_MODELO
+
+ESCALAS = [1, 10, 100, 1000]
+ARVORES = [50, 200]
+LINHAS_PREDICAO = 10_000
+RUIDO_RELATIVO = 0.01
+RANDOM_STATE = 42
+TOLERANCIA = 0.2
+# Maior escala em que o pico de memória é medido (execução extra por etapa)
+MEMORIA_ATE = 100
+
+
+def escalar_dataset(df: pd.DataFrame, fator: int, random_state: int = RANDOM_STATE) -> pd.DataFrame:
+    """Replica ``df`` ``fator`` vezes com ruído gaussiano nas colunas numéricas.
+
+    A primeira réplica é o dataset original; as demais recebem ruído com
+    desvio de ``RUIDO_RELATIVO`` vezes o desvio padrão de cada coluna.
+
+    Args:
+        df: Dataset original.
+        fator: Número de réplicas.
+        random_state: Semente do ruído.
+
+    Returns:
+        DataFrame com ``len(df) * fator`` linhas.
+    """
+    if fator == 1:
+        return df.copy()
+    rng = np.random.default_rng(random_state)
+    escalado = pd.concat([df] * fator, ignore_index=True)
+    for coluna in NUMERIC_FEATURES:
+        ruido = rng.normal(0.0, df[coluna].std() * RUIDO_RELATIVO, size=len(escalado))
+        ruido[: len(df)] = 0.0
+        escalado[coluna] = (escalado[coluna] + ruido).clip(lower=df[coluna].min())
+    return escalado
+
+
+def medir(
+    funcao: Callable[[], object], repeticoes: int = 1, memoria: bool = True
+) -> Tuple[object, float, Optional[float]]:
+    """Executa ``funcao`` e mede tempo (mediana) e pico de memória alocada.
+
+    O pico de memória vem de uma execução extra, fora da medição de tempo.
+
+    Args:
+        funcao: Etapa a medir.
+        repeticoes: Quantidade de execuções.
+        memoria: Se False, pula a execução extra e o pico fica None.
+
+    Returns:
+        Tupla com o retorno da última execução, tempo em segundos e pico em MB.
+    """
+    tempos: List[float] = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    if not memoria:
+        return resultado, statistics.median(tempos), None
+
+    # Execução separada para memória: tracemalloc distorce o tempo
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, statistics.median(tempos), pico / 2**20
+
+
+def executar(
+    escalas: List[int],
+    arvores: List[int],
+    repeticoes: int,
+    sintetico: bool = False,
+    memoria_ate: int = MEMORIA_ATE,
+) -> List[Dict[str, object]]:
+    """Roda todas as etapas para cada escala e tamanho de floresta.
+
+    Args:
+        escalas: Múltiplos do tamanho de ``Obesity.csv``.
+        arvores: Tamanhos de floresta.
+        repeticoes: Execuções por etapa (mediana).
+        sintetico: Se True, os dados vêm de ``GeradorSintetico`` em vez de
+            réplicas com ruído.
+        memoria_ate: Maior escala em que o pico de memória é medido.
+
+    Returns:
+        Lista de registros ``{escala, linhas, etapa, arvores, tempo_s, pico_mb}``.
+    """
+    original = pd.read_csv(DATA_PATH)
+    gerador = GeradorSintetico.ajustar(original) if sintetico else None
+    resultados: List[Dict[str, object]] = []
+
+    def registrar(
+        escala: int, linhas: int, etapa: str, n_arvores: Optional[int], tempo: float, pico: Optional[float]
+    ) -> None:
+        resultados.append({
+            "escala": escala,
+            "linhas": linhas,
+            "etapa": etapa,
+            "arvores": n_arvores,
+            "tempo_s": tempo,
+            "pico_mb": pico,
+        })
+        rotulo = f"{etapa}" + (f" ({n_arvores} árvores)" if n_arvores else "")
+        memoria = f"{pico:>10.1f} MB" if pico is not None else f"{'-':>10}"
+        print(f"     - {rotulo:<40}{tempo * 1000:>12.1f} ms{memoria}")
+
+    with tempfile.TemporaryDirectory() as temporario:
+        for escala in escalas:
+            caminho = Path(temporario) / f"obesity_{escala}x.csv"
+            if gerador is not None:
+                dados = gerador.gerar(len(original) * escala, np.random.default_rng(RANDOM_STATE))
+            else:
+                dados = escalar_dataset(original, escala)
+            dados.to_csv(caminho, index=False)
+            del dados
+            print(f"\nEscala {escala}x:")
+            memoria = escala <= memoria_ate
+
+            df, tempo, pico = medir(lambda: preprocessing_module.carregar_dados(caminho), repeticoes, memoria)
+            linhas = len(df)
+            registrar(escala, linhas, "carregar_dados", None, tempo, pico)
+
+            df, tempo, pico = medir(lambda: preprocessing_module.criar_bmi(df), repeticoes, memoria)
+            registrar(escala, linhas, "criar_bmi", None, tempo, pico)
+
+            X = df.drop(columns=[TARGET_COLUMN])
+            y = df[TARGET_COLUMN].to_numpy()
+            X_processado, tempo, pico = medir(
+                lambda: preprocessing_module.obter_preprocessor().fit_transform(X), repeticoes, memoria
+            )
+            registrar(escala, linhas, "fit_transform", None, tempo, pico)
+
+            lote = X_processado[:LINHAS_PREDICAO]
+            registro = X_processado[:1]
+            for n_arvores in arvores:
+                parametros = {**PARAMETROS_MODELO, "n_estimators": n_arvores}
+                modelo, tempo, pico = medir(
+                    lambda: RandomForestClassifier(**parametros, random_state=RANDOM_STATE, n_jobs=-1).fit(
+                        X_processado, y
+                    ),
+                    repeticoes,
+                    memoria,
+                )
+                registrar(escala, linhas, "fit", n_arvores, tempo, pico)
+
+                for etapa, funcao in (
+                    ("predict", lambda: modelo.predict(lote)),
+                    ("predict_proba", lambda: modelo.predict_proba(lote)),
+                    ("predict_proba_registro", lambda: modelo.predict_proba(registro)),
+                ):
+                    _, tempo, pico = medir(funcao, max(repeticoes, 5), memoria)
+                    registrar(escala, linhas, etapa, n_arvores, tempo, pico)
+
+            caminho.unlink()
+    return resultados
+
+
+def _chave(registro: Dict[str, object]) -> Tuple[object, ...]:
+    return registro["escala"], registro["etapa"], registro["arvores"]
+
+
+def comparar(
+    atual: List[Dict[str, object]], base: List[Dict[str, object]], tolerancia: float = TOLERANCIA
+) -> List[Dict[str, object]]:
+    """Aponta as etapas que ficaram mais lentas que ``1 + tolerancia`` vezes a base.
+
+    Args:
+        atual: Resultados desta execução.
+        base: Resultados de referência.
+        tolerancia: Aumento relativo de tempo aceito.
+
+    Returns:
+        Lista de regressões com a etapa, os tempos e a razão atual/base.
+    """
+    referencia = {_chave(registro): registro for registro in base}
+    regressoes = []
+    for registro in atual:
+        anterior = referencia.get(_chave(registro))
+        if anterior is None or anterior["tempo_s"] <= 0:
+            continue
+        razao = registro["tempo_s"] / anterior["tempo_s"]
+        if razao > 1 + tolerancia:
+            regressoes.append({
+                "escala": registro["escala"],
+                "etapa": registro["etapa"],
+                "arvores": registro["arvores"],
+                "base_s": anterior["tempo_s"],
+                "atual_s": registro["tempo_s"],
+                "razao": razao,
+            })
+    return regressoes
+
+
+def ambiente() -> Dict[str, object]:
+    """Versões e hardware, para que execuções comparadas sejam equivalentes."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "cpus": os.cpu_count(),
+        "plataforma": platform.platform(),
+    }
+
+
+def main() -> None:
+    """Executa o benchmark a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmark de treinamento e inferência")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS, help="Múltiplos do dataset")
+    parser.add_argument("--arvores", type=int, nargs="+", default=ARVORES, help="Tamanhos de floresta")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções por etapa (mediana)")
+    parser.add_argument("--sintetico", action="store_true", help="Usa o gerador sintético em vez de réplicas")
+    parser.add_argument(
+        "--memoria-ate",
+        type=int,
+        default=MEMORIA_ATE,
+        metavar="ESCALA",
+        help="Maior escala com medição de pico de memória (execução extra por etapa)",
+    )
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON para salvar os resultados")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Aumento de tempo aceito (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DE TREINAMENTO E INFERÊNCIA")
+    print("=" * 60)
+    resultados = executar(args.escalas, args.arvores, args.repeticoes, args.sintetico, args.memoria_ate)
+
+    if args.saida:
+        args.saida.write_text(json.dumps({"ambiente": ambiente(), "resultados": resultados}, indent=2))
+        print(f"\n     - Resultados salvos: {args.saida}")
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text())
+        if base["ambiente"] != ambiente():
+            print("\n⚠️ Ambiente diferente da execução de referência")
+        regressoes = comparar(resultados, base["resultados"], args.tolerancia)
+        if not regressoes:
+            print(f"\n✅ Nenhuma regressão acima de {args.tolerancia:.0%}")
+            return
+        print(f"\n❌ {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+        for regressao in regressoes:
+            arvores = f" ({regressao['arvores']} árvores)" if regressao["arvores"] else ""
+            print(
+                f"     - {regressao['escala']}x {regressao['etapa']}{arvores}: "
+                f"{regressao['base_s'] * 1000:.1f} ms -> {regressao['atual_s'] * 1000:.1f} ms "
+                f"({regressao['razao']:.2f}x)"
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
@@ -41,14 +41,20 @@ ORDINAL_ORDER = ["no", "Sometimes", "Frequently", "Always"]
 BMI_COLUMN = "BMI"
 
 
-def carregar_dados(caminho: Path) -> pd.DataFrame:
+def carregar_dados(caminho: Path, colunas: Optional[List[str]] = None) -> pd.DataFrame:
     """Carrega o dataset, remove duplicatas e retorna um DataFrame.
 
+    Aceita o CSV original ou o arquivo colunar gerado por
+    ``dataset_colunar.py`` (``.parquet``), que já vem tipado, sem
+    duplicatas e com BMI pré-calculado.
+
     Args:
-        caminho: Caminho completo para o arquivo CSV.
+        caminho: Caminho completo para o arquivo CSV ou Parquet.
+        colunas: Colunas a carregar (todas se None). No Parquet apenas essas
+            colunas são lidas do disco.
 
     Returns:
-        DataFrame com o conteúdo do CSV e duplicatas removidas.
+        DataFrame com o conteúdo do arquivo e duplicatas removidas.
 
     Raises:
         FileNotFoundError: Caso o caminho informado não exista.
@@ -56,8 +62,14 @@ def carregar_dados(caminho: Path) -> pd.DataFrame:
     if not caminho.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {caminho}")
 
+    if caminho.suffix.lower() == ".parquet":
+        return pd.read_parquet(caminho, columns=colunas)
+
+    # Duplicatas são avaliadas sobre todas as colunas, antes da projeção
     df = pd.read_csv(caminho)
     df.drop_duplicates(inplace=True)
+    if colunas is not None:
+        df = df[colunas]
     return df
 
 
@@ -9,9 +9,14 @@ FASE 3 do Tech Challenge 4 - FIAP/POSTECH Data Analytics
 
 from __future__ import annotations
 
+import argparse
 import joblib
+import json
 import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -21,7 +26,8 @@ from sklearn.metrics import (
     classification_report,
     confusion_matrix,
 )
-from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, train_test_split
 
 # Adiciona o diretório raiz ao path para importar o módulo de preprocessing
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -40,6 +46,22 @@ criar_bmi = preprocessing_module.criar_bmi
 obter_preprocessor = preprocessing_module.obter_preprocessor
 obter_target_encoder = preprocessing_module.obter_target_encoder
 
+from artefatos import BINARIO_PATH, MMAP_DIR, salvar_modelo_mmap  # noqa: E402
+from cache_preprocessamento import CachePreprocessamento, impressao_digital  # noqa: E402
+from compactacao_floresta import TOLERANCIA as TOLERANCIA_COMPACTACAO  # noqa: E402
+from compactacao_floresta import compactar_floresta  # noqa: E402
+from busca_hiperparametros import (  # noqa: E402
+    N_CANDIDATOS,
+    parametros_do_resultado,
+    selecionar_candidato,
+    sortear_candidatos,
+    successive_halving,
+)
+from instrumentacao import REGISTRO, medir  # noqa: E402
+from treinamento_fora_memoria import CHUNK_SIZE as CHUNK_SIZE_FORA_MEMORIA  # noqa: E402
+from treinamento_fora_memoria import treinar_fora_da_memoria  # noqa: E402
+from treinamento_incremental import NOVAS_ARVORES  # noqa: E402
+
 # Configurações
 DATA_PATH = PROJECT_ROOT / "data" / "Obesity.csv"
 MODEL_PATH = PROJECT_ROOT / "modelo.joblib"
@@ -47,6 +69,17 @@ ENCODER_PATH = PROJECT_ROOT / "label_encoder.joblib"
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
 N_FOLDS = 5
+META_ACURACIA = 0.75
+BUSCA_PATH = PROJECT_ROOT / "busca_hiperparametros.csv"
+COMPACTACAO_PATH = PROJECT_ROOT / "compactacao_modelo.json"
+METRICAS_PATH = PROJECT_ROOT / "metricas_treinamento.json"
+PARAMETROS_MODELO = {
+    "n_estimators": 200,
+    "max_depth": 20,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "class_weight": "balanced",
+}
 
 
 def preparar_dados() -> tuple[pd.DataFrame, pd.Series]:
@@ -60,11 +93,15 @@ def preparar_dados() -> tuple[pd.DataFrame, pd.Series]:
     print("=" * 60)
     print("\n[1/5] Carregando dados...")
 
-    df = carregar_dados(DATA_PATH)
-    print(f"     - Registros carregados: {len(df)}")
+    # Sempre o CSV: o Parquet de dataset_colunar.py guarda numéricas em float32
+    with medir("treino.carregar_dados"):
+        df = carregar_dados(DATA_PATH)
+    print(f"     - Registros carregados: {len(df)} ({DATA_PATH.name})")
 
-    df = criar_bmi(df)
-    print("     - Feature BMI criada")
+    if preprocessing_module.BMI_COLUMN not in df:
+        with medir("treino.criar_bmi"):
+            df = criar_bmi(df)
+        print("     - Feature BMI criada")
 
     X = df.drop(columns=[TARGET_COLUMN])
     y = df[TARGET_COLUMN]
@@ -73,14 +110,147 @@ def preparar_dados() -> tuple[pd.DataFrame, pd.Series]:
     return X, y
 
 
+def buscar_hiperparametros(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    n_candidatos: int = N_CANDIDATOS,
+    acuracia_minima: float = META_ACURACIA,
+) -> dict:
+    """Executa a busca com successive halving e salva a tabela de resultados.
+
+    Args:
+        X_train: Features de treino já pré-processadas.
+        y_train: Target de treino codificado.
+        n_candidatos: Combinações sorteadas do espaço de busca.
+        acuracia_minima: Meta de acurácia para escolher o modelo mais barato.
+
+    Returns:
+        Hiperparâmetros do candidato escolhido.
+    """
+    print(f"\n[3/5] Busca de hiperparâmetros ({n_candidatos} candidatos, successive halving)...")
+    inicio = time.perf_counter()
+    resultados = successive_halving(
+        X_train, y_train, sortear_candidatos(n_candidatos), acuracia_minima=acuracia_minima
+    )
+    resultados.to_csv(BUSCA_PATH, index=False)
+    print(f"     - Tempo total: {time.perf_counter() - inicio:.1f}s")
+    print(f"     - Resultados salvos: {BUSCA_PATH}")
+
+    escolhido = selecionar_candidato(resultados, acuracia_minima)
+    parametros = parametros_do_resultado(escolhido)
+    print(f"     - Escolhido: {parametros}")
+    print(
+        f"     - Acurácia CV: {escolhido['acuracia']:.4f} | Fit: {escolhido['fit_s']:.2f}s"
+        f" | Latência: {escolhido['latencia_ms']:.2f} ms"
+    )
+    return parametros
+
+
+def compactar_modelo(
+    modelo: RandomForestClassifier,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    tolerancia: float = TOLERANCIA_COMPACTACAO,
+) -> tuple[RandomForestClassifier, float]:
+    """Compacta a floresta e salva o relatório antes/depois.
+
+    Args:
+        modelo: Floresta treinada.
+        X_train: Features de treino pré-processadas (as usadas no fit).
+        y_train: Target de treino codificado.
+        X_test: Features de teste pré-processadas.
+        y_test: Target de teste codificado.
+        tolerancia: Queda de acurácia out-of-bag aceita, na seleção e na
+            validação (parte do treino fora das escolhas).
+
+    Returns:
+        Tupla com a floresta compactada (ou a completa, se a validação
+        falhar) e sua acurácia de teste.
+    """
+    print(f"\n[4b/5] Compactando a floresta (tolerância OOB: {tolerancia:.3f})...")
+    compactado, relatorio = compactar_floresta(modelo, X_train, y_train, X_test, y_test, tolerancia)
+    antes, depois = relatorio["antes"], relatorio["depois"]
+
+    print(f"{'':<24}{'Antes':>12}{'Depois':>12}")
+    print(f"{'Árvores':<24}{antes['arvores']:>12}{depois['arvores']:>12}")
+    print(f"{'Nós':<24}{antes['nos']:>12}{depois['nos']:>12}")
+    print(f"{'Profundidade máxima':<24}{antes['profundidade_maxima']:>12}{depois['profundidade_maxima']:>12}")
+    print(f"{'Tamanho (KB)':<24}{antes['tamanho_bytes'] / 1024:>12.0f}{depois['tamanho_bytes'] / 1024:>12.0f}")
+    print(f"{'Latência 1 registro (ms)':<24}{antes['latencia_registro_ms']:>12.2f}{depois['latencia_registro_ms']:>12.2f}")
+    print(
+        f"{'Acurácia OOB':<24}{relatorio['acuracia_oob']['antes']:>12.4f}"
+        f"{relatorio['acuracia_oob']['depois']:>12.4f}"
+    )
+    print(
+        f"{'Acurácia validação':<24}{relatorio['acuracia_validacao']['antes']:>12.4f}"
+        f"{relatorio['acuracia_validacao']['depois']:>12.4f}"
+    )
+    print(f"{'Acurácia de teste':<24}{antes['acuracia_teste']:>12.4f}{depois['acuracia_teste']:>12.4f}")
+    if relatorio["mantida_completa"]:
+        print("⚠️ A floresta escolhida excede a tolerância na validação - floresta completa mantida")
+
+    COMPACTACAO_PATH.write_text(json.dumps(relatorio, indent=2))
+    print(f"     - Relatório salvo: {COMPACTACAO_PATH}")
+    return compactado, depois["acuracia_teste"]
+
+
+def reportar_metricas(y_test: np.ndarray, y_pred: np.ndarray, label_encoder: object) -> float:
+    """Imprime acurácia, relatório de classificação e matriz de confusão.
+
+    Args:
+        y_test: Target de teste codificado.
+        y_pred: Predições do modelo para o teste.
+        label_encoder: LabelEncoder do target (nomes das classes).
+
+    Returns:
+        Acurácia no conjunto de teste.
+    """
+    acc_test = accuracy_score(y_test, y_pred)
+
+    print("\n" + "=" * 60)
+    print("MÉTRICAS NO CONJUNTO DE TESTE")
+    print("=" * 60)
+    print(f"\n>>> ACURÁCIA: {acc_test:.4f} ({acc_test * 100:.2f}%) <<<")
+
+    if acc_test >= META_ACURACIA:
+        print("✅ Meta de 75% ATINGIDA!")
+    else:
+        print("⚠️ Meta de 75% NÃO atingida - considere ajustar hiperparâmetros")
+
+    print("\nRelatório de Classificação:")
+    print(
+        classification_report(
+            y_test, y_pred, labels=np.arange(len(label_encoder.classes_)), target_names=label_encoder.classes_
+        )
+    )
+
+    print("Matriz de Confusão:")
+    cm = confusion_matrix(y_test, y_pred)
+    print(cm)
+    return acc_test
+
+
 def treinar_modelo(
-    X: pd.DataFrame, y: pd.Series
+    X: pd.DataFrame,
+    y: pd.Series,
+    buscar: bool = False,
+    n_candidatos: int = N_CANDIDATOS,
+    acuracia_minima: float = META_ACURACIA,
+    compactar: Optional[float] = None,
 ) -> tuple[RandomForestClassifier, object, object]:
     """Treina o modelo com validação cruzada.
 
     Args:
         X: DataFrame com features.
         y: Series com target.
+        buscar: Se True, escolhe os hiperparâmetros com
+            ``buscar_hiperparametros`` em vez de usar ``PARAMETROS_MODELO``.
+        n_candidatos: Candidatos avaliados na busca.
+        acuracia_minima: Meta de acurácia usada na escolha da busca.
+        compactar: Tolerância de acurácia para ``compactar_modelo``; se None,
+            a floresta completa é mantida.
 
     Returns:
         Tupla com modelo treinado, preprocessor e label_encoder.
@@ -92,60 +262,63 @@ def treinar_modelo(
     y_encoded = label_encoder.fit_transform(y)
     print(f"     - Classes: {list(label_encoder.classes_)}")
 
-    # Split estratificado
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_encoded
+    # Split estratificado (por posições, para endereçar o cache de pré-processamento)
+    idx_train, idx_test = train_test_split(
+        np.arange(len(X)), test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_encoded
     )
-    print(f"     - Treino: {len(X_train)} | Teste: {len(X_test)}")
-
-    # Preprocessor
-    preprocessor = obter_preprocessor()
-    X_train_processed = preprocessor.fit_transform(X_train)
-    X_test_processed = preprocessor.transform(X_test)
+    y_train, y_test = y_encoded[idx_train], y_encoded[idx_test]
+    print(f"     - Treino: {len(idx_train)} | Teste: {len(idx_test)}")
+
+    # Preprocessor (fit/transform reaproveitados de execuções anteriores)
+    cache = CachePreprocessamento()
+    impressao = impressao_digital(X)
+    with medir("treino.preprocessamento"):
+        preprocessor, X_train_processed, (X_test_processed,) = cache.ajustar_transformar(
+            obter_preprocessor(), X, idx_train, [idx_test], impressao=impressao
+        )
     print(f"     - Features após preprocessing: {X_train_processed.shape[1]}")
 
     # Modelo
-    print("\n[3/5] Treinando RandomForestClassifier...")
-    modelo = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=20,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=RANDOM_STATE,
-        n_jobs=-1,
-        class_weight="balanced",
-    )
-
-    # Validação cruzada
+    parametros = dict(PARAMETROS_MODELO)
+    if buscar:
+        with medir("treino.busca_hiperparametros"):
+            parametros.update(buscar_hiperparametros(X_train_processed, y_train, n_candidatos, acuracia_minima))
+    else:
+        print("\n[3/5] Treinando RandomForestClassifier...")
+    modelo = RandomForestClassifier(**parametros, random_state=RANDOM_STATE, n_jobs=-1)
+
+    # Validação cruzada: o preprocessor é ajustado apenas no treino de cada fold
     print("\n[4/5] Validação cruzada (5-fold)...")
     cv = StratifiedKFold(n_splits=N_FOLDS, shuffle=True, random_state=RANDOM_STATE)
-    cv_scores = cross_val_score(modelo, X_train_processed, y_train, cv=cv, scoring="accuracy")
+    cv_scores = []
+    for fold_treino, fold_validacao in cv.split(idx_train, y_train):
+        with medir("treino.validacao_cruzada.preprocessamento"):
+            _, X_fold, (X_validacao,) = cache.ajustar_transformar(
+                obter_preprocessor(), X, idx_train[fold_treino], [idx_train[fold_validacao]], impressao=impressao
+            )
+        with medir("treino.validacao_cruzada.fit"):
+            modelo_fold = clone(modelo).fit(X_fold, y_train[fold_treino])
+        with medir("treino.validacao_cruzada.predict"):
+            cv_scores.append(accuracy_score(y_train[fold_validacao], modelo_fold.predict(X_validacao)))
+    cv_scores = np.asarray(cv_scores)
     print(f"     - Scores por fold: {[f'{s:.4f}' for s in cv_scores]}")
     print(f"     - Acurácia CV média: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+    print(f"     - Cache de pré-processamento: {cache.acertos} acertos, {cache.falhas} falhas")
 
     # Treinamento final
-    modelo.fit(X_train_processed, y_train)
+    with medir("treino.fit"):
+        modelo.fit(X_train_processed, y_train)
 
     # Avaliação no conjunto de teste
-    y_pred = modelo.predict(X_test_processed)
-    acc_test = accuracy_score(y_test, y_pred)
+    with medir("treino.predict_teste"):
+        y_pred = modelo.predict(X_test_processed)
+    acc_test = reportar_metricas(y_test, y_pred, label_encoder)
 
-    print("\n" + "=" * 60)
-    print("MÉTRICAS NO CONJUNTO DE TESTE")
-    print("=" * 60)
-    print(f"\n>>> ACURÁCIA: {acc_test:.4f} ({acc_test * 100:.2f}%) <<<")
-
-    if acc_test >= 0.75:
-        print("✅ Meta de 75% ATINGIDA!")
-    else:
-        print("⚠️ Meta de 75% NÃO atingida - considere ajustar hiperparâmetros")
-
-    print("\nRelatório de Classificação:")
-    print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
-
-    print("Matriz de Confusão:")
-    cm = confusion_matrix(y_test, y_pred)
-    print(cm)
+    if compactar is not None:
+        with medir("treino.compactacao"):
+            modelo, acc_test = compactar_modelo(
+                modelo, X_train_processed, y_train, X_test_processed, y_test, compactar
+            )
 
     # Retornar pipeline completo para serialização
     from sklearn.pipeline import Pipeline
@@ -158,29 +331,262 @@ def treinar_modelo(
     return pipeline_completo, label_encoder, acc_test
 
 
-def salvar_artefatos(pipeline: object, label_encoder: object) -> None:
+def treinar_modelo_fora_da_memoria(
+    chunk_size: int = CHUNK_SIZE_FORA_MEMORIA, caminho: Path = DATA_PATH
+) -> tuple[object, object, float]:
+    """Treina o modelo lendo o dataset em blocos (``treinamento_fora_memoria.py``).
+
+    Não há validação cruzada: uma amostra do arquivo fica para teste, o
+    restante é espalhado em baldes que treinam sub-florestas, e as
+    sub-florestas são unidas no final.
+
+    Args:
+        chunk_size: Linhas por bloco; define o pico de memória.
+        caminho: Arquivo CSV ou Parquet com o esquema de ``Obesity.csv``
+            (por exemplo, o de ``dataset_colunar.py`` ou ``gerador_sintetico.py``).
+
+    Returns:
+        Tupla com pipeline completo, label_encoder e acurácia de teste.
+    """
+    print("=" * 60)
+    print("FASE 3: TREINAMENTO OUT-OF-CORE (BLOCOS)")
+    print("=" * 60)
+
+    print(f"\n[1/5] Varredura e treino por blocos de {chunk_size} linhas ({caminho.name})...")
+    inicio = time.perf_counter()
+    with medir("treino.fora_da_memoria"):
+        pipeline, label_encoder, X_test, y_test, varredura = treinar_fora_da_memoria(
+            caminho, PARAMETROS_MODELO, chunk_size, TEST_SIZE, random_state=RANDOM_STATE
+        )
+    modelo = pipeline.named_steps["classifier"]
+    print(f"     - Registros: {varredura.linhas} ({varredura.duplicatas} duplicatas)")
+    print(f"     - Blocos: {varredura.blocos} | Árvores: {modelo.n_estimators}")
+    print(f"     - Classes: {list(label_encoder.classes_)}")
+    print(f"     - Teste: {len(y_test)}")
+    print(f"     - Tempo: {time.perf_counter() - inicio:.1f}s")
+
+    with medir("treino.predict_teste"):
+        y_pred = modelo.predict(X_test)
+    acc_test = reportar_metricas(y_test, y_pred, label_encoder)
+    return pipeline, label_encoder, acc_test
+
+
+def treinar_modelo_incremental(
+    caminho: Path,
+    novas_arvores: int = NOVAS_ARVORES,
+    aposentar: int = 0,
+    coluna_rotulo: str = TARGET_COLUMN,
+    desde: Optional[str] = None,
+) -> tuple[object, object, float, bool]:
+    """Cresce o modelo salvo com registros novos (``treinamento_incremental.py``).
+
+    O pré-processador e o encoder salvos ficam congelados; não há validação
+    cruzada, apenas um holdout dos registros novos. A versão gerada é
+    gravada em ``modelos/`` mesmo quando não é promovida.
+
+    Args:
+        caminho: Arquivo com registros rotulados ou diretório da auditoria.
+        novas_arvores: Árvores a acrescentar.
+        aposentar: Árvores mais antigas a remover.
+        coluna_rotulo: Coluna do rótulo confirmado, quando ``caminho`` é a auditoria.
+        desde: Início (ISO 8601, UTC) dos eventos da auditoria.
+
+    Returns:
+        Tupla com pipeline atualizado, label_encoder, acurácia no holdout e
+        se a versão deve ser promovida a modelo em produção.
+    """
+    from artefatos import carregar_artefatos
+    from auditoria import identificar_modelo
+    from treinamento_incremental import carregar_registros, crescer_floresta, salvar_versao
+
+    print("=" * 60)
+    print("FASE 3: RETREINO INCREMENTAL")
+    print("=" * 60)
+
+    print(f"\n[1/5] Carregando registros novos ({caminho})...")
+    inicio_desde = datetime.fromisoformat(desde) if desde else None
+    if inicio_desde is not None and inicio_desde.tzinfo is None:
+        inicio_desde = inicio_desde.replace(tzinfo=timezone.utc)
+    with medir("treino.incremental.carregar"):
+        df = carregar_registros(caminho, coluna_rotulo, inicio_desde)
+        pipeline, label_encoder = carregar_artefatos(MODEL_PATH, ENCODER_PATH)
+    print(f"     - Registros novos: {len(df)}")
+    print(f"     - Árvores atuais: {pipeline.named_steps['classifier'].n_estimators}")
+
+    print(f"\n[2/5] Treinando {novas_arvores} árvores novas (pré-processador congelado)...")
+    with medir("treino.incremental.crescer"):
+        atualizado, resultado = crescer_floresta(pipeline, label_encoder, df, novas_arvores, aposentar)
+    print(f"     - Treino: {resultado.registros_treino} | Holdout: {resultado.registros_holdout}")
+    print(f"     - Aposentadas: {resultado.arvores_aposentadas} | Total: {resultado.arvores_total}")
+    print(f"     - Tempo: {resultado.segundos:.2f}s")
+
+    print("\n[3/5] Avaliação no holdout dos registros novos...")
+    print(f"     - Modelo atual: {resultado.acuracia_anterior * 100:.2f}%")
+    print(f"     - Modelo atualizado: {resultado.acuracia_nova * 100:.2f}%")
+
+    print("\n[4/5] Versionando...")
+    with medir("treino.incremental.versionar"):
+        destino = salvar_versao(atualizado, label_encoder, resultado, identificar_modelo(MODEL_PATH, ENCODER_PATH))
+    print(f"     - Versão salva: {destino}")
+    if not resultado.promovido:
+        print("     - Acurácia caiu além da tolerância: o modelo em produção não será substituído")
+    return atualizado, label_encoder, resultado.acuracia_nova, resultado.promovido
+
+
+def salvar_artefatos(
+    pipeline: object,
+    label_encoder: object,
+    exportar_mmap: bool = False,
+    exportar_binario: bool = False,
+) -> None:
     """Serializa modelo e encoder para arquivos pickle.
 
     Args:
         pipeline: Pipeline completo (preprocessor + modelo).
         label_encoder: LabelEncoder do target.
+        exportar_mmap: Se True, grava também o layout memory-mapped da
+            floresta, compartilhável entre processos de serving.
+        exportar_binario: Se True, grava também ``modelo.bin`` no formato
+            binário compacto (``formato_binario.py``).
     """
     print("\n[5/5] Salvando artefatos...")
 
-    joblib.dump(pipeline, MODEL_PATH)
+    with medir("treino.salvar.joblib"):
+        joblib.dump(pipeline, MODEL_PATH)
+        joblib.dump(label_encoder, ENCODER_PATH)
     print(f"     - Modelo salvo: {MODEL_PATH}")
-
-    joblib.dump(label_encoder, ENCODER_PATH)
     print(f"     - Encoder salvo: {ENCODER_PATH}")
 
+    if exportar_mmap:
+        with medir("treino.salvar.mmap"):
+            versao = salvar_modelo_mmap(pipeline, MMAP_DIR, MODEL_PATH)
+        print(f"     - Layout memory-mapped salvo: {versao}")
+
+    if exportar_binario:
+        from formato_binario import exportar_binario as gravar_binario
+
+        with medir("treino.salvar.binario"):
+            resumo = gravar_binario(pipeline, label_encoder, BINARIO_PATH, MODEL_PATH)
+        print(f"     - Formato binário salvo: {BINARIO_PATH} ({resumo['tamanho_bytes'] / 1024:.0f} KB)")
+
 
 def main() -> None:
     """Executa o pipeline completo de treinamento."""
-    X, y = preparar_dados()
-    pipeline, label_encoder, acc = treinar_modelo(X, y)
-    salvar_artefatos(pipeline, label_encoder)
+    parser = argparse.ArgumentParser(description="Treinamento do modelo de obesidade")
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Grava também o layout memory-mapped da floresta para serving multi-processo",
+    )
+    parser.add_argument(
+        "--binario",
+        action="store_true",
+        help="Grava também modelo.bin no formato binário compacto",
+    )
+    parser.add_argument(
+        "--busca",
+        action="store_true",
+        help="Escolhe os hiperparâmetros com successive halving antes do treino final",
+    )
+    parser.add_argument("--candidatos", type=int, default=N_CANDIDATOS, help="Candidatos da busca")
+    parser.add_argument(
+        "--acuracia-minima",
+        type=float,
+        default=META_ACURACIA,
+        help="Acurácia CV mínima; a busca escolhe o modelo mais barato que a atinge",
+    )
+    parser.add_argument(
+        "--compactar",
+        nargs="?",
+        type=float,
+        const=TOLERANCIA_COMPACTACAO,
+        metavar="TOLERANCIA",
+        help="Reduz árvores e profundidade mantendo a acurácia OOB de validação dentro da tolerância "
+        f"(padrão: {TOLERANCIA_COMPACTACAO})",
+    )
+    parser.add_argument(
+        "--fora-da-memoria",
+        action="store_true",
+        help="Lê o dataset em blocos e une sub-florestas (pico de memória limitado pelo bloco)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE_FORA_MEMORIA,
+        help="Linhas por bloco no modo --fora-da-memoria",
+    )
+    parser.add_argument(
+        "--dados",
+        type=Path,
+        metavar="CAMINHO",
+        help=f"CSV ou Parquet com o esquema de Obesity.csv lido no modo --fora-da-memoria (padrão: {DATA_PATH.name})",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=Path,
+        metavar="CAMINHO",
+        help="Cresce o modelo salvo com registros novos (arquivo rotulado ou diretório da auditoria)",
+    )
+    parser.add_argument(
+        "--novas-arvores", type=int, default=NOVAS_ARVORES, help="Árvores acrescentadas no modo --incremental"
+    )
+    parser.add_argument(
+        "--aposentar", type=int, default=0, help="Árvores mais antigas removidas no modo --incremental"
+    )
+    parser.add_argument(
+        "--coluna-rotulo",
+        default=TARGET_COLUMN,
+        help="Coluna do diagnóstico confirmado na auditoria (modo --incremental)",
+    )
+    parser.add_argument("--desde", help="Início dos eventos da auditoria, ISO 8601 UTC (modo --incremental)")
+    parser.add_argument(
+        "--sem-metricas",
+        action="store_true",
+        help=f"Desliga a instrumentação e não grava {METRICAS_PATH.name}",
+    )
+    args = parser.parse_args()
+    if args.sem_metricas:
+        REGISTRO.ativo = False
+
+    if args.dados is not None and not args.fora_da_memoria:
+        parser.error("--dados só é usado com --fora-da-memoria")
+
+    modo = "incremental" if args.incremental else "fora_da_memoria" if args.fora_da_memoria else "padrao"
+    promover = True
+    with medir("treino.total"):
+        if args.incremental:
+            if args.busca or args.compactar is not None or args.fora_da_memoria:
+                parser.error("--incremental não é compatível com --busca, --compactar nem --fora-da-memoria")
+            pipeline, label_encoder, acc, promover = treinar_modelo_incremental(
+                args.incremental, args.novas_arvores, args.aposentar, args.coluna_rotulo, args.desde
+            )
+        elif args.fora_da_memoria:
+            if args.busca or args.compactar is not None:
+                parser.error("--fora-da-memoria não é compatível com --busca nem --compactar")
+            pipeline, label_encoder, acc = treinar_modelo_fora_da_memoria(args.chunk_size, args.dados or DATA_PATH)
+        else:
+            X, y = preparar_dados()
+            pipeline, label_encoder, acc = treinar_modelo(
+                X,
+                y,
+                buscar=args.busca,
+                n_candidatos=args.candidatos,
+                acuracia_minima=args.acuracia_minima,
+                compactar=args.compactar,
+            )
+        if promover:
+            salvar_artefatos(pipeline, label_encoder, exportar_mmap=args.mmap, exportar_binario=args.binario)
+
+    if REGISTRO.ativo:
+        REGISTRO.salvar_resumo(METRICAS_PATH, modo=modo, acuracia_teste=acc)
+        print(f"     - Tempos por etapa salvos: {METRICAS_PATH}")
 
     print("\n" + "=" * 60)
+    if not promover:
+        print("VERSÃO NÃO PROMOVIDA: O MODELO EM PRODUÇÃO FOI MANTIDO")
+        print(f"Acurácia no holdout: {acc * 100:.2f}%")
+        print("=" * 60)
+        sys.exit(1)
     print("TREINAMENTO CONCLUÍDO COM SUCESSO!")
     print(f"Acurácia final: {acc * 100:.2f}%")
     print("=" * 60)
@@ -0,0 +1,115 @@
+"""Agregados pré-calculados para o dashboard analítico.
+
+Contagens por classe, tabelas cruzadas das variáveis categóricas, quantis
+por classe das variáveis numéricas e a matriz de correlação são calculados
+uma única vez por versão do dataset e gravados em disco, indexados pelo
+hash SHA-256 do conteúdo de ``Obesity.csv``. Os reruns do dashboard passam
+a custar uma consulta em vez de uma varredura completa.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+import pandas as pd
+
+from artefatos import CACHE_DIR, DATA_PATH, carregar_preprocessing, hash_conteudo
+from dataset_colunar import caminho_dataset
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+carregar_dados = preprocessing_module.carregar_dados
+criar_bmi = preprocessing_module.criar_bmi
+
+AGREGADOS_DIR = CACHE_DIR / "agregados"
+VERSAO_AGREGADOS = 1
+COLUNAS_CORRELACAO: List[str] = ["Age", "Height", "Weight", BMI_COLUMN, "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+QUANTIS = {"minimo": 0.0, "q1": 0.25, "mediana": 0.5, "q3": 0.75, "maximo": 1.0}
+
+
+def _quantis_por_classe(df: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Estatísticas de box plot por classe (quartis e limites de 1.5 IQR)."""
+    grupos = df.groupby(TARGET_COLUMN, observed=True)[coluna]
+    resumo = pd.DataFrame({nome: grupos.quantile(q) for nome, q in QUANTIS.items()})
+    resumo["media"] = grupos.mean()
+
+    iqr = resumo["q3"] - resumo["q1"]
+    limites = pd.DataFrame({"baixo": resumo["q1"] - 1.5 * iqr, "alto": resumo["q3"] + 1.5 * iqr})
+    dados = df[[TARGET_COLUMN, coluna]].join(limites, on=TARGET_COLUMN)
+    dentro = dados[(dados[coluna] >= dados["baixo"]) & (dados[coluna] <= dados["alto"])]
+    # Bigodes no menor/maior valor observado dentro de 1.5 IQR, como no px.box
+    resumo["limite_inferior"] = dentro.groupby(TARGET_COLUMN, observed=True)[coluna].min()
+    resumo["limite_superior"] = dentro.groupby(TARGET_COLUMN, observed=True)[coluna].max()
+    return resumo
+
+
+def calcular_agregados(df: pd.DataFrame) -> Dict[str, object]:
+    """Calcula todos os agregados usados pelo dashboard.
+
+    Args:
+        df: Dataset sem duplicatas e com a coluna BMI.
+
+    Returns:
+        Dicionário com ``total``, ``contagem_classes`` (ordenada por
+        frequência), ``ordem_classes``, ``tabelas_cruzadas`` (por variável
+        categórica), ``quantis`` (por variável numérica) e ``correlacao``.
+    """
+    contagem = df[TARGET_COLUMN].value_counts().reset_index()
+    contagem.columns = ["Nível de Obesidade", "Quantidade"]
+
+    tabelas_cruzadas = {
+        coluna: df.groupby([coluna, TARGET_COLUMN], observed=True).size().reset_index(name="Quantidade")
+        for coluna in CATEGORICAL_FEATURES + ORDINAL_FEATURES
+    }
+    quantis = {coluna: _quantis_por_classe(df, coluna) for coluna in NUMERIC_FEATURES + [BMI_COLUMN]}
+
+    return {
+        "versao": VERSAO_AGREGADOS,
+        "total": len(df),
+        "contagem_classes": contagem,
+        "ordem_classes": contagem["Nível de Obesidade"].tolist(),
+        "tabelas_cruzadas": tabelas_cruzadas,
+        "quantis": quantis,
+        "correlacao": df[COLUNAS_CORRELACAO].corr(),
+    }
+
+
+def obter_agregados(caminho: Path = DATA_PATH, diretorio: Path = AGREGADOS_DIR) -> Dict[str, object]:
+    """Retorna os agregados do dataset, calculando-os apenas se necessário.
+
+    Args:
+        caminho: CSV do dataset.
+        diretorio: Diretório do armazenamento em disco.
+
+    Returns:
+        Dicionário de ``calcular_agregados`` acrescido de ``hash``.
+    """
+    chave = hash_conteudo(caminho)
+    arquivo = diretorio / f"{chave}.joblib"
+    if arquivo.exists():
+        agregados = joblib.load(arquivo)
+        if agregados.get("versao") == VERSAO_AGREGADOS:
+            return agregados
+
+    # A chave continua sendo o CSV; a leitura usa o arquivo colunar se atualizado
+    df = carregar_dados(caminho_dataset(caminho))
+    if BMI_COLUMN not in df:
+        df = criar_bmi(df)
+    agregados = calcular_agregados(df)
+    agregados["hash"] = chave
+
+    diretorio.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo.with_suffix(f".tmp{os.getpid()}")
+    joblib.dump(agregados, temporario)
+    os.replace(temporario, arquivo)
+    return agregados
+
+
+__all__ = ["AGREGADOS_DIR", "calcular_agregados", "obter_agregados"]
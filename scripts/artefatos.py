@@ -0,0 +1,281 @@
+"""Localização e carregamento dos artefatos do modelo de obesidade.
+
+Centraliza os caminhos do projeto e o carregamento do pipeline serializado
+para que a aplicação, os scripts de treinamento e as ferramentas de
+inferência em lote compartilhem a mesma lógica.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from time import time_ns
+from types import ModuleType
+from typing import Optional
+
+import joblib
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+DATA_PATH = PROJECT_ROOT / "data" / "Obesity.csv"
+MODEL_PATH = PROJECT_ROOT / "modelo.joblib"
+ENCODER_PATH = PROJECT_ROOT / "label_encoder.joblib"
+MMAP_DIR = PROJECT_ROOT / "modelo_mmap"
+BINARIO_PATH = PROJECT_ROOT / "modelo.bin"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+
+# Layout memory-mapped: cada versão fica em um subdiretório com um .npy por
+# array da floresta e um metadados.joblib pequeno; o arquivo ATUAL aponta
+# para a versão em uso e é trocado atomicamente.
+VERSAO_LAYOUT_MMAP = 1
+PONTEIRO_MMAP = "ATUAL"
+METADADOS_MMAP = "metadados.joblib"
+
+
+@lru_cache(maxsize=None)
+def carregar_preprocessing() -> ModuleType:
+    """Importa o módulo ``2_preprocessing.py``.
+
+    Python não permite importar módulos cujo nome começa com número, então
+    o arquivo é carregado via ``importlib`` (uma única vez por processo).
+
+    Returns:
+        Módulo com as definições de features e funções de preparação.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "preprocessing", SCRIPTS_DIR / "2_preprocessing.py"
+    )
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def carregar_artefatos(
+    model_path: Path = MODEL_PATH,
+    encoder_path: Path = ENCODER_PATH,
+) -> tuple[object, object]:
+    """Carrega o pipeline treinado e o encoder do target.
+
+    Args:
+        model_path: Caminho do pipeline serializado (preprocessor + modelo).
+        encoder_path: Caminho do LabelEncoder serializado.
+
+    Returns:
+        Tupla com pipeline e label_encoder.
+
+    Raises:
+        FileNotFoundError: Caso algum dos artefatos não exista.
+    """
+    for caminho in (model_path, encoder_path):
+        if not caminho.exists():
+            raise FileNotFoundError(f"Artefato não encontrado: {caminho}")
+
+    modelo = joblib.load(model_path)
+    encoder = joblib.load(encoder_path)
+    return modelo, encoder
+
+
+def hash_conteudo(caminho: Path, tamanho_bloco: int = 1 << 20) -> str:
+    """Calcula o SHA-256 do arquivo lendo-o em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _assinatura(caminho: Path) -> Optional[tuple[int, int]]:
+    if not caminho.exists():
+        return None
+    estado = caminho.stat()
+    return estado.st_size, estado.st_mtime_ns
+
+
+def salvar_modelo_mmap(
+    pipeline: object,
+    diretorio: Path = MMAP_DIR,
+    model_path: Path = MODEL_PATH,
+) -> Path:
+    """Grava a floresta em um layout que pode ser carregado com memory map.
+
+    Os arrays da floresta compilada são salvos como ``.npy`` em um novo
+    subdiretório; o ponteiro ``ATUAL`` só é trocado ao final, de forma
+    atômica, e versões antigas são removidas. Processos que já mapearam a
+    versão anterior continuam lendo os arquivos antigos até reiniciarem.
+
+    Args:
+        pipeline: Pipeline treinado (preprocessor + classifier).
+        diretorio: Diretório raiz do layout.
+        model_path: ``modelo.joblib`` correspondente; sua assinatura (tamanho
+            e mtime) é registrada para detectar layouts desatualizados.
+
+    Returns:
+        Caminho do subdiretório da versão gravada.
+    """
+    from floresta_compilada import exportar_arrays
+
+    floresta = pipeline.named_steps["classifier"]
+    arrays = exportar_arrays(floresta)
+
+    diretorio.mkdir(parents=True, exist_ok=True)
+    versao = diretorio / f"v{time_ns()}"
+    versao.mkdir()
+    for nome, valores in arrays.items():
+        np.save(versao / f"{nome}.npy", np.ascontiguousarray(valores))
+    joblib.dump(
+        {
+            "versao_layout": VERSAO_LAYOUT_MMAP,
+            "classes": floresta.classes_,
+            "preprocessor": pipeline.named_steps["preprocessor"],
+            "arrays": sorted(arrays),
+            "origem": _assinatura(model_path),
+        },
+        versao / METADADOS_MMAP,
+    )
+
+    temporario = diretorio / f"{PONTEIRO_MMAP}.tmp"
+    temporario.write_text(versao.name)
+    os.replace(temporario, diretorio / PONTEIRO_MMAP)
+
+    for antigo in diretorio.iterdir():
+        if antigo.is_dir() and antigo != versao:
+            shutil.rmtree(antigo, ignore_errors=True)
+    return versao
+
+
+def carregar_modelo_mmap(
+    diretorio: Path = MMAP_DIR,
+    model_path: Optional[Path] = MODEL_PATH,
+) -> Optional[object]:
+    """Carrega a floresta do layout memory-mapped, se existir e estiver atual.
+
+    Os arrays são abertos com ``mmap_mode="r"``: vários processos
+    compartilham as mesmas páginas (somente leitura) pelo page cache e nada
+    precisa ser desserializado além dos metadados.
+
+    Args:
+        diretorio: Diretório raiz do layout.
+        model_path: ``modelo.joblib`` de referência. Se ele existir e tiver
+            sido alterado depois da exportação, o layout é ignorado. Use
+            None para não verificar.
+
+    Returns:
+        FlorestaCompilada com o codificador compilado, ou None se não houver
+        um layout válido.
+    """
+    from codificador_compilado import CodificadorCompilado
+    from floresta_compilada import FlorestaCompilada
+
+    ponteiro = diretorio / PONTEIRO_MMAP
+    if not ponteiro.exists():
+        return None
+    versao = diretorio / ponteiro.read_text().strip()
+    metadados = joblib.load(versao / METADADOS_MMAP)
+    if metadados.get("versao_layout") != VERSAO_LAYOUT_MMAP:
+        return None
+    if model_path is not None and model_path.exists() and metadados["origem"] != _assinatura(model_path):
+        return None
+
+    arrays = {nome: np.load(versao / f"{nome}.npy", mmap_mode="r") for nome in metadados["arrays"]}
+    return FlorestaCompilada(
+        arrays,
+        metadados["classes"],
+        CodificadorCompilado.de_preprocessor(metadados["preprocessor"]),
+    )
+
+
+def binario_habilitado() -> bool:
+    """Indica se ``modelo.bin`` pode ser servido (``OBESIDADE_MODELO_BINARIO=1``).
+
+    O formato binário tem thresholds float32 e folhas quantizadas: prevê as
+    mesmas classes, mas as probabilidades diferem da floresta exata, por
+    isso fica desligado por padrão.
+    """
+    return os.environ.get("OBESIDADE_MODELO_BINARIO", "0").strip().lower() in {"1", "true", "sim", "on"}
+
+
+def compilar_pipeline(pipeline: object) -> object:
+    """Compila o pipeline sklearn exato em ``CodificadorCompilado`` + ``FlorestaCompilada``.
+
+    Args:
+        pipeline: Pipeline salvo por ``3_training.py``.
+
+    Returns:
+        FlorestaCompilada que aceita dicionários, arrays de registros ou
+        DataFrames.
+    """
+    from codificador_compilado import CodificadorCompilado
+    from floresta_compilada import FlorestaCompilada
+
+    return FlorestaCompilada.de_floresta(
+        pipeline.named_steps["classifier"],
+        CodificadorCompilado.de_preprocessor(pipeline.named_steps["preprocessor"]),
+    )
+
+
+def carregar_modelo_compilado(
+    model_path: Path = MODEL_PATH,
+    encoder_path: Path = ENCODER_PATH,
+    mmap_dir: Path = MMAP_DIR,
+    binario_path: Path = BINARIO_PATH,
+    binario: Optional[bool] = None,
+) -> tuple[object, object]:
+    """Carrega os artefatos e compila o pipeline para inferência de baixa latência.
+
+    O pré-processador vira um ``CodificadorCompilado`` e o RandomForest uma
+    ``FlorestaCompilada``; o resultado aceita dicionários, arrays de
+    registros ou DataFrames. Quando existe um layout memory-mapped atual
+    (ver ``salvar_modelo_mmap``) ele é usado no lugar do ``joblib.load``.
+    O formato binário compacto (``formato_binario.py``), aproximado, só é
+    tentado quando habilitado explicitamente.
+
+    Args:
+        model_path: Caminho do pipeline serializado (preprocessor + modelo).
+        encoder_path: Caminho do LabelEncoder serializado.
+        mmap_dir: Diretório do layout memory-mapped.
+        binario_path: Arquivo no formato binário compacto.
+        binario: Se True, usa ``binario_path`` quando atual; se None, segue
+            ``binario_habilitado``.
+
+    Returns:
+        Tupla com FlorestaCompilada e label_encoder.
+    """
+    modelo = carregar_modelo_mmap(mmap_dir, model_path)
+    if modelo is not None:
+        if not encoder_path.exists():
+            raise FileNotFoundError(f"Artefato não encontrado: {encoder_path}")
+        return modelo, joblib.load(encoder_path)
+
+    if binario_habilitado() if binario is None else binario:
+        from formato_binario import carregar_binario
+
+        carregado = carregar_binario(binario_path, model_path)
+        if carregado is not None:
+            return carregado
+
+    pipeline, encoder = carregar_artefatos(model_path, encoder_path)
+    return compilar_pipeline(pipeline), encoder
+
+
+__all__ = [
+    "PROJECT_ROOT",
+    "DATA_PATH",
+    "MODEL_PATH",
+    "ENCODER_PATH",
+    "MMAP_DIR",
+    "BINARIO_PATH",
+    "CACHE_DIR",
+    "carregar_preprocessing",
+    "hash_conteudo",
+    "carregar_artefatos",
+    "binario_habilitado",
+    "compilar_pipeline",
+    "carregar_modelo_compilado",
+    "salvar_modelo_mmap",
+    "carregar_modelo_mmap",
+]
@@ -0,0 +1,178 @@
+"""Atribuição exata das predições da floresta às variáveis do formulário.
+
+Cada árvore decompõe sua predição ao longo do caminho percorrido: a
+distribuição da raiz mais, em cada divisão, a variação da distribuição do
+nó pai para o filho, creditada à feature usada na divisão. A média dessas
+decomposições sobre as árvores é exata e aditiva: ``base`` mais a soma
+das contribuições é igual a ``predict_proba`` (a menos de arredondamento).
+
+As contribuições das colunas do ``ColumnTransformer`` (escalonadas,
+ordinais e one-hot) são somadas de volta às 16 variáveis do formulário e ao
+BMI. Como a soma por caminho depende só da folha atingida, ela é
+pré-calculada por folha em uma tabela (folha × classe × variável): atribuir
+é percorrer a floresta como na predição e somar uma linha da tabela por
+árvore.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from codificador_compilado import CodificadorCompilado
+from floresta_compilada import LINHAS_POR_BLOCO, FlorestaCompilada
+
+
+def _campos_das_features(codificador: CodificadorCompilado) -> Tuple[List[str], np.ndarray]:
+    """Variável de origem de cada coluna do vetor de features."""
+    campos: List[str] = []
+    origem = np.full(codificador.n_features, -1, dtype=np.intp)
+
+    def indice(nome: str) -> int:
+        if nome not in campos:
+            campos.append(nome)
+        return campos.index(nome)
+
+    for posicao, nome in enumerate(codificador.colunas_numericas):
+        origem[posicao] = indice(nome)
+    for deslocamento, nome in enumerate(codificador.colunas_ordinais):
+        origem[len(codificador.colunas_numericas) + deslocamento] = indice(nome)
+    for nome, tabela in zip(codificador.colunas_onehot, codificador.tabelas_onehot):
+        for posicao in tabela.values():
+            origem[posicao] = indice(nome)
+    return campos, origem
+
+
+class AtribuidorFloresta:
+    """Contribuições por variável para as predições de uma ``FlorestaCompilada``.
+
+    Attributes:
+        floresta: Floresta compilada usada para percorrer as árvores.
+        codificador: Codificador das variáveis de entrada.
+        campos: Variáveis de entrada (formulário e BMI), na ordem das
+            contribuições.
+        base: Média das distribuições das raízes, por classe.
+        classes_: Classes do classificador original.
+    """
+
+    def __init__(self, floresta: FlorestaCompilada, codificador: CodificadorCompilado) -> None:
+        self.floresta = floresta
+        self.codificador = codificador
+        self.classes_ = floresta.classes_
+        self.campos, origem = _campos_das_features(codificador)
+
+        valores = floresta.valores.astype(np.float64)
+        if floresta.quantizado:
+            valores /= valores.sum(axis=1, keepdims=True)
+        n_nos, n_classes = valores.shape
+        self.base = valores[floresta.raizes].mean(axis=0)
+
+        # Acumula a decomposição do caminho nível a nível, da raiz às folhas
+        acumulado = np.zeros((n_nos, n_classes, len(self.campos)))
+        nivel = np.asarray(floresta.raizes, dtype=np.intp)
+        esquerda = floresta.esquerda.astype(np.intp)
+        direita = floresta.direita.astype(np.intp)
+        while len(nivel):
+            pais = nivel[~floresta.folha[nivel]]
+            for filhos in (esquerda[pais], direita[pais]):
+                acumulado[filhos] = acumulado[pais]
+                campo = origem[floresta.feature[pais].astype(np.intp)]
+                acumulado[filhos, :, campo] += valores[filhos] - valores[pais]
+            nivel = np.concatenate([esquerda[pais], direita[pais]])
+
+        folhas = np.flatnonzero(floresta.folha)
+        self._tabela = np.ascontiguousarray(acumulado[folhas])
+        self._linha_da_folha = np.full(n_nos, -1, dtype=np.intp)
+        self._linha_da_folha[folhas] = np.arange(len(folhas))
+
+    @classmethod
+    def de_modelo(cls, modelo: object) -> "AtribuidorFloresta":
+        """Cria o atribuidor a partir do pipeline sklearn ou do motor compilado.
+
+        Args:
+            modelo: Pipeline salvo por ``3_training.py`` ou ``FlorestaCompilada``
+                (como devolvida por ``carregar_modelo_compilado``).
+
+        Returns:
+            Instância de AtribuidorFloresta.
+        """
+        if not isinstance(modelo, FlorestaCompilada):
+            modelo = FlorestaCompilada.de_pipeline(modelo)
+        codificador = modelo.preprocessor
+        if not isinstance(codificador, CodificadorCompilado):
+            codificador = CodificadorCompilado.de_preprocessor(codificador)
+        return cls(modelo, codificador)
+
+    def _percorrer(
+        self, X: object, todas_classes: bool, classe: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        floresta = self.floresta
+        matriz = self.codificador.transform(X)
+        n_amostras = len(matriz)
+        probas = np.zeros((n_amostras, len(self.base)))
+        if todas_classes:
+            contribuicoes = np.zeros((n_amostras, len(self.base), len(self.campos)))
+        else:
+            contribuicoes = np.zeros((n_amostras, len(self.campos)))
+
+        for inicio in range(0, n_amostras, LINHAS_POR_BLOCO):
+            bloco = slice(inicio, inicio + LINHAS_POR_BLOCO)
+            folhas = floresta.aplicar(matriz[bloco])
+            acumulado = probas[bloco]
+            for folhas_arvore in folhas:
+                acumulado += floresta.valores[folhas_arvore]
+            # Mesma normalização de predict_proba_matriz
+            if floresta.quantizado:
+                acumulado /= acumulado.sum(axis=1, keepdims=True)
+            else:
+                acumulado /= floresta.n_arvores
+
+            linhas = self._linha_da_folha[folhas]
+            soma = contribuicoes[bloco]
+            if todas_classes:
+                for linhas_arvore in linhas:
+                    soma += self._tabela[linhas_arvore]
+            else:
+                # As mesmas folhas definem a classe prevista: uma única passada
+                classes_bloco = acumulado.argmax(axis=1) if classe is None else classe[bloco]
+                for linhas_arvore in linhas:
+                    soma += self._tabela[linhas_arvore, classes_bloco]
+            soma /= floresta.n_arvores
+        return probas, contribuicoes
+
+    def contribuicoes(self, X: object) -> Tuple[np.ndarray, np.ndarray]:
+        """Contribuições de cada variável para todas as classes.
+
+        Args:
+            X: Dicionário de um paciente, array de registros ou DataFrame
+                (mesma entrada de ``predict_proba``).
+
+        Returns:
+            Tupla com as probabilidades (n_amostras, n_classes) e as
+            contribuições (n_amostras, n_classes, n_variaveis); para cada
+            classe, ``base + contribuicoes.sum(axis=-1) == probas``.
+        """
+        return self._percorrer(X, todas_classes=True)
+
+    def contribuicoes_classe(self, X: object, classe: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Contribuições para uma classe por amostra (a prevista, por padrão).
+
+        Indicado para lotes grandes: soma uma linha de ``n_variaveis`` por
+        árvore, em vez de uma matriz classe × variável.
+
+        Args:
+            X: Mesma entrada de ``predict_proba``.
+            classe: Índice (em ``classes_``) da classe de cada amostra; se
+                None, usa a classe prevista.
+
+        Returns:
+            Tupla com as probabilidades (n_amostras, n_classes) e as
+            contribuições (n_amostras, n_variaveis).
+        """
+        if classe is not None:
+            classe = np.asarray(classe, dtype=np.intp)
+        return self._percorrer(X, todas_classes=False, classe=classe)
+
+
+__all__ = ["AtribuidorFloresta"]
@@ -0,0 +1,352 @@
+"""Trilha de auditoria append-only dos diagnósticos do formulário.
+
+Cada diagnóstico vira uma linha JSON (JSON Lines) com carimbo de tempo UTC,
+versão do modelo, as entradas do paciente, o BMI calculado, a classe
+prevista e a probabilidade de cada classe (``proba_<classe>``).
+
+A gravação nunca bloqueia a thread da requisição: ``registrar`` só coloca o
+evento em um buffer circular em memória, e uma thread de segundo plano
+grava os eventos acumulados em um único ``write`` a cada
+``intervalo`` segundos (ou antes, quando o buffer passa da metade). O
+arquivo ativo, ``auditoria.jsonl``, é rotacionado ao passar de
+``tamanho_maximo`` bytes para ``auditoria-<carimbo UTC>.jsonl``. Se o disco
+não acompanhar e o buffer encher, os eventos mais antigos são descartados e
+contados em ``descartados`` (e no contador ``auditoria_descartados_total``).
+
+A leitura (``ler_auditoria``/``iterar_auditoria``) percorre os arquivos em
+ordem cronológica, pulando os rotacionados anteriores ao início pedido, e
+serve de entrada para o retreino (``como_dataset``) e para a análise de
+drift (``monitor_da_auditoria``). Configuração por ambiente:
+``OBESIDADE_AUDITORIA=0`` desliga, ``OBESIDADE_AUDITORIA_DIR`` e
+``OBESIDADE_AUDITORIA_INTERVALO`` (segundos) ajustam destino e intervalo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from artefatos import ENCODER_PATH, MODEL_PATH, PROJECT_ROOT, hash_conteudo
+from instrumentacao import contar
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+AUDITORIA_DIR = PROJECT_ROOT / "auditoria"
+ARQUIVO_ATIVO = "auditoria.jsonl"
+PREFIXO_ROTACIONADO = "auditoria-"
+FORMATO_CARIMBO = "%Y%m%dT%H%M%S%fZ"
+CAPACIDADE = 10_000
+INTERVALO_FLUSH = 1.0
+TAMANHO_MAXIMO = 64 * 2**20
+PREFIXO_PROBA = "proba_"
+COLUNA_PREDICAO = "predicao"
+
+
+def auditoria_ativa() -> bool:
+    """Indica se a auditoria está ligada (``OBESIDADE_AUDITORIA``)."""
+    return os.environ.get("OBESIDADE_AUDITORIA", "1").strip().lower() not in {"0", "false", "nao", "não", "off"}
+
+
+def identificar_modelo(modelo: Path = MODEL_PATH, encoder: Path = ENCODER_PATH) -> str:
+    """Versão do modelo: prefixo do SHA-256 do conteúdo dos artefatos."""
+    return "-".join(hash_conteudo(caminho)[:12] for caminho in (modelo, encoder) if caminho.exists())
+
+
+def montar_evento(
+    dados: Mapping[str, object],
+    predicao: str,
+    probabilidades: Sequence[float],
+    classes: Sequence[str],
+    versao_modelo: str,
+) -> Dict[str, object]:
+    """Monta o evento de auditoria de um diagnóstico.
+
+    Args:
+        dados: Entradas do paciente, incluindo o BMI calculado.
+        predicao: Classe prevista.
+        probabilidades: Probabilidade de cada classe, na ordem de ``classes``.
+        classes: Nomes das classes.
+        versao_modelo: Identificação do modelo (``identificar_modelo``).
+
+    Returns:
+        Dicionário plano, pronto para uma linha JSON.
+    """
+    evento: Dict[str, object] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "versao_modelo": versao_modelo,
+    }
+    evento.update(dados)
+    evento[COLUNA_PREDICAO] = predicao
+    for classe, proba in zip(classes, probabilidades):
+        evento[PREFIXO_PROBA + classe] = float(proba)
+    return evento
+
+
+class RegistroAuditoria:
+    """Gravador assíncrono da trilha de auditoria.
+
+    Attributes:
+        diretorio: Diretório dos arquivos de auditoria.
+        intervalo: Segundos entre gravações.
+        tamanho_maximo: Bytes do arquivo ativo que disparam a rotação.
+        gravados: Eventos gravados em disco.
+        descartados: Eventos perdidos por buffer cheio.
+    """
+
+    def __init__(
+        self,
+        diretorio: Path = AUDITORIA_DIR,
+        capacidade: int = CAPACIDADE,
+        intervalo: float = INTERVALO_FLUSH,
+        tamanho_maximo: int = TAMANHO_MAXIMO,
+    ) -> None:
+        self.diretorio = Path(diretorio)
+        self.intervalo = intervalo
+        self.tamanho_maximo = tamanho_maximo
+        self.gravados = 0
+        self.descartados = 0
+        self._buffer: deque = deque(maxlen=capacidade)
+        self._limiar = max(capacidade // 2, 1)
+        self._condicao = threading.Condition()
+        # Serializa drenagem e escrita, preservando a ordem dos eventos
+        self._lock_arquivo = threading.Lock()
+        self._arquivo = None
+        self._parar = False
+        self._thread = threading.Thread(target=self._executar, name="auditoria", daemon=True)
+        self._thread.start()
+        atexit.register(self.fechar)
+
+    def registrar(self, evento: Mapping[str, object]) -> None:
+        """Enfileira um evento (não toca o disco)."""
+        with self._condicao:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.descartados += 1
+                contar("auditoria_descartados_total")
+            self._buffer.append(evento)
+            if len(self._buffer) >= self._limiar:
+                self._condicao.notify()
+
+    def descarregar(self) -> None:
+        """Grava imediatamente os eventos pendentes (bloqueia quem chama)."""
+        with self._lock_arquivo:
+            with self._condicao:
+                eventos = list(self._buffer)
+                self._buffer.clear()
+            if eventos:
+                self._gravar(eventos)
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e encerra a thread de escrita."""
+        with self._condicao:
+            if self._parar:
+                return
+            self._parar = True
+            self._condicao.notify()
+        self._thread.join()
+        self.descarregar()
+        with self._lock_arquivo:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                if not self._parar and len(self._buffer) < self._limiar:
+                    self._condicao.wait(self.intervalo)
+                parar = self._parar
+            try:
+                self.descarregar()
+            except OSError:
+                # Falha de disco não derruba a thread; os eventos do lote se perdem
+                contar("auditoria_erros_total")
+            if parar:
+                return
+
+    def _gravar(self, eventos: List[Mapping[str, object]]) -> None:
+        conteudo = "".join(
+            json.dumps(evento, ensure_ascii=False, separators=(",", ":")) + "\n" for evento in eventos
+        ).encode("utf-8")
+        if self._arquivo is None:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            self._arquivo = open(self.diretorio / ARQUIVO_ATIVO, "ab")
+        if self._arquivo.tell() and self._arquivo.tell() + len(conteudo) > self.tamanho_maximo:
+            self._rotacionar()
+        self._arquivo.write(conteudo)
+        self._arquivo.flush()
+        self.gravados += len(eventos)
+
+    def _rotacionar(self) -> None:
+        self._arquivo.close()
+        carimbo = datetime.now(timezone.utc).strftime(FORMATO_CARIMBO)
+        os.replace(self.diretorio / ARQUIVO_ATIVO, self.diretorio / f"{PREFIXO_ROTACIONADO}{carimbo}.jsonl")
+        self._arquivo = open(self.diretorio / ARQUIVO_ATIVO, "ab")
+
+
+def arquivos_auditoria(diretorio: Path = AUDITORIA_DIR, inicio: Optional[datetime] = None) -> List[Path]:
+    """Arquivos de auditoria em ordem cronológica (rotacionados e o ativo).
+
+    Args:
+        diretorio: Diretório dos arquivos.
+        inicio: Se informado (UTC), omite os rotacionados antes dele; o
+            carimbo do nome é o instante da rotação, posterior a todos os
+            eventos do arquivo.
+
+    Returns:
+        Caminhos existentes, do mais antigo ao ativo.
+    """
+    diretorio = Path(diretorio)
+    arquivos = []
+    for caminho in sorted(diretorio.glob(f"{PREFIXO_ROTACIONADO}*.jsonl")):
+        carimbo = datetime.strptime(caminho.stem[len(PREFIXO_ROTACIONADO):], FORMATO_CARIMBO)
+        if inicio is None or carimbo.replace(tzinfo=timezone.utc) >= inicio:
+            arquivos.append(caminho)
+    ativo = diretorio / ARQUIVO_ATIVO
+    if ativo.exists():
+        arquivos.append(ativo)
+    return arquivos
+
+
+def _ler_arquivo(caminho: Path) -> "pd.DataFrame":
+    import pandas as pd
+
+    conteudo = caminho.read_bytes()
+    # O arquivo ativo pode ter uma escrita em andamento: só linhas completas
+    conteudo = conteudo[: conteudo.rfind(b"\n") + 1]
+    if not conteudo:
+        return pd.DataFrame()
+    df = pd.read_json(io.BytesIO(conteudo), lines=True, engine="pyarrow")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
+    return df
+
+
+def iterar_auditoria(
+    diretorio: Path = AUDITORIA_DIR,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+) -> Iterator["pd.DataFrame"]:
+    """Percorre a auditoria arquivo a arquivo (memória limitada a um arquivo).
+
+    Args:
+        diretorio: Diretório dos arquivos.
+        inicio: Primeiro instante incluído (UTC), opcional.
+        fim: Último instante incluído (UTC), opcional.
+
+    Yields:
+        Um DataFrame por arquivo, com os eventos do intervalo pedido.
+    """
+    for caminho in arquivos_auditoria(diretorio, inicio):
+        df = _ler_arquivo(caminho)
+        if df.empty:
+            continue
+        if inicio is not None:
+            df = df[df["timestamp"] >= inicio]
+        if fim is not None:
+            df = df[df["timestamp"] <= fim]
+        if not df.empty:
+            yield df
+
+
+def ler_auditoria(
+    diretorio: Path = AUDITORIA_DIR,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+) -> "pd.DataFrame":
+    """Lê a auditoria inteira (ou um intervalo) em um DataFrame."""
+    import pandas as pd
+
+    blocos = list(iterar_auditoria(diretorio, inicio, fim))
+    return pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame()
+
+
+def como_dataset(df: "pd.DataFrame", coluna_rotulo: str = COLUNA_PREDICAO) -> "pd.DataFrame":
+    """Converte eventos de auditoria para o esquema de ``Obesity.csv``.
+
+    Args:
+        df: Eventos lidos por ``ler_auditoria``.
+        coluna_rotulo: Coluna usada como target. O padrão é a classe
+            prevista; para retreino supervisionado, junte aos eventos uma
+            coluna com o diagnóstico confirmado e informe-a aqui.
+
+    Returns:
+        DataFrame com as colunas do dataset original e o target.
+    """
+    from monitor_drift import CATEGORICAL_FEATURES, NUMERIC_FEATURES, ORDINAL_FEATURES, TARGET_COLUMN
+
+    colunas = NUMERIC_FEATURES + CATEGORICAL_FEATURES + ORDINAL_FEATURES
+    dataset = df[colunas].copy()
+    dataset[TARGET_COLUMN] = df[coluna_rotulo].to_numpy()
+    return dataset
+
+
+def monitor_da_auditoria(df: "pd.DataFrame", dataset: Path):
+    """Monta um ``MonitorDrift`` com os eventos de auditoria como fluxo atual.
+
+    Args:
+        df: Eventos lidos por ``ler_auditoria``.
+        dataset: CSV de treino usado como base.
+
+    Returns:
+        Monitor pronto para ``relatorio()``.
+    """
+    from monitor_drift import criar_monitor
+
+    monitor = criar_monitor(dataset)
+    monitor.registrar_lote(df, df[COLUNA_PREDICAO].to_numpy())
+    return monitor
+
+
+def main() -> None:
+    """Resume a auditoria e, opcionalmente, exporta o dataset ou o drift."""
+    from artefatos import DATA_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--diretorio", type=Path, default=AUDITORIA_DIR, help="Diretório da auditoria")
+    parser.add_argument("--desde", type=datetime.fromisoformat, help="Início do intervalo (ISO 8601, UTC)")
+    parser.add_argument("--exportar", type=Path, help="Grava os eventos no esquema do dataset (CSV ou Parquet)")
+    parser.add_argument("--drift", action="store_true", help="Compara os eventos com o dataset de treino")
+    args = parser.parse_args()
+    desde = args.desde.replace(tzinfo=args.desde.tzinfo or timezone.utc) if args.desde else None
+
+    print("=" * 60)
+    print("TRILHA DE AUDITORIA")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    df = ler_auditoria(args.diretorio, desde)
+    print(f"     - Arquivos: {len(arquivos_auditoria(args.diretorio, desde))}")
+    print(f"     - Eventos: {len(df)} (leitura em {time.perf_counter() - inicio:.2f} s)")
+    if df.empty:
+        return
+    print(f"     - Período: {df['timestamp'].min()} a {df['timestamp'].max()}")
+    print(f"     - Versões do modelo: {', '.join(df['versao_modelo'].unique())}")
+    for classe, quantidade in df[COLUNA_PREDICAO].value_counts().items():
+        print(f"     - {classe}: {quantidade}")
+
+    if args.exportar:
+        dataset = como_dataset(df)
+        if args.exportar.suffix.lower() == ".parquet":
+            dataset.to_parquet(args.exportar, index=False)
+        else:
+            dataset.to_csv(args.exportar, index=False)
+        print(f"\n     - Dataset exportado: {args.exportar}")
+
+    if args.drift:
+        print("\nDrift em relação ao treino:")
+        for linha in monitor_da_auditoria(df, DATA_PATH).relatorio():
+            psi = "-" if linha["psi"] is None else f"{linha['psi']:.3f}"
+            print(f"     - {linha['variavel']}: PSI {psi} ({linha['status']})")
+
+
+if __name__ == "__main__":
+    main()
+
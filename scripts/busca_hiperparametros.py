@@ -0,0 +1,243 @@
+"""Busca de hiperparâmetros do RandomForest com successive halving.
+
+Os candidatos são sorteados de ``ESPACO_BUSCA`` e avaliados em rodadas:
+na primeira, todos treinam com uma fração pequena de cada fold de treino;
+a cada rodada apenas o melhor ``1/eta`` dos candidatos segue, com ``eta``
+vezes mais amostras, até a última rodada usar o fold inteiro. Cada par
+(candidato, fold) de uma rodada é uma tarefa independente executada em um
+pool de processos (cada floresta com ``n_jobs=1``), e os dados são enviados
+uma única vez para cada processo.
+
+Além da acurácia, cada tarefa mede o tempo de ``fit`` e a latência de
+``predict`` de um único registro, permitindo escolher o modelo mais barato
+que ainda atinge a meta de acurácia: com ``acuracia_minima`` definida, os
+candidatos que já a atingem numa rodada são priorizados pela latência, e os
+demais pela acurácia.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+ESPACO_BUSCA: Dict[str, List[object]] = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", "log2", 0.5],
+}
+PARAMETROS_FIXOS: Dict[str, object] = {"min_samples_split": 5, "class_weight": "balanced"}
+N_CANDIDATOS = 27
+ETA = 3
+N_FOLDS = 5
+REPETICOES_LATENCIA = 20
+RANDOM_STATE = 42
+
+# Dados compartilhados pelos processos do pool (definidos em _inicializar)
+_X: Optional[np.ndarray] = None
+_y: Optional[np.ndarray] = None
+
+
+def _inicializar(X: np.ndarray, y: np.ndarray) -> None:
+    global _X, _y
+    _X, _y = X, y
+
+
+def sortear_candidatos(
+    n_candidatos: int = N_CANDIDATOS,
+    espaco: Dict[str, List[object]] = ESPACO_BUSCA,
+    random_state: int = RANDOM_STATE,
+) -> List[Dict[str, object]]:
+    """Sorteia ``n_candidatos`` combinações distintas do espaço de busca.
+
+    Args:
+        n_candidatos: Quantidade de combinações (limitada ao tamanho do grid).
+        espaco: Valores possíveis por hiperparâmetro.
+        random_state: Semente do sorteio.
+
+    Returns:
+        Lista de dicionários de hiperparâmetros.
+    """
+    grid = [dict(zip(espaco, valores)) for valores in itertools.product(*espaco.values())]
+    rng = np.random.default_rng(random_state)
+    escolhidos = rng.choice(len(grid), size=min(n_candidatos, len(grid)), replace=False)
+    return [grid[i] for i in escolhidos]
+
+
+def _prioridade(resultado: Dict[str, object], acuracia_minima: Optional[float]) -> tuple:
+    """Chave de ordenação: aprovados pela latência, demais pela acurácia."""
+    if acuracia_minima is not None and resultado["acuracia"] >= acuracia_minima:
+        return (0, resultado["latencia_ms"], -resultado["acuracia"])
+    return (1, -resultado["acuracia"], resultado["latencia_ms"])
+
+
+def _avaliar(
+    parametros: Dict[str, object],
+    treino: np.ndarray,
+    validacao: np.ndarray,
+    n_amostras: int,
+    random_state: int,
+) -> Dict[str, float]:
+    """Treina um candidato em ``n_amostras`` linhas do fold e o avalia."""
+    if n_amostras < len(treino):
+        treino, _ = train_test_split(
+            treino, train_size=n_amostras, random_state=random_state, stratify=_y[treino]
+        )
+
+    modelo = RandomForestClassifier(**PARAMETROS_FIXOS, **parametros, random_state=random_state, n_jobs=1)
+    inicio = time.perf_counter()
+    modelo.fit(_X[treino], _y[treino])
+    fit_s = time.perf_counter() - inicio
+
+    acuracia = float(np.mean(modelo.predict(_X[validacao]) == _y[validacao]))
+
+    registro = _X[validacao[:1]]
+    tempos = []
+    for _ in range(REPETICOES_LATENCIA):
+        inicio = time.perf_counter()
+        modelo.predict(registro)
+        tempos.append(time.perf_counter() - inicio)
+
+    return {"acuracia": acuracia, "fit_s": fit_s, "latencia_ms": statistics.median(tempos) * 1000}
+
+
+def successive_halving(
+    X: np.ndarray,
+    y: np.ndarray,
+    candidatos: Sequence[Dict[str, object]],
+    acuracia_minima: Optional[float] = None,
+    eta: int = ETA,
+    n_folds: int = N_FOLDS,
+    n_processos: Optional[int] = None,
+    random_state: int = RANDOM_STATE,
+) -> pd.DataFrame:
+    """Avalia os candidatos com successive halving e validação cruzada.
+
+    Args:
+        X: Features já pré-processadas.
+        y: Target codificado.
+        candidatos: Combinações de hiperparâmetros a avaliar.
+        acuracia_minima: Meta de acurácia usada para priorizar candidatos
+            mais baratos; se None, a eliminação considera só a acurácia.
+        eta: Fator de eliminação e de aumento de amostras por rodada.
+        n_folds: Folds da validação cruzada estratificada.
+        n_processos: Processos do pool (padrão: ``os.cpu_count()``).
+        random_state: Semente dos folds, das subamostras e das florestas.
+
+    Returns:
+        DataFrame com uma linha por (rodada, candidato): hiperparâmetros,
+        amostras de treino, acurácia média e desvio, tempo de fit médio e
+        latência de predição mediana.
+
+    Raises:
+        ValueError: Caso ``eta`` seja menor que 2.
+    """
+    if eta < 2:
+        raise ValueError("eta deve ser ao menos 2")
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X, y))
+    n_treino = max(len(treino) for treino, _ in folds)
+    # Uma rodada por potência eta**k <= candidatos, em inteiros (math.log arredonda 243 -> 4.999... na base 3)
+    n_rodadas = 1
+    while eta**n_rodadas <= len(candidatos):
+        n_rodadas += 1
+    minimo = 2 * len(np.unique(y))
+
+    ativos = list(range(len(candidatos)))
+    linhas: List[Dict[str, object]] = []
+    with ProcessPoolExecutor(
+        max_workers=n_processos or os.cpu_count(), initializer=_inicializar, initargs=(X, y)
+    ) as pool:
+        for rodada in range(n_rodadas):
+            n_amostras = max(minimo, int(n_treino / eta ** (n_rodadas - 1 - rodada)))
+            tarefas = {
+                (indice, fold): pool.submit(
+                    _avaliar, candidatos[indice], treino, validacao, n_amostras, random_state
+                )
+                for indice in ativos
+                for fold, (treino, validacao) in enumerate(folds)
+            }
+
+            resultados_rodada = []
+            for indice in ativos:
+                por_fold = [tarefas[(indice, fold)].result() for fold in range(n_folds)]
+                acuracias = [r["acuracia"] for r in por_fold]
+                resultados_rodada.append({
+                    "rodada": rodada,
+                    "candidato": indice,
+                    **candidatos[indice],
+                    "n_amostras": n_amostras,
+                    "acuracia": float(np.mean(acuracias)),
+                    "acuracia_std": float(np.std(acuracias)),
+                    "fit_s": float(np.mean([r["fit_s"] for r in por_fold])),
+                    "latencia_ms": float(np.median([r["latencia_ms"] for r in por_fold])),
+                })
+            linhas.extend(resultados_rodada)
+
+            manter = max(1, len(ativos) // eta)
+            ordenados = sorted(resultados_rodada, key=lambda r: _prioridade(r, acuracia_minima))
+            ativos = [r["candidato"] for r in ordenados[:manter]]
+
+    return pd.DataFrame(linhas)
+
+
+def selecionar_candidato(resultados: pd.DataFrame, acuracia_minima: float) -> pd.Series:
+    """Escolhe o candidato mais barato que atinge a acurácia mínima.
+
+    Considera, para cada candidato, a última rodada em que foi avaliado
+    (a de mais amostras). Entre os que atingem ``acuracia_minima``, vence a
+    menor latência de predição; se nenhum atingir, vence o de maior
+    acurácia.
+
+    Args:
+        resultados: Tabela retornada por ``successive_halving``.
+        acuracia_minima: Acurácia de validação cruzada exigida.
+
+    Returns:
+        Linha da tabela correspondente ao candidato escolhido.
+    """
+    ultima = resultados.sort_values("rodada").groupby("candidato").tail(1)
+    # Só compara candidatos avaliados com o mesmo volume de dados que o melhor
+    ultima = ultima[ultima["n_amostras"] == ultima["n_amostras"].max()]
+    chaves = ultima.apply(lambda linha: _prioridade(linha, acuracia_minima) + (linha["fit_s"],), axis=1)
+    return ultima.loc[chaves.sort_values().index[0]]
+
+
+def parametros_do_resultado(linha: pd.Series) -> Dict[str, object]:
+    """Extrai os hiperparâmetros buscados de uma linha da tabela."""
+    parametros = {}
+    for nome in ESPACO_BUSCA:
+        valor = linha[nome]
+        if isinstance(valor, str):
+            # max_features mistura strings e frações; lido de CSV vira texto
+            try:
+                valor = float(valor)
+            except ValueError:
+                pass
+        if isinstance(valor, float) and math.isnan(valor):
+            valor = None
+        elif isinstance(valor, (np.integer, np.floating)):
+            valor = valor.item()
+        if isinstance(valor, float) and valor.is_integer() and nome != "max_features":
+            valor = int(valor)
+        parametros[nome] = valor
+    return parametros
+
+
+__all__ = [
+    "ESPACO_BUSCA",
+    "PARAMETROS_FIXOS",
+    "parametros_do_resultado",
+    "selecionar_candidato",
+    "sortear_candidatos",
+    "successive_halving",
+]
@@ -0,0 +1,118 @@
+"""Cache LRU de predições para o formulário de diagnóstico.
+
+As entradas do formulário vivem em uma grade discreta (sliders com passo
+0.1 ou 0.5 e selectboxes com poucas opções), então os mesmos perfis se
+repetem com frequência entre reruns e sessões. O cache é compartilhado pelo
+processo, limitado em tamanho e vinculado à versão do artefato carregado:
+ao trocar o modelo todas as entradas são descartadas.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+from artefatos import carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+
+# Casas decimais usadas para normalizar os campos numéricos; cobre os passos
+# de 0.01 (altura), 0.1 e 0.5 dos widgets.
+CASAS_DECIMAIS = 2
+TAMANHO_MAXIMO = 4096
+
+Predicao = Tuple[str, Tuple[float, ...]]
+
+
+def chave_predicao(registro: Mapping[str, object]) -> Tuple[object, ...]:
+    """Normaliza as entradas do formulário em uma tupla hashable.
+
+    O BMI não entra na chave porque é derivado de peso e altura.
+
+    Args:
+        registro: Dicionário campo -> valor com o esquema de ``Obesity.csv``.
+
+    Returns:
+        Tupla com os valores numéricos arredondados seguidos dos categóricos.
+    """
+    numericos = tuple(round(float(registro[coluna]), CASAS_DECIMAIS) for coluna in NUMERIC_FEATURES)
+    categoricos = tuple(registro[coluna] for coluna in ORDINAL_FEATURES + CATEGORICAL_FEATURES)
+    return numericos + categoricos
+
+
+class CachePredicao:
+    """Cache LRU thread-safe de (rótulo, probabilidades) por perfil.
+
+    Attributes:
+        tamanho_maximo: Quantidade máxima de perfis armazenados.
+        acertos: Consultas respondidas pelo cache.
+        falhas: Consultas que precisaram do modelo.
+        versao: Identificador do artefato ao qual as entradas pertencem.
+    """
+
+    def __init__(self, tamanho_maximo: int = TAMANHO_MAXIMO) -> None:
+        if tamanho_maximo <= 0:
+            raise ValueError("tamanho_maximo deve ser positivo")
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self.versao: Optional[Hashable] = None
+        self._entradas: "OrderedDict[Tuple[object, ...], Predicao]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def vincular_modelo(self, versao: Hashable) -> None:
+        """Associa o cache a um artefato, limpando-o se a versão mudou.
+
+        Args:
+            versao: Identificador do artefato (ex.: mtime e tamanho do arquivo).
+        """
+        with self._lock:
+            if versao != self.versao:
+                self._entradas.clear()
+                self.acertos = 0
+                self.falhas = 0
+                self.versao = versao
+
+    def obter(self, chave: Tuple[object, ...]) -> Optional[Predicao]:
+        """Retorna a predição armazenada ou None, atualizando os contadores."""
+        with self._lock:
+            valor = self._entradas.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave: Tuple[object, ...], valor: Predicao) -> None:
+        """Armazena uma predição, descartando a menos usada se necessário."""
+        with self._lock:
+            self._entradas[chave] = valor
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Retorna contadores de acertos, falhas, ocupação e taxa de acerto."""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "tamanho": len(self._entradas),
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
+
+
+# Instância compartilhada por todas as sessões do processo
+CACHE_PREDICAO = CachePredicao()
+
+
+__all__ = ["CACHE_PREDICAO", "CachePredicao", "chave_predicao"]
@@ -0,0 +1,151 @@
+"""Cache em disco de pré-processadores ajustados e matrizes transformadas.
+
+Cada entrada é endereçada pelo conteúdo: hash SHA-256 da impressão digital
+dos dados, dos índices das linhas de treino (e das linhas transformadas) e
+da configuração do transformer não ajustado, junto com a versão do
+scikit-learn. Folds de validação cruzada, buscas de hiperparâmetros e
+retreinos sobre os mesmos dados reaproveitam o ``fit_transform`` já feito.
+
+O diretório tem tamanho limitado: ao passar de ``tamanho_maximo`` bytes, as
+entradas acessadas há mais tempo são removidas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+
+from artefatos import CACHE_DIR
+
+PREPROCESSAMENTO_DIR = CACHE_DIR / "preprocessamento"
+TAMANHO_MAXIMO = 512 * 2**20
+
+
+def impressao_digital(X: pd.DataFrame) -> str:
+    """Hash do conteúdo, das colunas e dos tipos de um DataFrame."""
+    h = hashlib.sha256()
+    h.update(repr([(coluna, str(tipo)) for coluna, tipo in X.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _hash_indices(indices: Optional[np.ndarray]) -> str:
+    if indices is None:
+        return "todos"
+    return hashlib.sha256(np.asarray(indices, dtype=np.int64).tobytes()).hexdigest()
+
+
+def _chave(*partes: str) -> str:
+    return hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()
+
+
+class CachePreprocessamento:
+    """Cache endereçado por conteúdo de ``fit_transform``/``transform``.
+
+    Attributes:
+        diretorio: Diretório das entradas (um arquivo joblib por entrada).
+        tamanho_maximo: Limite em bytes do diretório.
+        acertos: Consultas respondidas pelo disco.
+        falhas: Consultas que precisaram ajustar ou transformar.
+    """
+
+    def __init__(self, diretorio: Path = PREPROCESSAMENTO_DIR, tamanho_maximo: int = TAMANHO_MAXIMO) -> None:
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+
+    def _ler(self, chave: str):
+        arquivo = self.diretorio / f"{chave}.joblib"
+        try:
+            valor = joblib.load(arquivo)
+        except FileNotFoundError:
+            self.falhas += 1
+            return None
+        except Exception:  # noqa: BLE001 - entrada truncada ou corrompida é recalculada
+            self.falhas += 1
+            arquivo.unlink(missing_ok=True)
+            return None
+        os.utime(arquivo)
+        self.acertos += 1
+        return valor
+
+    def _gravar(self, chave: str, valor: object) -> None:
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        arquivo = self.diretorio / f"{chave}.joblib"
+        temporario = arquivo.with_suffix(f".tmp{os.getpid()}")
+        joblib.dump(valor, temporario)
+        os.replace(temporario, arquivo)
+        self._despejar()
+
+    def _despejar(self) -> None:
+        """Remove as entradas menos recentes até caber no limite."""
+        entradas = []
+        for arquivo in self.diretorio.glob("*.joblib"):
+            try:
+                estado = arquivo.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((estado.st_mtime_ns, estado.st_size, arquivo))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, arquivo in sorted(entradas):
+            if total <= self.tamanho_maximo:
+                break
+            arquivo.unlink(missing_ok=True)
+            total -= tamanho
+
+    def ajustar_transformar(
+        self,
+        preprocessor: object,
+        X: pd.DataFrame,
+        treino: Optional[np.ndarray] = None,
+        aplicar: Sequence[np.ndarray] = (),
+        impressao: Optional[str] = None,
+    ) -> Tuple[object, np.ndarray, List[np.ndarray]]:
+        """Ajusta ``preprocessor`` nas linhas de treino e transforma as demais.
+
+        Args:
+            preprocessor: Transformer não ajustado (não é modificado).
+            X: Dataset completo.
+            treino: Posições das linhas usadas no ajuste (todas se None).
+            aplicar: Conjuntos de posições a transformar com o ajuste.
+            impressao: ``impressao_digital(X)`` já calculada, para evitar
+                refazer o hash a cada fold.
+
+        Returns:
+            Tupla com o transformer ajustado, a matriz de treino transformada
+            e a lista de matrizes transformadas de ``aplicar``.
+        """
+        impressao = impressao or impressao_digital(X)
+        config = _chave(joblib.hash(clone(preprocessor)), sklearn.__version__)
+        chave_ajuste = _chave(impressao, _hash_indices(treino), config)
+
+        ajuste = self._ler(chave_ajuste)
+        if ajuste is None:
+            ajustado = clone(preprocessor)
+            X_treino = X if treino is None else X.iloc[treino]
+            ajuste = (ajustado, ajustado.fit_transform(X_treino))
+            self._gravar(chave_ajuste, ajuste)
+        ajustado, transformado_treino = ajuste
+
+        transformados = []
+        for indices in aplicar:
+            chave = _chave(chave_ajuste, _hash_indices(indices))
+            transformado = self._ler(chave)
+            if transformado is None:
+                transformado = ajustado.transform(X.iloc[indices])
+                self._gravar(chave, transformado)
+            transformados.append(transformado)
+
+        return ajustado, transformado_treino, transformados
+
+
+__all__ = ["CachePreprocessamento", "PREPROCESSAMENTO_DIR", "impressao_digital"]
@@ -0,0 +1,119 @@
+"""Gerador de carga local para o servidor de inferência.
+
+Envia requisições ``POST /predict`` com pacientes amostrados de
+``Obesity.csv`` mantendo uma concorrência fixa (uma conexão keep-alive por
+cliente) e reporta latência p50/p99/máxima e requisições por segundo.
+
+Uso:
+    python scripts/carga_servidor.py --porta 8000 --requisicoes 5000 --concorrencia 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from artefatos import DATA_PATH, carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+
+RANDOM_STATE = 42
+
+
+def amostrar_corpos(n: int, random_state: int = RANDOM_STATE) -> List[bytes]:
+    """Sorteia ``n`` pacientes do dataset e os serializa como JSON."""
+    df = pd.read_csv(DATA_PATH).drop(columns=[TARGET_COLUMN])
+    amostra = df.sample(n=n, replace=True, random_state=random_state)
+    return [json.dumps(registro).encode("utf-8") for registro in amostra.to_dict("records")]
+
+
+async def _cliente(host: str, porta: int, corpos: List[bytes], latencias: List[float], status: Dict[int, int]) -> None:
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        for corpo in corpos:
+            requisicao = (
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(corpo)}\r\n\r\n"
+            ).encode("latin-1") + corpo
+            inicio = time.perf_counter()
+            writer.write(requisicao)
+            await writer.drain()
+            cabecalho = await reader.readuntil(b"\r\n\r\n")
+            linhas = cabecalho.decode("latin-1").split("\r\n")
+            codigo = int(linhas[0].split(" ")[1])
+            tamanho = next(
+                int(linha.split(":", 1)[1]) for linha in linhas if linha.lower().startswith("content-length")
+            )
+            await reader.readexactly(tamanho)
+            latencias.append(time.perf_counter() - inicio)
+            status[codigo] = status.get(codigo, 0) + 1
+    finally:
+        writer.close()
+
+
+async def gerar_carga(host: str, porta: int, requisicoes: int, concorrencia: int) -> Dict[str, float]:
+    """Dispara a carga e calcula as estatísticas de latência.
+
+    Args:
+        host: Endereço do servidor.
+        porta: Porta do servidor.
+        requisicoes: Total de requisições.
+        concorrencia: Quantidade de clientes simultâneos.
+
+    Returns:
+        Dicionário com p50, p99 e máxima (ms), vazão e contagem de erros.
+    """
+    corpos = amostrar_corpos(requisicoes)
+    latencias: List[float] = []
+    status: Dict[int, int] = {}
+
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(_cliente(host, porta, corpos[i::concorrencia], latencias, status) for i in range(concorrencia))
+    )
+    duracao = time.perf_counter() - inicio
+
+    latencias_ms = np.asarray(latencias) * 1000
+    return {
+        "requisicoes": len(latencias),
+        "erros": sum(n for codigo, n in status.items() if codigo != 200),
+        "p50_ms": float(np.percentile(latencias_ms, 50)),
+        "p99_ms": float(np.percentile(latencias_ms, 99)),
+        "max_ms": float(latencias_ms.max()),
+        "requisicoes_por_segundo": len(latencias) / duracao,
+    }
+
+
+def main() -> None:
+    """Executa o gerador de carga a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor de inferência")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("GERADOR DE CARGA")
+    print("=" * 60)
+    print(f"     - Requisições: {args.requisicoes} | Concorrência: {args.concorrencia}")
+
+    resultado = asyncio.run(gerar_carga(args.host, args.porta, args.requisicoes, args.concorrencia))
+
+    print(f"\n     - Concluídas: {resultado['requisicoes']} (erros: {resultado['erros']})")
+    print(f"     - Latência p50: {resultado['p50_ms']:.2f} ms")
+    print(f"     - Latência p99: {resultado['p99_ms']:.2f} ms")
+    print(f"     - Latência máx: {resultado['max_ms']:.2f} ms")
+    print(f"     - Vazão: {resultado['requisicoes_por_segundo']:,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Codificador de features pré-compilado a partir do ColumnTransformer treinado.
+
+Extrai do pré-processador de ``obter_preprocessor()`` já ajustado os vetores
+de média e escala do StandardScaler e tabelas de consulta para o
+OrdinalEncoder e o OneHotEncoder (drop="first"). Com isso um dicionário,
+um array de registros ou um DataFrame é convertido diretamente no vetor
+final de features, sem montar DataFrames nem despachar colunas pelo
+ColumnTransformer. O resultado é idêntico ao de ``preprocessor.transform``.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from artefatos import carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+
+
+def _passo_final(transformador: object) -> object:
+    """Retorna o último passo de um Pipeline (ou o próprio transformador)."""
+    steps = getattr(transformador, "steps", None)
+    return steps[-1][1] if steps else transformador
+
+
+class CodificadorCompilado:
+    """Versão compilada do ColumnTransformer usado no treinamento.
+
+    Attributes:
+        colunas_numericas: Colunas padronizadas pelo StandardScaler.
+        media: Vetor de médias do StandardScaler.
+        escala: Vetor de desvios do StandardScaler.
+        colunas_ordinais: Colunas codificadas pelo OrdinalEncoder.
+        tabelas_ordinais: Categoria -> código para cada coluna ordinal.
+        colunas_onehot: Colunas codificadas pelo OneHotEncoder.
+        tabelas_onehot: Categoria -> posição no vetor final (categorias
+            descartadas por drop="first" não aparecem).
+        nomes_features: Nomes das colunas do vetor final.
+    """
+
+    def __init__(
+        self,
+        colunas_numericas: List[str],
+        media: np.ndarray,
+        escala: np.ndarray,
+        colunas_ordinais: List[str],
+        tabelas_ordinais: List[Dict[str, float]],
+        valor_desconhecido: float,
+        colunas_onehot: List[str],
+        tabelas_onehot: List[Dict[str, int]],
+        nomes_features: List[str],
+    ) -> None:
+        self.colunas_numericas = list(colunas_numericas)
+        self.media = np.asarray(media, dtype=np.float64)
+        self.escala = np.asarray(escala, dtype=np.float64)
+        self.colunas_ordinais = list(colunas_ordinais)
+        self.tabelas_ordinais = tabelas_ordinais
+        self.valor_desconhecido = float(valor_desconhecido)
+        self.colunas_onehot = list(colunas_onehot)
+        self.tabelas_onehot = tabelas_onehot
+        self.nomes_features = list(nomes_features)
+        self.n_features = len(self.nomes_features)
+        self._inicio_ordinal = len(self.colunas_numericas)
+        # Listas Python tornam o caminho de uma única linha mais rápido
+        self._media = self.media.tolist()
+        self._escala = self.escala.tolist()
+
+    @classmethod
+    def de_preprocessor(cls, preprocessor: object) -> "CodificadorCompilado":
+        """Compila o ColumnTransformer já ajustado.
+
+        Args:
+            preprocessor: Resultado de ``obter_preprocessor()`` após ``fit``.
+
+        Returns:
+            Instância de CodificadorCompilado.
+
+        Raises:
+            ValueError: Caso o pré-processador tenha uma estrutura diferente
+                da definida em ``obter_preprocessor()``.
+        """
+        blocos = {}
+        for nome, transformador, colunas in preprocessor.transformers_:
+            if transformador == "drop" or nome == "remainder":
+                continue
+            blocos[nome] = (_passo_final(transformador), list(colunas))
+        if set(blocos) != {"numeric", "ordinal", "categorical"}:
+            raise ValueError(f"Estrutura de pré-processador não suportada: {sorted(blocos)}")
+
+        scaler, colunas_numericas = blocos["numeric"]
+        n_num = len(colunas_numericas)
+        media = scaler.mean_ if scaler.with_mean else np.zeros(n_num)
+        escala = scaler.scale_ if scaler.with_std else np.ones(n_num)
+
+        ordinal, colunas_ordinais = blocos["ordinal"]
+        tabelas_ordinais = [
+            {categoria: float(codigo) for codigo, categoria in enumerate(categorias)}
+            for categorias in ordinal.categories_
+        ]
+        valor_desconhecido = (
+            ordinal.unknown_value if ordinal.handle_unknown == "use_encoded_value" else np.nan
+        )
+
+        onehot, colunas_onehot = blocos["categorical"]
+        drop_idx = onehot.drop_idx_ if onehot.drop_idx_ is not None else [None] * len(colunas_onehot)
+        posicao = n_num + len(colunas_ordinais)
+        tabelas_onehot = []
+        for categorias, descartada in zip(onehot.categories_, drop_idx):
+            tabela = {}
+            for indice, categoria in enumerate(categorias):
+                if descartada is not None and indice == descartada:
+                    continue
+                tabela[categoria] = posicao
+                posicao += 1
+            tabelas_onehot.append(tabela)
+
+        return cls(
+            colunas_numericas=colunas_numericas,
+            media=media,
+            escala=escala,
+            colunas_ordinais=colunas_ordinais,
+            tabelas_ordinais=tabelas_ordinais,
+            valor_desconhecido=valor_desconhecido,
+            colunas_onehot=colunas_onehot,
+            tabelas_onehot=tabelas_onehot,
+            nomes_features=list(preprocessor.get_feature_names_out()),
+        )
+
+    def transformar_registro(self, registro: Mapping[str, object]) -> np.ndarray:
+        """Codifica um único paciente.
+
+        Args:
+            registro: Dicionário campo -> valor com o esquema de
+                ``Obesity.csv``. Se ``BMI`` não for informado, é calculado
+                a partir de ``Weight`` e ``Height`` como em ``criar_bmi``.
+
+        Returns:
+            Array (1, n_features) em float64.
+        """
+        linha = [0.0] * self.n_features
+        for posicao, coluna in enumerate(self.colunas_numericas):
+            if coluna == BMI_COLUMN and coluna not in registro:
+                altura = float(registro["Height"])
+                valor = float(registro["Weight"]) / altura**2 if altura != 0 else math.nan
+            else:
+                valor = float(registro[coluna])
+            linha[posicao] = (valor - self._media[posicao]) / self._escala[posicao]
+
+        for deslocamento, (coluna, tabela) in enumerate(zip(self.colunas_ordinais, self.tabelas_ordinais)):
+            # Valores ausentes não fazem parte das categorias e caem como desconhecidos
+            linha[self._inicio_ordinal + deslocamento] = tabela.get(registro[coluna], self.valor_desconhecido)
+
+        for coluna, tabela in zip(self.colunas_onehot, self.tabelas_onehot):
+            posicao = tabela.get(registro[coluna])
+            if posicao is not None:
+                linha[posicao] = 1.0
+
+        return np.array([linha], dtype=np.float64)
+
+    def transformar_colunas(self, dados: object) -> np.ndarray:
+        """Codifica vários pacientes de forma vetorizada.
+
+        Args:
+            dados: Array de registros NumPy, DataFrame ou dicionário
+                campo -> sequência de valores.
+
+        Returns:
+            Array (n_amostras, n_features) em float64.
+        """
+        nomes = dados.dtype.names if isinstance(dados, np.ndarray) else list(dados.keys())
+
+        def coluna(nome: str) -> np.ndarray:
+            return np.asarray(dados[nome])
+
+        if BMI_COLUMN in nomes:
+            bmi = coluna(BMI_COLUMN).astype(np.float64)
+        else:
+            altura = coluna("Height").astype(np.float64)
+            altura = np.where(altura == 0, np.nan, altura)
+            bmi = coluna("Weight").astype(np.float64) / altura**2
+
+        n_amostras = len(bmi)
+        saida = np.zeros((n_amostras, self.n_features), dtype=np.float64)
+        for posicao, nome in enumerate(self.colunas_numericas):
+            valores = bmi if nome == BMI_COLUMN else coluna(nome).astype(np.float64)
+            saida[:, posicao] = (valores - self.media[posicao]) / self.escala[posicao]
+
+        # As tabelas são consultadas uma vez por valor distinto; ausentes
+        # recebem o código -1 de pd.factorize e são tratados como desconhecidos
+        for deslocamento, (nome, tabela) in enumerate(zip(self.colunas_ordinais, self.tabelas_ordinais)):
+            inverso, unicos = pd.factorize(coluna(nome))
+            codigos = np.array(
+                [tabela.get(valor, self.valor_desconhecido) for valor in unicos] + [self.valor_desconhecido],
+                dtype=np.float64,
+            )
+            saida[:, self._inicio_ordinal + deslocamento] = codigos[inverso]
+
+        linhas = np.arange(n_amostras)
+        for nome, tabela in zip(self.colunas_onehot, self.tabelas_onehot):
+            inverso, unicos = pd.factorize(coluna(nome))
+            posicoes = np.array([tabela.get(valor, -1) for valor in unicos] + [-1], dtype=np.intp)[inverso]
+            conhecidos = posicoes >= 0
+            saida[linhas[conhecidos], posicoes[conhecidos]] = 1.0
+
+        return saida
+
+    def transform(self, X: object) -> np.ndarray:
+        """Interface compatível com ``ColumnTransformer.transform``.
+
+        Dicionários com valores escalares seguem o caminho de uma única
+        linha; demais entradas usam a versão vetorizada.
+        """
+        if isinstance(X, Mapping) and not np.ndim(next(iter(X.values()), None)):
+            return self.transformar_registro(X)
+        return self.transformar_colunas(X)
+
+
+__all__ = ["CodificadorCompilado"]
@@ -0,0 +1,330 @@
+"""Compactação do RandomForest treinado: seleção de árvores e limite de profundidade.
+
+A floresta é reduzida em duas etapas, ambas avaliadas com a acurácia
+out-of-bag (OOB): cada amostra é prevista apenas pelas árvores que não a
+sortearam no bootstrap.
+
+1. **Seleção gulosa de árvores**: partindo de um ensemble vazio, adiciona a
+   cada passo a árvore que mais aumenta a acurácia OOB da média das
+   probabilidades (desempate pela probabilidade média da classe correta);
+   fica o menor prefixo cuja acurácia não cai mais que ``tolerancia`` em
+   relação à floresta completa.
+2. **Limite de profundidade**: a menor profundidade máxima que mantém as
+   árvores escolhidas dentro da mesma tolerância. Os nós abaixo do limite são
+   removidos de fato (a árvore é reconstruída), então o arquivo também
+   diminui.
+
+As escolhas otimizam a própria acurácia OOB, que por isso é otimista. Para
+validá-las, o treino é dividido em seleção e validação: uma floresta com os
+mesmos hiperparâmetros, treinada só na seleção, passa pelas duas etapas e a
+versão reduzida é comparada com a completa na validação, que nenhuma árvore
+viu e que não participou das escolhas. Se a queda passar da
+``tolerancia``, a floresta original é mantida. Caso contrário, a mesma
+quantidade de árvores e a mesma profundidade são aplicadas à floresta
+original (treinada em todo o treino): a seleção gulosa roda de novo sobre
+as árvores dela, com as máscaras OOB do treino completo. O conjunto de
+teste não participa das escolhas e mede a acurácia antes e depois no
+relatório.
+
+As probabilidades de todas as árvores ficam em um array denso
+``(árvores, amostras, classes)`` em float64 (200 árvores × 1.700 amostras ×
+7 classes ≈ 19 MB); a compactação é pensada para conjuntos de treino
+pequenos como o ``Obesity.csv``. A seleção gulosa avalia as candidatas em
+blocos de ``ARVORES_POR_BLOCO`` para não copiar o array inteiro a cada passo.
+
+Depende de APIs privadas do scikit-learn (``_generate_unsampled_indices``,
+``_get_n_samples_bootstrap`` e o estado de ``sklearn.tree._tree.Tree``) e só
+é garantida com a versão fixada em ``requirements.txt``
+(``scikit-learn==1.5.2``).
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble._forest import _generate_unsampled_indices, _get_n_samples_bootstrap
+from sklearn.model_selection import train_test_split
+from sklearn.tree._tree import Tree
+
+TOLERANCIA = 0.005
+# Fração do treino reservada para validar a floresta reduzida
+FRACAO_VALIDACAO = 0.25
+ARVORES_POR_BLOCO = 16
+RANDOM_STATE = 42
+REPETICOES_LATENCIA = 50
+
+
+def limitar_profundidade(arvore: object, profundidade: int) -> object:
+    """Retorna uma cópia da árvore com no máximo ``profundidade`` níveis.
+
+    Nós na profundidade limite viram folhas (com a distribuição de classes
+    que já armazenavam) e seus descendentes são descartados.
+
+    Args:
+        arvore: ``DecisionTreeClassifier`` ajustado.
+        profundidade: Profundidade máxima (a raiz tem profundidade 0).
+
+    Returns:
+        Novo ``DecisionTreeClassifier`` com a árvore reconstruída.
+    """
+    estado = arvore.tree_.__getstate__()
+    nos, valores = estado["nodes"], estado["values"]
+
+    # No layout do sklearn os filhos sempre têm índice maior que o pai
+    niveis = np.zeros(len(nos), dtype=np.intp)
+    for no in range(len(nos)):
+        if nos["left_child"][no] != -1:
+            niveis[nos["left_child"][no]] = niveis[no] + 1
+            niveis[nos["right_child"][no]] = niveis[no] + 1
+
+    mantidos = np.flatnonzero(niveis <= profundidade)
+    novo_indice = np.full(len(nos) + 1, -1, dtype=np.intp)
+    novo_indice[mantidos] = np.arange(len(mantidos))
+
+    novos_nos = nos[mantidos].copy()
+    folha = (novos_nos["left_child"] == -1) | (niveis[mantidos] == profundidade)
+    # O índice -1 aponta para a sentinela no fim de novo_indice
+    novos_nos["left_child"] = np.where(folha, -1, novo_indice[novos_nos["left_child"]])
+    novos_nos["right_child"] = np.where(folha, -1, novo_indice[novos_nos["right_child"]])
+    novos_nos["feature"][folha] = -2
+    novos_nos["threshold"][folha] = -2.0
+    novos_nos["missing_go_to_left"][folha] = 0
+
+    tree = Tree(arvore.tree_.n_features, np.asarray(arvore.tree_.n_classes, dtype=np.intp), arvore.tree_.n_outputs)
+    tree.__setstate__({
+        "max_depth": int(niveis[mantidos].max()),
+        "node_count": len(mantidos),
+        "nodes": novos_nos,
+        "values": valores[mantidos].copy(),
+    })
+    nova = copy.copy(arvore)
+    nova.tree_ = tree
+    return nova
+
+
+def mascara_oob(modelo: object, n_amostras: int) -> np.ndarray:
+    """Matriz ``(árvores, amostras)`` indicando as amostras fora do bootstrap de cada árvore."""
+    n_bootstrap = _get_n_samples_bootstrap(n_amostras, modelo.max_samples)
+    mascara = np.zeros((len(modelo.estimators_), n_amostras), dtype=bool)
+    for i, arvore in enumerate(modelo.estimators_):
+        mascara[i, _generate_unsampled_indices(arvore.random_state, n_amostras, n_bootstrap)] = True
+    return mascara
+
+
+def _acuracia_oob(soma: np.ndarray, cobertura: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Acurácia sobre as amostras com ao menos uma árvore OOB (eixo final = amostras)."""
+    acertos = (np.argmax(soma, axis=-1) == y) & (cobertura > 0)
+    return acertos.sum(axis=-1) / np.maximum((cobertura > 0).sum(axis=-1), 1)
+
+
+def selecionar_arvores(
+    probas: np.ndarray, oob: np.ndarray, y: np.ndarray, tolerancia: float, tamanho: Optional[int] = None
+) -> Tuple[List[int], List[float]]:
+    """Ordena as árvores por seleção gulosa e escolhe o menor prefixo aceitável.
+
+    Args:
+        probas: Probabilidades por árvore, formato ``(árvores, amostras, classes)``.
+        oob: Máscara ``(árvores, amostras)`` das amostras fora do bootstrap.
+        y: Classes verdadeiras (índices das colunas de ``probas``).
+        tolerancia: Queda de acurácia OOB aceita em relação ao ensemble completo.
+        tamanho: Se informado, devolve as ``tamanho`` primeiras árvores da
+            ordem gulosa em vez de usar a tolerância (a ordem para aí).
+
+    Returns:
+        Tupla com os índices das árvores escolhidas e a curva de acurácia
+        OOB da ordem gulosa (um valor por tamanho de prefixo).
+    """
+    probas = probas * oob[:, :, None]
+    meta = float(_acuracia_oob(probas.sum(axis=0), oob.sum(axis=0), y)) - tolerancia
+    linhas = np.arange(len(y))
+    soma = np.zeros(probas.shape[1:])
+    cobertura = np.zeros(len(y), dtype=np.intp)
+    restantes = list(range(len(probas)))
+    ordem: List[int] = []
+    curva: List[float] = []
+    while restantes and (tamanho is None or len(ordem) < tamanho):
+        acertos = np.empty(len(restantes))
+        confianca = np.empty(len(restantes))
+        for inicio in range(0, len(restantes), ARVORES_POR_BLOCO):
+            bloco = restantes[inicio:inicio + ARVORES_POR_BLOCO]
+            candidatas = soma[None] + probas[bloco]
+            coberturas = cobertura[None] + oob[bloco]
+            acertos[inicio:inicio + len(bloco)] = _acuracia_oob(candidatas, coberturas, y)
+            confianca[inicio:inicio + len(bloco)] = (candidatas[:, linhas, y] / np.maximum(coberturas, 1)).mean(axis=1)
+        melhor = int(np.lexsort((-confianca, -acertos))[0])
+        arvore = restantes.pop(melhor)
+        ordem.append(arvore)
+        soma += probas[arvore]
+        cobertura += oob[arvore]
+        curva.append(float(acertos[melhor]))
+
+    if tamanho is None:
+        tamanho = next(k for k, acuracia in enumerate(curva, start=1) if acuracia >= meta)
+    return ordem[:tamanho], curva
+
+
+def _latencia_registro_ms(modelo: object, X: np.ndarray) -> float:
+    registro = X[:1]
+    tempos = []
+    for _ in range(REPETICOES_LATENCIA):
+        inicio = time.perf_counter()
+        modelo.predict_proba(registro)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def _tamanho_bytes(modelo: object) -> int:
+    buffer = io.BytesIO()
+    joblib.dump(modelo, buffer)
+    return buffer.tell()
+
+
+def descrever(modelo: object, X_teste: np.ndarray, y_teste: np.ndarray) -> Dict[str, float]:
+    """Tamanho, estrutura, latência e acurácia de teste de uma floresta."""
+    return {
+        "arvores": len(modelo.estimators_),
+        "nos": int(sum(arvore.tree_.node_count for arvore in modelo.estimators_)),
+        "profundidade_maxima": int(max(arvore.tree_.max_depth for arvore in modelo.estimators_)),
+        "tamanho_bytes": _tamanho_bytes(modelo),
+        "latencia_registro_ms": _latencia_registro_ms(modelo, X_teste),
+        "acuracia_teste": float(np.mean(modelo.predict(X_teste) == y_teste)),
+    }
+
+
+def _reduzir(
+    floresta: object,
+    X: np.ndarray,
+    y: np.ndarray,
+    tolerancia: float,
+    tamanho: Optional[int] = None,
+    profundidade: Optional[int] = None,
+) -> Tuple[List[object], int, float, float, List[float]]:
+    """Seleção gulosa e limite de profundidade com a acurácia OOB em ``X``.
+
+    Args:
+        floresta: Floresta ajustada exatamente em ``X``.
+        X: Features do ajuste (float32).
+        y: Target do ajuste.
+        tolerancia: Queda de acurácia OOB aceita.
+        tamanho: Árvores a manter; se None, decide pela tolerância.
+        profundidade: Profundidade máxima a aplicar; se None, decide pela
+            tolerância.
+
+    Returns:
+        Tupla com as árvores escolhidas (já podadas), a profundidade máxima,
+        a acurácia OOB da floresta completa e da reduzida e a curva gulosa.
+    """
+    # Índices das colunas de predict_proba correspondentes ao target
+    y_colunas = np.searchsorted(floresta.classes_, y)
+    oob = mascara_oob(floresta, len(X))
+    probas = np.stack([arvore.predict_proba(X) for arvore in floresta.estimators_])
+    completo = float(_acuracia_oob((probas * oob[:, :, None]).sum(axis=0), oob.sum(axis=0), y_colunas))
+    escolhidas, curva = selecionar_arvores(probas, oob, y_colunas, tolerancia, tamanho)
+    del probas
+    arvores = [floresta.estimators_[i] for i in escolhidas]
+    oob_escolhidas = oob[escolhidas]
+    acuracia_final = curva[len(escolhidas) - 1]
+
+    profundidade_atual = max(arvore.tree_.max_depth for arvore in arvores)
+    if profundidade is None:
+        limites = range(1, profundidade_atual)
+    else:
+        limites = range(profundidade, profundidade_atual)[:1]
+    for limite in limites:
+        limitadas = [limitar_profundidade(arvore, limite) for arvore in arvores]
+        soma = sum(arvore.predict_proba(X) * mascara[:, None] for arvore, mascara in zip(limitadas, oob_escolhidas))
+        acuracia = float(_acuracia_oob(soma, oob_escolhidas.sum(axis=0), y_colunas))
+        if profundidade is not None or acuracia >= completo - tolerancia:
+            return limitadas, limite, completo, acuracia, curva
+    return arvores, profundidade_atual, completo, acuracia_final, curva
+
+
+def _montar(floresta: object, arvores: List[object]) -> object:
+    reduzida = copy.copy(floresta)
+    reduzida.estimators_ = arvores
+    reduzida.n_estimators = len(arvores)
+    reduzida.max_depth = max(arvore.tree_.max_depth for arvore in arvores)
+    return reduzida
+
+
+def compactar_floresta(
+    modelo: object,
+    X_treino: np.ndarray,
+    y_treino: np.ndarray,
+    X_teste: np.ndarray,
+    y_teste: np.ndarray,
+    tolerancia: float = TOLERANCIA,
+    fracao_validacao: float = FRACAO_VALIDACAO,
+    random_state: int = RANDOM_STATE,
+) -> Tuple[object, Dict[str, object]]:
+    """Seleciona árvores e limita a profundidade dentro da tolerância de acurácia.
+
+    Args:
+        modelo: ``RandomForestClassifier`` ajustado com bootstrap em
+            ``X_treino`` (não é modificado).
+        X_treino: Features de treino já pré-processadas (as mesmas do ``fit``).
+        y_treino: Target de treino codificado.
+        X_teste: Features de teste já pré-processadas, usadas só no relatório.
+        y_teste: Target de teste codificado.
+        tolerancia: Queda de acurácia aceita, na seleção (OOB) e na validação.
+        fracao_validacao: Fração do treino reservada para a validação.
+        random_state: Semente da divisão entre seleção e validação.
+
+    Returns:
+        Tupla com a floresta compactada (árvores de ``modelo``, ou o próprio
+        ``modelo`` se a validação falhar) e o relatório ``{antes, depois,
+        tolerancia, profundidade, mantida_completa, acuracia_oob,
+        acuracia_validacao, curva_selecao}``.
+
+    Raises:
+        ValueError: Caso a floresta não tenha sido treinada com bootstrap.
+    """
+    if not modelo.bootstrap:
+        raise ValueError("A compactação usa amostras out-of-bag e exige bootstrap=True")
+
+    X_treino = np.asarray(X_treino, dtype=np.float32)
+    y_treino = np.asarray(y_treino)
+
+    # Validação: o mesmo procedimento em uma floresta que não viu a parte de validação
+    selecao, validacao = train_test_split(
+        np.arange(len(X_treino)), test_size=fracao_validacao, random_state=random_state, stratify=y_treino
+    )
+    floresta = clone(modelo).fit(X_treino[selecao], y_treino[selecao])
+    arvores, profundidade, _, _, _ = _reduzir(floresta, X_treino[selecao], y_treino[selecao], tolerancia)
+    X_validacao, y_validacao = X_treino[validacao], y_treino[validacao]
+    validacao_completa = float(np.mean(floresta.predict(X_validacao) == y_validacao))
+    validacao_reduzida = float(np.mean(_montar(floresta, arvores).predict(X_validacao) == y_validacao))
+    mantida_completa = validacao_reduzida < validacao_completa - tolerancia
+    n_arvores = len(arvores)
+    del floresta, arvores
+
+    # Floresta final: a mesma quantidade de árvores e profundidade, escolhidas em ``modelo``
+    arvores, _, oob_antes, oob_depois, curva = _reduzir(
+        modelo, X_treino, y_treino, tolerancia, tamanho=n_arvores, profundidade=profundidade
+    )
+    if mantida_completa:
+        compactado, oob_depois = modelo, oob_antes
+    else:
+        compactado = _montar(modelo, arvores)
+
+    relatorio = {
+        "tolerancia": tolerancia,
+        "profundidade": profundidade,
+        "mantida_completa": mantida_completa,
+        "acuracia_oob": {"antes": oob_antes, "depois": oob_depois},
+        "acuracia_validacao": {"antes": validacao_completa, "depois": validacao_reduzida},
+        "curva_selecao": curva,
+        "antes": descrever(modelo, X_teste, y_teste),
+        "depois": descrever(compactado, X_teste, y_teste),
+    }
+    return compactado, relatorio
+
+
+__all__ = ["compactar_floresta", "limitar_profundidade", "mascara_oob", "selecionar_arvores"]
@@ -0,0 +1,198 @@
+"""Conversão do CSV de obesidade para um arquivo colunar tipado (Parquet).
+
+O CSV é lido uma única vez, em blocos, e gravado com:
+
+- variáveis categóricas como ``category`` (dictionary encoding no Parquet);
+- variáveis numéricas e BMI em ``float32``;
+- BMI pré-calculado (em float64, como em ``criar_bmi``, antes da conversão);
+- duplicatas já removidas (avaliadas sobre os valores originais do CSV).
+
+O arquivo serve apenas ao dashboard, que o lê com projeção de colunas via
+``carregar_dados``; o treinamento sempre lê o CSV, para que os thresholds
+sejam aprendidos em float64, como os valores enviados pela aplicação e pelo
+servidor. O arquivo guarda a assinatura (tamanho e mtime) do CSV de origem;
+``caminho_dataset`` só o utiliza enquanto ele corresponder ao CSV atual.
+
+Uso:
+    python scripts/dataset_colunar.py [--origem data/Obesity.csv] [--destino data/Obesity.parquet]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from artefatos import DATA_PATH, carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+carregar_dados = preprocessing_module.carregar_dados
+criar_bmi = preprocessing_module.criar_bmi
+
+COLUNAR_PATH = DATA_PATH.with_suffix(".parquet")
+CHUNK_SIZE = 500_000
+CHAVE_METADADOS = b"obesidade"
+COLUNAS_CATEGORICAS: List[str] = CATEGORICAL_FEATURES + ORDINAL_FEATURES + [TARGET_COLUMN]
+COLUNAS_FLOAT: List[str] = NUMERIC_FEATURES + [BMI_COLUMN]
+
+
+def _assinatura(caminho: Path) -> List[int]:
+    estado = caminho.stat()
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+def _compactar(bloco: pd.DataFrame) -> pd.DataFrame:
+    """Converte um bloco para os tipos compactos do arquivo colunar."""
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in bloco:
+            bloco[coluna] = bloco[coluna].astype("category")
+    for coluna in COLUNAS_FLOAT:
+        bloco[coluna] = bloco[coluna].astype(np.float32)
+    return bloco
+
+
+def converter_csv(
+    origem: Path = DATA_PATH,
+    destino: Path = COLUNAR_PATH,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, int]:
+    """Converte o CSV em Parquet tipado, sem duplicatas e com BMI.
+
+    Cada bloco do CSV é convertido para os tipos compactos e gravado logo
+    após a leitura com um ``ParquetWriter``; a memória fica limitada a um
+    bloco mais um hash de 64 bits por linha única (calculado sobre os
+    valores originais), usado para remover duplicatas entre blocos.
+
+    Args:
+        origem: CSV com o esquema de ``Obesity.csv``.
+        destino: Arquivo Parquet de saída.
+        chunk_size: Linhas lidas do CSV por bloco.
+
+    Returns:
+        Dicionário com linhas lidas, linhas gravadas e duplicatas removidas.
+
+    Raises:
+        FileNotFoundError: Caso o CSV de origem não exista.
+        ValueError: Caso o CSV não tenha registros.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if not origem.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {origem}")
+
+    metadados = {CHAVE_METADADOS: json.dumps({"origem": origem.name, "assinatura": _assinatura(origem)}).encode("utf-8")}
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_suffix(".parquet.tmp")
+    # Hashes (ordenados) das linhas já gravadas: 8 bytes por linha única
+    vistos = np.empty(0, dtype=np.uint64)
+    linhas_lidas = 0
+    escritor = None
+    esquema = None
+    try:
+        # Numéricas sempre em float64: o hash depende do dtype inferido no bloco
+        tipos = {coluna: np.float64 for coluna in NUMERIC_FEATURES}
+        for bloco in pd.read_csv(origem, chunksize=chunk_size, dtype=tipos):
+            linhas_lidas += len(bloco)
+            hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+            unicos, primeiros = np.unique(hashes, return_index=True)
+            novos = ~np.isin(unicos, vistos, assume_unique=True)
+            vistos = np.union1d(vistos, unicos[novos])
+            bloco = bloco.iloc[np.sort(primeiros[novos])].reset_index(drop=True)
+
+            tabela = pa.Table.from_pandas(_compactar(criar_bmi(bloco)), preserve_index=False)
+            if escritor is None:
+                # Esquema fixo: cada bloco tem seu próprio dicionário de categorias
+                esquema = pa.schema(
+                    [
+                        pa.field(campo.name, pa.dictionary(pa.int32(), campo.type.value_type))
+                        if pa.types.is_dictionary(campo.type)
+                        else campo
+                        for campo in tabela.schema
+                    ],
+                    metadata={**(tabela.schema.metadata or {}), **metadados},
+                )
+                escritor = pq.ParquetWriter(temporario, esquema)
+            escritor.write_table(tabela.cast(esquema))
+        if escritor is None:
+            raise ValueError(f"Nenhum registro em {origem}")
+        escritor.close()
+        escritor = None
+        temporario.replace(destino)
+    finally:
+        if escritor is not None:
+            escritor.close()
+        temporario.unlink(missing_ok=True)
+
+    return {"linhas_lidas": linhas_lidas, "linhas_gravadas": len(vistos), "duplicatas": linhas_lidas - len(vistos)}
+
+
+def colunar_atualizado(csv: Path = DATA_PATH, colunar: Path = COLUNAR_PATH) -> bool:
+    """Indica se o arquivo colunar existe e corresponde ao CSV atual."""
+    if not colunar.exists():
+        return False
+    if not csv.exists():
+        return True
+
+    import pyarrow.parquet as pq
+
+    metadados = pq.read_schema(colunar).metadata or {}
+    if CHAVE_METADADOS not in metadados:
+        return False
+    return json.loads(metadados[CHAVE_METADADOS])["assinatura"] == _assinatura(csv)
+
+
+def caminho_dataset(csv: Path = DATA_PATH, colunar: Optional[Path] = None) -> Path:
+    """Retorna o arquivo colunar se estiver atualizado, senão o CSV."""
+    colunar = colunar or csv.with_suffix(".parquet")
+    return colunar if colunar_atualizado(csv, colunar) else csv
+
+
+def _medir(funcao) -> tuple[float, float, pd.DataFrame]:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    df = funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20, df
+
+
+def main() -> None:
+    """Converte o CSV e compara o carregamento dos dois formatos."""
+    parser = argparse.ArgumentParser(description="Converte Obesity.csv para Parquet tipado")
+    parser.add_argument("--origem", type=Path, default=DATA_PATH, help="CSV de origem")
+    parser.add_argument("--destino", type=Path, help="Parquet de destino (padrão: mesmo nome do CSV)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Linhas por bloco de leitura")
+    args = parser.parse_args()
+    destino = args.destino or args.origem.with_suffix(".parquet")
+
+    print("=" * 60)
+    print("CONVERSÃO PARA FORMATO COLUNAR")
+    print("=" * 60)
+    resumo = converter_csv(args.origem, destino, args.chunk_size)
+    print(f"     - Linhas lidas: {resumo['linhas_lidas']}")
+    print(f"     - Duplicatas removidas: {resumo['duplicatas']}")
+    print(f"     - Linhas gravadas: {resumo['linhas_gravadas']}")
+    print(f"     - Tamanho: {args.origem.stat().st_size / 2**20:.2f} MB (CSV) -> {destino.stat().st_size / 2**20:.2f} MB")
+
+    t_csv, mem_csv, df_csv = _medir(lambda: criar_bmi(carregar_dados(args.origem)))
+    t_col, mem_col, df_col = _medir(lambda: carregar_dados(destino))
+    print("\nCarregamento (read + drop_duplicates + BMI vs. Parquet):")
+    print(f"     - CSV:     {t_csv * 1000:8.1f} ms | pico {mem_csv:7.1f} MB | {df_csv.memory_usage(deep=True).sum() / 2**20:7.1f} MB")
+    print(f"     - Parquet: {t_col * 1000:8.1f} ms | pico {mem_col:7.1f} MB | {df_col.memory_usage(deep=True).sum() / 2**20:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Nível de detalhe e índice de filtros para o explorador de dados do dashboard.
+
+O gráfico 3D recebe no máximo ``orcamento`` pontos, amostrados de forma
+estratificada por classe de obesidade (cada classe mantém sua proporção e
+nenhuma classe presente desaparece). A tabela é paginada: apenas as linhas
+da página selecionada são enviadas ao navegador. Assim o tamanho do payload
+e o tempo de renderização ficam limitados independentemente do volume de
+dados filtrados.
+
+Os filtros de gênero, idade e classe são respondidos por ``IndiceFiltros``:
+bitmaps por valor categórico e a idade ordenada para consultas de faixa,
+com o conjunto de linhas resultante guardado por combinação de filtros.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+ORCAMENTO_PONTOS = 5000
+TAMANHO_PAGINA = 100
+RANDOM_STATE = 42
+RESULTADOS_EM_CACHE = 64
+
+
+def cotas_por_classe(contagens: pd.Series, orcamento: int) -> pd.Series:
+    """Distribui o orçamento de pontos entre as classes.
+
+    A divisão é proporcional ao tamanho de cada classe (maiores restos
+    recebem os pontos que sobram do arredondamento), com ao menos um ponto
+    por classe presente e nunca mais pontos que a própria classe.
+
+    Args:
+        contagens: Quantidade de linhas por classe.
+        orcamento: Total de pontos desejado.
+
+    Returns:
+        Series com a cota de cada classe.
+    """
+    contagens = contagens[contagens > 0]
+    total = int(contagens.sum())
+    if total <= orcamento:
+        return contagens.astype(int)
+
+    exatas = contagens * orcamento / total
+    cotas = np.floor(exatas).astype(int).clip(lower=1)
+    sobra = orcamento - int(cotas.sum())
+    if sobra > 0:
+        restos = (exatas - np.floor(exatas)).sort_values(ascending=False)
+        cotas[restos.index[:sobra]] += 1
+    # O mínimo de um ponto por classe pode estourar o orçamento: devolve das maiores
+    for _ in range(-sobra):
+        cotas[cotas.idxmax()] -= 1
+    return cotas.clip(upper=contagens).astype(int)
+
+
+def amostrar_estratificado(
+    df: pd.DataFrame,
+    coluna: str,
+    orcamento: int = ORCAMENTO_PONTOS,
+    random_state: int = RANDOM_STATE,
+) -> pd.DataFrame:
+    """Reduz ``df`` a no máximo ``orcamento`` linhas estratificando por ``coluna``.
+
+    Args:
+        df: Dados filtrados.
+        coluna: Coluna de estratificação (classe de obesidade).
+        orcamento: Número máximo de linhas retornadas.
+        random_state: Semente para que reruns mostrem os mesmos pontos.
+
+    Returns:
+        O próprio ``df`` se ele couber no orçamento; caso contrário, uma
+        amostra na ordem original das linhas.
+    """
+    if len(df) <= orcamento:
+        return df
+
+    codigos, classes = pd.factorize(df[coluna], sort=True)
+    cotas = cotas_por_classe(pd.Series(np.bincount(codigos, minlength=len(classes))), orcamento)
+    rng = np.random.default_rng(random_state)
+    selecionadas = [
+        rng.choice(np.flatnonzero(codigos == codigo), size=cota, replace=False)
+        for codigo, cota in cotas.items()
+    ]
+    return df.iloc[np.sort(np.concatenate(selecionadas))]
+
+
+def total_paginas(n_linhas: int, tamanho_pagina: int = TAMANHO_PAGINA) -> int:
+    """Quantidade de páginas necessárias para ``n_linhas`` (mínimo 1)."""
+    return max(1, math.ceil(n_linhas / tamanho_pagina))
+
+
+def obter_pagina(df: pd.DataFrame, pagina: int, tamanho_pagina: int = TAMANHO_PAGINA) -> Tuple[pd.DataFrame, int]:
+    """Recorta uma página de ``df``.
+
+    Args:
+        df: Dados filtrados.
+        pagina: Número da página (a partir de 1); valores fora do intervalo
+            são ajustados para a primeira ou a última página.
+        tamanho_pagina: Linhas por página.
+
+    Returns:
+        Tupla com as linhas da página e o número da página efetivamente usada.
+    """
+    pagina = min(max(1, pagina), total_paginas(len(df), tamanho_pagina))
+    inicio = (pagina - 1) * tamanho_pagina
+    return df.iloc[inicio : inicio + tamanho_pagina], pagina
+
+
+class IndiceFiltros:
+    """Índice em bitmaps para filtros de igualdade e uma faixa numérica.
+
+    Para cada coluna categórica guarda um bitmap compactado (``np.packbits``)
+    por valor; para a coluna de faixa guarda os valores ordenados e a
+    permutação correspondente. Uma consulta vira um OR dos bitmaps dos
+    valores escolhidos em cada coluna, uma busca binária na faixa e um AND
+    entre os resultados. As posições resultantes ficam em um cache LRU
+    indexado pela combinação de filtros.
+
+    Attributes:
+        n_linhas: Quantidade de linhas indexadas.
+        bitmaps: Bitmaps por coluna e valor.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        colunas: Sequence[str],
+        coluna_faixa: str,
+        resultados_em_cache: int = RESULTADOS_EM_CACHE,
+    ) -> None:
+        self.n_linhas = len(df)
+        self.bitmaps: Dict[str, Dict[Hashable, np.ndarray]] = {}
+        for coluna in colunas:
+            codigos, valores = pd.factorize(df[coluna])
+            self.bitmaps[coluna] = {
+                valor: np.packbits(codigos == codigo) for codigo, valor in enumerate(valores)
+            }
+
+        faixa = df[coluna_faixa].to_numpy()
+        # NaN vai para o fim da ordenação e nunca cai dentro de uma faixa
+        self._ordem = np.argsort(faixa, kind="stable")
+        self._faixa_ordenada = faixa[self._ordem]
+        self._resultados_em_cache = resultados_em_cache
+        self._resultados: "OrderedDict[Tuple[object, ...], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bitmap_valores(self, coluna: str, valores: Iterable[Hashable]) -> np.ndarray:
+        bitmap = np.zeros((self.n_linhas + 7) // 8, dtype=np.uint8)
+        for valor in valores:
+            if valor in self.bitmaps[coluna]:
+                bitmap |= self.bitmaps[coluna][valor]
+        return bitmap
+
+    def _bitmap_faixa(self, minimo: float, maximo: float) -> np.ndarray:
+        inicio = np.searchsorted(self._faixa_ordenada, minimo, side="left")
+        fim = np.searchsorted(self._faixa_ordenada, maximo, side="right")
+        mascara = np.zeros(self.n_linhas, dtype=bool)
+        mascara[self._ordem[inicio:fim]] = True
+        return np.packbits(mascara)
+
+    def filtrar(self, selecoes: Mapping[str, Iterable[Hashable]], faixa: Tuple[float, float]) -> np.ndarray:
+        """Retorna as posições das linhas que atendem a todos os filtros.
+
+        Args:
+            selecoes: Valores aceitos por coluna categórica indexada.
+            faixa: Limites inclusivos ``(mínimo, máximo)`` da coluna de faixa.
+
+        Returns:
+            Posições (para ``df.iloc``) em ordem crescente.
+
+        Raises:
+            KeyError: Caso alguma coluna de ``selecoes`` não esteja indexada.
+        """
+        chave = tuple((coluna, frozenset(valores)) for coluna, valores in sorted(selecoes.items()))
+        chave += (tuple(faixa),)
+        with self._lock:
+            if chave in self._resultados:
+                self._resultados.move_to_end(chave)
+                return self._resultados[chave]
+
+        bitmap = self._bitmap_faixa(*faixa)
+        for coluna, valores in selecoes.items():
+            bitmap &= self._bitmap_valores(coluna, valores)
+        posicoes = np.flatnonzero(np.unpackbits(bitmap, count=self.n_linhas))
+        posicoes.flags.writeable = False
+
+        with self._lock:
+            self._resultados[chave] = posicoes
+            if len(self._resultados) > self._resultados_em_cache:
+                self._resultados.popitem(last=False)
+        return posicoes
+
+
+__all__ = [
+    "IndiceFiltros",
+    "ORCAMENTO_PONTOS",
+    "TAMANHO_PAGINA",
+    "amostrar_estratificado",
+    "cotas_por_classe",
+    "obter_pagina",
+    "total_paginas",
+]
@@ -0,0 +1,258 @@
+"""Motor de inferência vetorizado para o RandomForest treinado.
+
+Os arrays de todas as árvores (feature, threshold, filhos e valores das
+folhas) são concatenados em uma estrutura plana e contígua. A predição
+percorre todas as árvores ao mesmo tempo, um nível por iteração, para todo
+o lote de amostras, sem a validação e o despacho por estimador que o
+sklearn executa a cada chamada.
+
+As probabilidades são acumuladas árvore a árvore na mesma ordem e com as
+mesmas operações em float64 do ``RandomForestClassifier.predict_proba``,
+de modo que o resultado é idêntico bit a bit ao do modelo original.
+
+Os arrays também podem vir em tipos estreitos (índices uint8/uint16/uint32,
+thresholds float32 e valores das folhas quantizados em inteiros, como no
+formato de ``formato_binario.py``): nesse caso são usados como estão, sem
+cópia, e as probabilidades são normalizadas por linha ao final.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+# Limita a memória temporária (amostras x árvores) ao percorrer lotes grandes
+LINHAS_POR_BLOCO = 4096
+
+
+class FlorestaCompilada:
+    """Floresta achatada em arrays NumPy, compatível com ``Pipeline.predict``.
+
+    Attributes:
+        preprocessor: Transformador aplicado antes da floresta (ou None
+            quando a entrada já é a matriz de features).
+        classes_: Classes do classificador original.
+        n_arvores: Quantidade de árvores.
+        profundidade: Profundidade máxima entre as árvores.
+    """
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        classes: np.ndarray,
+        preprocessor: object = None,
+    ) -> None:
+        self.feature = _inteiros(arrays["feature"])
+        self.threshold = np.ascontiguousarray(arrays["threshold"])
+        if self.threshold.dtype != np.float32:
+            self.threshold = self.threshold.astype(np.float64, copy=False)
+        self.esquerda = _inteiros(arrays["esquerda"])
+        self.direita = _inteiros(arrays["direita"])
+        self.ausente_esquerda = np.ascontiguousarray(arrays["ausente_esquerda"], dtype=bool)
+        self.valores = np.ascontiguousarray(arrays["valores"])
+        # Valores inteiros são distribuições quantizadas (normalizadas na predição)
+        self.quantizado = np.issubdtype(self.valores.dtype, np.integer)
+        if not self.quantizado:
+            self.valores = self.valores.astype(np.float64, copy=False)
+        self.raizes = _inteiros(arrays["raizes"])
+        self.profundidade = int(np.asarray(arrays["profundidade"]).item())
+        self.classes_ = np.asarray(classes)
+        self.preprocessor = preprocessor
+        self.n_arvores = len(self.raizes)
+        # Reaproveita os arrays derivados quando vierem prontos (ex.: memory map)
+        if "folha" not in arrays or "filhos" not in arrays:
+            arrays = {**arrays, **_derivar_arrays(self.esquerda, self.direita)}
+        self.folha = np.ascontiguousarray(arrays["folha"], dtype=bool)
+        self.filhos = _inteiros(arrays["filhos"])
+
+    @classmethod
+    def de_floresta(cls, floresta: object, preprocessor: object = None) -> "FlorestaCompilada":
+        """Compila um ``RandomForestClassifier`` treinado.
+
+        Args:
+            floresta: Classificador treinado (uma saída).
+            preprocessor: Transformador opcional aplicado antes da floresta.
+
+        Returns:
+            Instância de FlorestaCompilada.
+        """
+        return cls(exportar_arrays(floresta), floresta.classes_, preprocessor)
+
+    @classmethod
+    def de_pipeline(cls, pipeline: object) -> "FlorestaCompilada":
+        """Compila o pipeline salvo por ``3_training.py``.
+
+        Args:
+            pipeline: Pipeline com os passos ``preprocessor`` e ``classifier``.
+
+        Returns:
+            Instância de FlorestaCompilada que aceita o mesmo DataFrame de
+            entrada do pipeline.
+        """
+        return cls.de_floresta(
+            pipeline.named_steps["classifier"],
+            pipeline.named_steps["preprocessor"],
+        )
+
+    def exportar(self) -> Dict[str, np.ndarray]:
+        """Retorna os arrays achatados da floresta."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "esquerda": self.esquerda,
+            "direita": self.direita,
+            "ausente_esquerda": self.ausente_esquerda,
+            "valores": self.valores,
+            "raizes": self.raizes,
+            "profundidade": np.asarray(self.profundidade),
+            "folha": self.folha,
+            "filhos": self.filhos,
+        }
+
+    def aplicar(self, X: np.ndarray) -> np.ndarray:
+        """Retorna o índice global da folha atingida em cada árvore.
+
+        Args:
+            X: Matriz de features já transformada (n_amostras, n_features).
+
+        Returns:
+            Array (n_arvores, n_amostras) com índices de nós folha.
+        """
+        # O sklearn converte a entrada para float32 antes de comparar.
+        # A matriz é transposta para que amostras da mesma feature fiquem
+        # contíguas na memória.
+        X = np.asarray(X, dtype=np.float32)
+        n_amostras = len(X)
+        valores_x = np.ascontiguousarray(X.T).ravel()
+        tem_ausentes = bool(np.isnan(valores_x).any())
+
+        # Pares (árvore, amostra) ordenados por árvore para melhor localidade
+        nos = np.repeat(self.raizes.astype(np.intp), n_amostras)
+        amostras = np.tile(np.arange(n_amostras, dtype=np.intp), self.n_arvores)
+        ativos = np.flatnonzero(~self.folha[nos])
+        while len(ativos):
+            no = nos[ativos]
+            valores = valores_x[self.feature[no].astype(np.intp) * n_amostras + amostras[ativos]]
+            vai_direita = ~(valores <= self.threshold[no])
+            if tem_ausentes:
+                nan = np.isnan(valores)
+                vai_direita[nan] = ~self.ausente_esquerda[no[nan]]
+            proximos = self.filhos[2 * no + vai_direita]
+            nos[ativos] = proximos
+            ativos = ativos[~self.folha[proximos]]
+        return nos.reshape(self.n_arvores, n_amostras)
+
+    def predict_proba_matriz(self, X: np.ndarray) -> np.ndarray:
+        """Calcula as probabilidades a partir da matriz já transformada."""
+        X = np.asarray(X)
+        proba = np.zeros((len(X), self.valores.shape[1]), dtype=np.float64)
+        for inicio in range(0, len(X), LINHAS_POR_BLOCO):
+            bloco = slice(inicio, inicio + LINHAS_POR_BLOCO)
+            folhas = self.aplicar(X[bloco])
+            acumulado = proba[bloco]
+            # Soma sequencial na ordem das árvores, como no sklearn
+            for folhas_arvore in folhas:
+                acumulado += self.valores[folhas_arvore]
+        if self.quantizado:
+            proba /= proba.sum(axis=1, keepdims=True)
+        else:
+            proba /= self.n_arvores
+        return proba
+
+    def predict_proba(self, X: object) -> np.ndarray:
+        """Probabilidades por classe, na ordem de ``classes_``."""
+        if self.preprocessor is not None:
+            X = self.preprocessor.transform(X)
+        return self.predict_proba_matriz(X)
+
+    def predict(self, X: object) -> np.ndarray:
+        """Classe prevista para cada amostra."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def _inteiros(valores: np.ndarray) -> np.ndarray:
+    """Mantém arrays de inteiros no tipo original; demais viram ``intp``."""
+    valores = np.ascontiguousarray(valores)
+    if np.issubdtype(valores.dtype, np.integer):
+        return valores
+    return valores.astype(np.intp)
+
+
+def _derivar_arrays(esquerda: np.ndarray, direita: np.ndarray) -> Dict[str, np.ndarray]:
+    """Calcula a máscara de folhas e os filhos intercalados.
+
+    Em ``filhos`` o filho esquerdo do nó ``i`` fica em ``2 * i`` e o direito
+    em ``2 * i + 1``, de modo que um único acesso resolve o próximo nó.
+    """
+    return {
+        "folha": esquerda == np.arange(len(esquerda)),
+        "filhos": np.stack([esquerda, direita], axis=1).ravel(),
+    }
+
+
+def exportar_arrays(floresta: object) -> Dict[str, np.ndarray]:
+    """Concatena os arrays de todas as árvores em índices globais.
+
+    As folhas apontam para si mesmas, o que permite identificá-las sem um
+    array adicional.
+
+    Args:
+        floresta: ``RandomForestClassifier`` treinado com uma saída.
+
+    Returns:
+        Dicionário com os arrays ``feature``, ``threshold``, ``esquerda``,
+        ``direita``, ``ausente_esquerda``, ``valores``, ``raizes``,
+        ``profundidade``, ``folha`` e ``filhos``.
+
+    Raises:
+        ValueError: Caso a floresta tenha mais de uma saída.
+    """
+    if floresta.n_outputs_ != 1:
+        raise ValueError("Apenas florestas com uma saída são suportadas")
+
+    n_classes = int(floresta.n_classes_)
+    partes: Dict[str, list] = {
+        "feature": [],
+        "threshold": [],
+        "esquerda": [],
+        "direita": [],
+        "ausente_esquerda": [],
+        "valores": [],
+    }
+    raizes = []
+    profundidade = 0
+    deslocamento = 0
+
+    for estimador in floresta.estimators_:
+        arvore = estimador.tree_
+        n_nos = arvore.node_count
+        indices = np.arange(deslocamento, deslocamento + n_nos)
+        folha = arvore.children_left == -1
+
+        partes["feature"].append(np.where(folha, 0, arvore.feature))
+        partes["threshold"].append(arvore.threshold)
+        partes["esquerda"].append(np.where(folha, indices, arvore.children_left + deslocamento))
+        partes["direita"].append(np.where(folha, indices, arvore.children_right + deslocamento))
+        ausente = getattr(arvore, "missing_go_to_left", None)
+        if ausente is None:
+            ausente = np.zeros(n_nos, dtype=bool)
+        partes["ausente_esquerda"].append(np.asarray(ausente, dtype=bool))
+        # tree_.value já guarda as frações por classe, como em predict_proba
+        partes["valores"].append(arvore.value[:, 0, :n_classes])
+
+        raizes.append(deslocamento)
+        profundidade = max(profundidade, arvore.max_depth)
+        deslocamento += n_nos
+
+    arrays = {nome: np.concatenate(valores) for nome, valores in partes.items()}
+    arrays["feature"] = arrays["feature"].astype(np.intp)
+    arrays["esquerda"] = arrays["esquerda"].astype(np.intp)
+    arrays["direita"] = arrays["direita"].astype(np.intp)
+    arrays["raizes"] = np.asarray(raizes, dtype=np.intp)
+    arrays["profundidade"] = np.asarray(profundidade)
+    arrays.update(_derivar_arrays(arrays["esquerda"], arrays["direita"]))
+    return arrays
+
+
+__all__ = ["FlorestaCompilada", "exportar_arrays"]
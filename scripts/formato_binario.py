@@ -0,0 +1,293 @@
+"""Formato binário compacto e versionado para o pipeline treinado.
+
+Um único arquivo contém a floresta, o pré-processador e as classes:
+
+- cabeçalho fixo: ``MAGIC`` (4 bytes), versão do formato (uint16), reservado
+  (uint16) e o tamanho do bloco de metadados (uint32), em little-endian;
+- metadados em JSON: classes, rótulos do target, parâmetros do
+  ``CodificadorCompilado`` (médias, escalas e tabelas de categorias), a
+  assinatura do ``modelo.joblib`` de origem e a posição de cada array;
+- arrays alinhados em 64 bytes, nos tipos mais estreitos possíveis:
+  feature em uint8/uint16, filhos intercalados em uint16/uint32 (índices
+  globais), thresholds em float32, ``missing_go_to_left`` em bits e
+  distribuições das folhas quantizadas em uint16.
+
+Thresholds são convertidos para o maior float32 que não excede o valor
+original: como o sklearn compara a entrada já convertida para float32,
+``x <= t`` e ``x <= float32_abaixo(t)`` têm sempre o mesmo resultado, e as
+folhas atingidas são as mesmas. Apenas a quantização das folhas altera as
+probabilidades (erro < 1e-5); executado como script, o módulo compara as
+classes previstas com as do pipeline original em todo o ``Obesity.csv``.
+
+O carregamento lê o arquivo uma vez e cria views ``np.frombuffer`` sobre o
+buffer, sem desserializar objetos Python. A aplicação e o servidor só usam
+o arquivo com ``OBESIDADE_MODELO_BINARIO=1`` (``artefatos.binario_habilitado``).
+
+Uso:
+    python scripts/formato_binario.py [--saida modelo.bin]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from artefatos import (
+    BINARIO_PATH,
+    DATA_PATH,
+    ENCODER_PATH,
+    MODEL_PATH,
+    carregar_artefatos,
+    carregar_preprocessing,
+)
+from codificador_compilado import CodificadorCompilado
+from floresta_compilada import FlorestaCompilada, exportar_arrays
+
+MAGIC = b"OBRF"
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct("<4sHHI")
+ALINHAMENTO = 64
+ESCALA_FOLHAS = np.iinfo(np.uint16).max
+
+
+def _assinatura(caminho: Path) -> Optional[List[int]]:
+    if not caminho.exists():
+        return None
+    estado = caminho.stat()
+    return [estado.st_size, estado.st_mtime_ns]
+
+
+def _menor_inteiro(maximo: int) -> np.dtype:
+    for tipo in (np.uint8, np.uint16, np.uint32):
+        if maximo <= np.iinfo(tipo).max:
+            return np.dtype(tipo)
+    return np.dtype(np.uint64)
+
+
+def _float32_abaixo(valores: np.ndarray) -> np.ndarray:
+    """Maior float32 menor ou igual a cada valor float64."""
+    convertidos = valores.astype(np.float32)
+    acima = convertidos.astype(np.float64) > valores
+    convertidos[acima] = np.nextafter(convertidos[acima], np.float32(-np.inf))
+    return convertidos
+
+
+def _quantizar(valores: np.ndarray) -> np.ndarray:
+    """Quantiza distribuições por linha em uint16 preservando a soma (maiores restos)."""
+    escalados = valores / np.maximum(valores.sum(axis=1, keepdims=True), np.finfo(np.float64).tiny) * ESCALA_FOLHAS
+    inteiros = np.floor(escalados)
+    faltam = (ESCALA_FOLHAS - inteiros.sum(axis=1)).astype(np.intp)
+    ordem = np.argsort(-(escalados - inteiros), axis=1)
+    posicoes = np.arange(valores.shape[1]) < faltam[:, None]
+    np.put_along_axis(inteiros, ordem, np.take_along_axis(inteiros, ordem, axis=1) + posicoes, axis=1)
+    return inteiros.astype(np.uint16)
+
+
+def _arrays_compactos(floresta: object) -> Tuple[Dict[str, np.ndarray], int]:
+    arrays = exportar_arrays(floresta)
+    n_nos = len(arrays["feature"])
+    compactos = {
+        "feature": arrays["feature"].astype(_menor_inteiro(int(arrays["feature"].max()))),
+        "threshold": _float32_abaixo(np.asarray(arrays["threshold"], dtype=np.float64)),
+        "filhos": arrays["filhos"].astype(_menor_inteiro(n_nos - 1)),
+        "ausente_esquerda": np.packbits(arrays["ausente_esquerda"]),
+        "valores": _quantizar(arrays["valores"]),
+        "raizes": arrays["raizes"].astype(np.uint32),
+    }
+    return compactos, int(arrays["profundidade"])
+
+
+def _parametros_codificador(codificador: CodificadorCompilado) -> Dict[str, object]:
+    return {
+        "colunas_numericas": codificador.colunas_numericas,
+        "media": codificador.media.tolist(),
+        "escala": codificador.escala.tolist(),
+        "colunas_ordinais": codificador.colunas_ordinais,
+        "tabelas_ordinais": codificador.tabelas_ordinais,
+        "valor_desconhecido": codificador.valor_desconhecido,
+        "colunas_onehot": codificador.colunas_onehot,
+        "tabelas_onehot": codificador.tabelas_onehot,
+        "nomes_features": codificador.nomes_features,
+    }
+
+
+def exportar_binario(
+    pipeline: object,
+    encoder: object,
+    caminho: Path = BINARIO_PATH,
+    model_path: Path = MODEL_PATH,
+) -> Dict[str, int]:
+    """Grava o pipeline treinado no formato binário compacto.
+
+    Args:
+        pipeline: Pipeline com os passos ``preprocessor`` e ``classifier``.
+        encoder: LabelEncoder do target.
+        caminho: Arquivo de saída (gravado atomicamente).
+        model_path: ``modelo.joblib`` correspondente; sua assinatura é
+            registrada para detectar arquivos desatualizados.
+
+    Returns:
+        Dicionário com o tamanho do arquivo e a quantidade de nós.
+    """
+    floresta = pipeline.named_steps["classifier"]
+    codificador = CodificadorCompilado.de_preprocessor(pipeline.named_steps["preprocessor"])
+    arrays, profundidade = _arrays_compactos(floresta)
+
+    descritores: List[Dict[str, object]] = []
+    deslocamento = 0
+    for nome, valores in arrays.items():
+        descritores.append({
+            "nome": nome,
+            "dtype": valores.dtype.str,
+            "forma": list(valores.shape),
+            "deslocamento": deslocamento,
+        })
+        deslocamento += -(-valores.nbytes // ALINHAMENTO) * ALINHAMENTO
+
+    metadados = json.dumps({
+        "classes": floresta.classes_.tolist(),
+        "rotulos": list(encoder.classes_),
+        "codificador": _parametros_codificador(codificador),
+        "profundidade": profundidade,
+        "n_nos": int(len(arrays["feature"])),
+        "origem": _assinatura(model_path),
+        "arrays": descritores,
+    }).encode("utf-8")
+    inicio_dados = -(-(CABECALHO.size + len(metadados)) // ALINHAMENTO) * ALINHAMENTO
+
+    buffer = bytearray(inicio_dados + deslocamento)
+    CABECALHO.pack_into(buffer, 0, MAGIC, VERSAO_FORMATO, 0, len(metadados))
+    buffer[CABECALHO.size : CABECALHO.size + len(metadados)] = metadados
+    for descritor, valores in zip(descritores, arrays.values()):
+        posicao = inicio_dados + descritor["deslocamento"]
+        buffer[posicao : posicao + valores.nbytes] = np.ascontiguousarray(valores).tobytes()
+
+    temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+    temporario.write_bytes(buffer)
+    temporario.replace(caminho)
+    return {"tamanho_bytes": len(buffer), "n_nos": int(len(arrays["feature"]))}
+
+
+def ler_binario(dados: bytes) -> Tuple[FlorestaCompilada, LabelEncoder, Dict[str, object]]:
+    """Reconstrói modelo e encoder a partir do conteúdo de um arquivo binário.
+
+    Args:
+        dados: Conteúdo completo do arquivo.
+
+    Returns:
+        Tupla com FlorestaCompilada (com o codificador como pré-processador),
+        LabelEncoder e os metadados.
+
+    Raises:
+        ValueError: Caso o arquivo não seja do formato ou de outra versão.
+    """
+    magic, versao, _, tamanho_metadados = CABECALHO.unpack_from(dados, 0)
+    if magic != MAGIC:
+        raise ValueError("Arquivo não está no formato binário do modelo")
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão de formato não suportada: {versao}")
+    metadados = json.loads(dados[CABECALHO.size : CABECALHO.size + tamanho_metadados])
+    inicio_dados = -(-(CABECALHO.size + tamanho_metadados) // ALINHAMENTO) * ALINHAMENTO
+
+    brutos = {}
+    for descritor in metadados["arrays"]:
+        tipo = np.dtype(descritor["dtype"])
+        forma = tuple(descritor["forma"])
+        brutos[descritor["nome"]] = np.frombuffer(
+            dados, dtype=tipo, count=math.prod(forma), offset=inicio_dados + descritor["deslocamento"]
+        ).reshape(forma)
+
+    n_nos = metadados["n_nos"]
+    filhos = brutos["filhos"]
+    arrays = {
+        "feature": brutos["feature"],
+        "threshold": brutos["threshold"],
+        "esquerda": filhos[0::2],
+        "direita": filhos[1::2],
+        "ausente_esquerda": np.unpackbits(brutos["ausente_esquerda"], count=n_nos).view(bool),
+        "valores": brutos["valores"],
+        "raizes": brutos["raizes"],
+        "profundidade": np.asarray(metadados["profundidade"]),
+        "folha": filhos[0::2] == np.arange(n_nos),
+        "filhos": filhos,
+    }
+    codificador = CodificadorCompilado(**metadados["codificador"])
+    modelo = FlorestaCompilada(arrays, np.asarray(metadados["classes"]), codificador)
+
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(metadados["rotulos"], dtype=object)
+    return modelo, encoder, metadados
+
+
+def carregar_binario(
+    caminho: Path = BINARIO_PATH,
+    model_path: Optional[Path] = MODEL_PATH,
+) -> Optional[Tuple[FlorestaCompilada, LabelEncoder]]:
+    """Carrega modelo e encoder do arquivo binário, se existir e estiver atual.
+
+    Args:
+        caminho: Arquivo gerado por ``exportar_binario``.
+        model_path: ``modelo.joblib`` de referência. Se ele existir e tiver
+            sido alterado depois da exportação, o arquivo é ignorado. Use
+            None para não verificar.
+
+    Returns:
+        Tupla (modelo, encoder), ou None se não houver um arquivo válido.
+    """
+    if not caminho.exists():
+        return None
+    try:
+        modelo, encoder, metadados = ler_binario(caminho.read_bytes())
+    except ValueError:
+        return None
+    if model_path is not None and model_path.exists() and metadados["origem"] != _assinatura(model_path):
+        return None
+    return modelo, encoder
+
+
+def main() -> None:
+    """Exporta o ``modelo.joblib`` atual e compara com o pipeline original."""
+    parser = argparse.ArgumentParser(description="Exporta o modelo para o formato binário compacto")
+    parser.add_argument("--saida", type=Path, default=BINARIO_PATH, help="Arquivo de saída")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("EXPORTAÇÃO PARA O FORMATO BINÁRIO")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    pipeline, encoder = carregar_artefatos()
+    tempo_joblib = time.perf_counter() - inicio
+    resumo = exportar_binario(pipeline, encoder, args.saida)
+
+    inicio = time.perf_counter()
+    modelo, encoder_binario = carregar_binario(args.saida)
+    tempo_binario = time.perf_counter() - inicio
+
+    tamanho_joblib = MODEL_PATH.stat().st_size + ENCODER_PATH.stat().st_size
+    print(f"     - Nós: {resumo['n_nos']}")
+    print(f"     - Tamanho: {tamanho_joblib / 1024:.0f} KB (joblib) -> {resumo['tamanho_bytes'] / 1024:.0f} KB")
+    print(f"     - Carregamento: {tempo_joblib * 1000:.1f} ms (joblib) -> {tempo_binario * 1000:.1f} ms")
+
+    preprocessing_module = carregar_preprocessing()
+    df = preprocessing_module.criar_bmi(pd.read_csv(DATA_PATH))
+    X = df.drop(columns=[preprocessing_module.TARGET_COLUMN])
+    esperado = encoder.inverse_transform(pipeline.predict(X))
+    obtido = encoder_binario.inverse_transform(modelo.predict(X))
+    proba = pipeline.predict_proba(X)
+    diferenca = np.abs(modelo.predict_proba(X) - proba).max()
+    print(f"     - Predições idênticas: {int((esperado == obtido).sum())}/{len(X)}")
+    print(f"     - Maior diferença de probabilidade: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
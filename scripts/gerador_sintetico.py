@@ -0,0 +1,367 @@
+"""Gerador vetorizado de pacientes sintéticos com o esquema de ``Obesity.csv``.
+
+Para testes de carga e de escala. O gerador aprende, para cada nível de
+obesidade, a distribuição marginal de cada variável e a correlação entre
+elas com uma cópula gaussiana:
+
+- cada coluna é levada a escores normais (postos médios, ou o ponto médio
+  da probabilidade acumulada do nível nas categóricas) e a correlação
+  desses escores é estimada por classe;
+- na geração, vetores normais correlacionados voltam ao domínio de cada
+  coluna pela função quantil empírica da classe (numéricas) ou pelas
+  probabilidades acumuladas dos níveis (categóricas).
+
+Assim a proporção das classes, as marginais por classe (inclusive os
+valores inteiros repetidos das escalas) e a dependência entre altura, peso,
+gênero e hábitos são preservadas. Os valores respeitam os domínios de
+``data/dicionario.txt`` (níveis categóricos, escalas 1–3, 1–4, 0–3 e 0–2,
+faixas de idade, altura e peso).
+
+Uso:
+    python scripts/gerador_sintetico.py data/Obesity_sintetico.parquet --linhas 10000000 --chunk-size 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from artefatos import DATA_PATH, PROJECT_ROOT, carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+ORDINAL_ORDER = preprocessing_module.ORDINAL_ORDER
+
+SAIDA_PATH = PROJECT_ROOT / "data" / "Obesity_sintetico.parquet"
+CHUNK_SIZE = 1_000_000
+RANDOM_STATE = 42
+
+# Domínios de data/dicionario.txt
+DOMINIOS: Dict[str, Tuple[float, float]] = {
+    "Age": (14.0, 61.0),
+    "Height": (1.45, 1.98),
+    "Weight": (39.0, 173.0),
+    "FCVC": (1.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "CH2O": (1.0, 3.0),
+    "FAF": (0.0, 3.0),
+    "TUE": (0.0, 2.0),
+}
+NIVEIS: Dict[str, List[str]] = {
+    "Gender": ["Female", "Male"],
+    "family_history": ["no", "yes"],
+    "FAVC": ["no", "yes"],
+    "CAEC": ORDINAL_ORDER,
+    "SMOKE": ["no", "yes"],
+    "SCC": ["no", "yes"],
+    "CALC": ORDINAL_ORDER,
+    "MTRANS": ["Automobile", "Motorbike", "Bike", "Public_Transportation", "Walking"],
+}
+
+
+# Tabela da função quantil de cada numérica, amostrada em uma grade uniforme
+# de escores normais: a geração faz uma interpolação O(1) por valor, sem
+# busca binária nem ndtr
+LIMITE_ESCORE = 6.0
+PONTOS_TABELA = 4097
+
+
+@dataclass
+class _Classe:
+    """Parâmetros da cópula de um nível de obesidade.
+
+    Attributes:
+        proporcao: Fração das linhas do dataset real nesta classe.
+        cholesky: Fator de Cholesky da correlação dos escores normais.
+        tabelas: Valor da numérica em cada ponto da grade de escores.
+        limites: Escores que separam os níveis de cada categórica.
+    """
+
+    proporcao: float
+    cholesky: np.ndarray
+    tabelas: Dict[str, np.ndarray]
+    limites: Dict[str, np.ndarray]
+
+
+def _escores_normais(df: pd.DataFrame, colunas: List[str]) -> np.ndarray:
+    """Escores normais de cada coluna (postos médios / probabilidade acumulada)."""
+    escores = np.empty((len(df), len(colunas)))
+    for j, coluna in enumerate(colunas):
+        if coluna in NIVEIS:
+            codigos = pd.Categorical(df[coluna], categories=NIVEIS[coluna]).codes
+            proporcoes = np.bincount(codigos, minlength=len(NIVEIS[coluna])) / len(df)
+            acumulada = np.cumsum(proporcoes)
+            u = acumulada[codigos] - proporcoes[codigos] / 2
+        else:
+            u = df[coluna].rank(method="average").to_numpy() / (len(df) + 1)
+        escores[:, j] = ndtri(u)
+    return escores
+
+
+def _tabela_quantil(valores: np.ndarray) -> np.ndarray:
+    """Função quantil empírica avaliada na grade uniforme de escores normais."""
+    ordenados = np.sort(valores)
+    grade = (np.arange(len(ordenados)) + 0.5) / len(ordenados)
+    return np.interp(ndtr(np.linspace(-LIMITE_ESCORE, LIMITE_ESCORE, PONTOS_TABELA)), grade, ordenados)
+
+
+def _interpolar_tabela(escores: np.ndarray, tabela: np.ndarray) -> np.ndarray:
+    posicao = (escores + LIMITE_ESCORE) * ((PONTOS_TABELA - 1) / (2 * LIMITE_ESCORE))
+    np.clip(posicao, 0, PONTOS_TABELA - 1.001, out=posicao)
+    indice = posicao.astype(np.intp)
+    fracao = posicao - indice
+    return tabela[indice] + fracao * (tabela[indice + 1] - tabela[indice])
+
+
+def _cholesky_correlacao(escores: np.ndarray) -> np.ndarray:
+    """Fator de Cholesky da correlação dos escores, projetada para ser positiva definida."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlacao = np.corrcoef(escores, rowvar=False)
+    # Colunas constantes na classe ficam independentes das demais
+    correlacao = np.nan_to_num(correlacao, nan=0.0)
+    np.fill_diagonal(correlacao, 1.0)
+    autovalores, autovetores = np.linalg.eigh(correlacao)
+    correlacao = autovetores @ np.diag(np.clip(autovalores, 1e-6, None)) @ autovetores.T
+    d = np.sqrt(np.diag(correlacao))
+    return np.linalg.cholesky(correlacao / np.outer(d, d))
+
+
+class GeradorSintetico:
+    """Cópula gaussiana por classe ajustada em ``Obesity.csv``.
+
+    Attributes:
+        colunas: Colunas geradas, na ordem do arquivo original.
+        classes: Níveis de obesidade, na ordem de ``parametros``.
+        parametros: Proporção, correlação e marginais de cada classe.
+    """
+
+    def __init__(self, colunas: List[str], classes: List[str], parametros: List[_Classe]) -> None:
+        self.colunas = colunas
+        self.classes = classes
+        self.parametros = parametros
+        self._features = [coluna for coluna in colunas if coluna != TARGET_COLUMN]
+        self._posicoes_numericas = {coluna: k for k, coluna in enumerate(NUMERIC_FEATURES)}
+        self._posicoes_niveis = {coluna: k for k, coluna in enumerate(NIVEIS)}
+
+    @classmethod
+    def ajustar(cls, df: pd.DataFrame) -> "GeradorSintetico":
+        """Estima a cópula de cada classe a partir do dataset real.
+
+        Args:
+            df: Dataset com o esquema de ``Obesity.csv``.
+
+        Returns:
+            Gerador ajustado.
+
+        Raises:
+            ValueError: Caso alguma coluna tenha valores fora do domínio de
+                ``dicionario.txt``.
+        """
+        for coluna, niveis in NIVEIS.items():
+            desconhecidos = set(df[coluna].dropna().unique()) - set(niveis)
+            if desconhecidos:
+                raise ValueError(f"Níveis fora do domínio em {coluna}: {sorted(desconhecidos)}")
+        for coluna, (minimo, maximo) in DOMINIOS.items():
+            if df[coluna].min() < minimo or df[coluna].max() > maximo:
+                raise ValueError(f"Valores de {coluna} fora da faixa [{minimo}, {maximo}]")
+
+        colunas = list(df.columns)
+        features = [coluna for coluna in colunas if coluna != TARGET_COLUMN]
+        classes = sorted(df[TARGET_COLUMN].unique())
+        parametros = []
+        for classe in classes:
+            grupo = df[df[TARGET_COLUMN] == classe]
+            limites = {}
+            for coluna, niveis in NIVEIS.items():
+                acumulada = np.cumsum(pd.Categorical(grupo[coluna], categories=niveis).value_counts().to_numpy())
+                with np.errstate(divide="ignore"):
+                    limites[coluna] = ndtri(acumulada[:-1] / len(grupo)).astype(np.float32)
+            parametros.append(
+                _Classe(
+                    proporcao=len(grupo) / len(df),
+                    cholesky=_cholesky_correlacao(_escores_normais(grupo, features)).astype(np.float32),
+                    tabelas={coluna: _tabela_quantil(grupo[coluna].to_numpy(dtype=float)) for coluna in NUMERIC_FEATURES},
+                    limites=limites,
+                )
+            )
+        return cls(colunas, classes, parametros)
+
+    def gerar(self, n: int, rng: np.random.Generator) -> pd.DataFrame:
+        """Gera ``n`` pacientes rotulados.
+
+        Args:
+            n: Quantidade de linhas.
+            rng: Gerador de números aleatórios.
+
+        Returns:
+            DataFrame com as colunas de ``Obesity.csv``; as categóricas usam
+            ``category`` com todos os níveis do dicionário.
+        """
+        # Linhas agrupadas por classe durante a geração e embaralhadas no fim;
+        # arrays (colunas, linhas) para que cada coluna seja contígua
+        contagens = rng.multinomial(n, [classe.proporcao for classe in self.parametros])
+        escores = rng.standard_normal((len(self._features), n), dtype=np.float32)
+        numericas = np.empty((len(NUMERIC_FEATURES), n))
+        codigos = np.empty((len(NIVEIS), n), dtype=np.int8)
+
+        inicio = 0
+        for classe, contagem in zip(self.parametros, contagens):
+            fim = inicio + contagem
+            correlacionados = classe.cholesky @ escores[:, inicio:fim]
+            for j, coluna in enumerate(self._features):
+                if coluna in NIVEIS:
+                    k = self._posicoes_niveis[coluna]
+                    codigos[k, inicio:fim] = np.searchsorted(classe.limites[coluna], correlacionados[j])
+                else:
+                    k = self._posicoes_numericas[coluna]
+                    numericas[k, inicio:fim] = _interpolar_tabela(correlacionados[j], classe.tabelas[coluna])
+            inicio = fim
+
+        ordem = rng.permutation(n)
+        rotulos = np.repeat(np.arange(len(self.classes), dtype=np.int8), contagens)[ordem]
+
+        dados: Dict[str, object] = {}
+        for coluna in self.colunas:
+            if coluna == TARGET_COLUMN:
+                dados[coluna] = pd.Categorical.from_codes(rotulos, self.classes)
+            elif coluna in NIVEIS:
+                dados[coluna] = pd.Categorical.from_codes(codigos[self._posicoes_niveis[coluna]][ordem], NIVEIS[coluna])
+            else:
+                k = self._posicoes_numericas[coluna]
+                dados[coluna] = np.clip(numericas[k][ordem], *DOMINIOS[coluna])
+        return pd.DataFrame(dados, columns=self.colunas)
+
+    def gerar_blocos(
+        self, linhas: int, chunk_size: int = CHUNK_SIZE, random_state: int = RANDOM_STATE
+    ) -> Iterator[pd.DataFrame]:
+        """Gera ``linhas`` pacientes em blocos de no máximo ``chunk_size``."""
+        rng = np.random.default_rng(random_state)
+        for inicio in range(0, linhas, chunk_size):
+            yield self.gerar(min(chunk_size, linhas - inicio), rng)
+
+
+def escrever_arquivo(
+    gerador: GeradorSintetico,
+    destino: Path,
+    linhas: int,
+    chunk_size: int = CHUNK_SIZE,
+    random_state: int = RANDOM_STATE,
+) -> Dict[str, float]:
+    """Gera e grava o dataset sintético bloco a bloco (CSV ou Parquet).
+
+    O arquivo é escrito em um temporário e renomeado ao final; se algo
+    falhar no caminho, o temporário é removido.
+
+    Args:
+        gerador: Gerador ajustado.
+        destino: Arquivo ``.csv`` ou ``.parquet``.
+        linhas: Total de linhas.
+        chunk_size: Linhas por bloco (define o pico de memória).
+        random_state: Semente da geração.
+
+    Returns:
+        Dicionário com linhas, blocos e segundos de geração e de escrita.
+
+    Raises:
+        ValueError: Caso ``linhas`` ou ``chunk_size`` não sejam positivos.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if linhas <= 0 or chunk_size <= 0:
+        raise ValueError(f"linhas e chunk_size devem ser positivos (recebidos {linhas} e {chunk_size})")
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(destino.name + ".tmp")
+    parquet = destino.suffix.lower() in {".parquet", ".pq"}
+    escritor = None
+    blocos = 0
+    geracao = escrita = 0.0
+    try:
+        inicio = time.perf_counter()
+        for bloco in gerador.gerar_blocos(linhas, chunk_size, random_state):
+            gerado = time.perf_counter()
+            geracao += gerado - inicio
+            if parquet:
+                tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(temporario, tabela.schema)
+                escritor.write_table(tabela)
+            else:
+                bloco.to_csv(temporario, mode="a" if blocos else "w", header=blocos == 0, index=False)
+            blocos += 1
+            inicio = time.perf_counter()
+            escrita += inicio - gerado
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+        temporario.replace(destino)
+    finally:
+        if escritor is not None:
+            escritor.close()
+        temporario.unlink(missing_ok=True)
+    return {"linhas": linhas, "blocos": blocos, "geracao_s": geracao, "escrita_s": escrita}
+
+
+def comparar(real: pd.DataFrame, sintetico: pd.DataFrame) -> Dict[str, float]:
+    """Distância entre o dataset real e o sintético.
+
+    Returns:
+        Maior diferença de proporção de classe, maior diferença de média
+        numérica por classe (em desvios padrão da coluna) e maior diferença
+        de correlação entre as numéricas.
+    """
+    proporcoes_real = real[TARGET_COLUMN].value_counts(normalize=True)
+    proporcoes_sint = sintetico[TARGET_COLUMN].astype(str).value_counts(normalize=True)
+    medias_real = real.groupby(TARGET_COLUMN)[NUMERIC_FEATURES].mean()
+    medias_sint = sintetico.groupby(sintetico[TARGET_COLUMN].astype(str))[NUMERIC_FEATURES].mean()
+    desvios = real[NUMERIC_FEATURES].std()
+    correlacao_real = real[NUMERIC_FEATURES].corr().to_numpy()
+    correlacao_sint = sintetico[NUMERIC_FEATURES].corr().to_numpy()
+    return {
+        "proporcao": float((proporcoes_real - proporcoes_sint).abs().max()),
+        "media": float(((medias_real - medias_sint).abs() / desvios).to_numpy().max()),
+        "correlacao": float(np.abs(correlacao_real - correlacao_sint).max()),
+    }
+
+
+def main() -> None:
+    """Ajusta o gerador em ``Obesity.csv`` e grava o dataset sintético."""
+    parser = argparse.ArgumentParser(description="Gera pacientes sintéticos com o esquema de Obesity.csv")
+    parser.add_argument("destino", type=Path, nargs="?", default=SAIDA_PATH, help="Arquivo .csv ou .parquet")
+    parser.add_argument("--linhas", type=int, default=CHUNK_SIZE, help="Total de linhas geradas")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Linhas por bloco")
+    parser.add_argument("--origem", type=Path, default=DATA_PATH, help="Dataset real usado no ajuste")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE, help="Semente da geração")
+    args = parser.parse_args()
+    if args.linhas <= 0 or args.chunk_size <= 0:
+        parser.error("--linhas e --chunk-size devem ser positivos")
+
+    print("=" * 60)
+    print("GERADOR DE DADOS SINTÉTICOS")
+    print("=" * 60)
+    real = pd.read_csv(args.origem)
+    gerador = GeradorSintetico.ajustar(real)
+    print(f"     - Ajustado em {len(real)} registros de {args.origem.name} ({len(gerador.classes)} classes)")
+
+    amostra = gerador.gerar(min(args.linhas, 200_000), np.random.default_rng(args.seed))
+    distancias = comparar(real, amostra)
+    print(f"     - Maior diferença de proporção de classe: {distancias['proporcao']:.4f}")
+    print(f"     - Maior diferença de média por classe: {distancias['media']:.3f} desvios padrão")
+    print(f"     - Maior diferença de correlação: {distancias['correlacao']:.3f}")
+
+    resumo = escrever_arquivo(gerador, args.destino, args.linhas, args.chunk_size, args.seed)
+    print(f"     - Linhas gravadas: {resumo['linhas']} em {resumo['blocos']} bloco(s): {args.destino}")
+    print(f"     - Geração: {resumo['linhas'] / resumo['geracao_s']:,.0f} linhas/s")
+    print(f"     - Escrita: {resumo['linhas'] / resumo['escrita_s']:,.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
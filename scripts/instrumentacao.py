@@ -0,0 +1,349 @@
+"""Instrumentação leve: etapas cronometradas, contadores e histogramas.
+
+Um registro único por processo (``REGISTRO``) acumula:
+
+- **etapas**: ``with medir("predicao.predict_proba"):`` registra a duração
+  no histograma ``obesidade_etapa_duracao_segundos`` com o rótulo
+  ``etapa``;
+- **contadores**: ``contar("predicoes_total", cache="acerto")``;
+- **histogramas**: ``observar("lote_tamanho", 12, limites=...)``.
+
+O conteúdo é exportado no formato texto do Prometheus (``prometheus()``,
+servido por ``servir_metricas`` ou pela rota ``/metrics`` do servidor de
+inferência) ou como resumo JSON (``resumo()``, gravado pelo treinamento).
+
+Com a variável de ambiente ``OBESIDADE_METRICAS=0`` (ou
+``REGISTRO.ativo = False``) nada é registrado e ``medir`` devolve um
+contexto vazio, sem chamar o relógio.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PREFIXO = "obesidade_"
+METRICA_ETAPAS = "etapa_duracao_segundos"
+# Em segundos: de 0.1 ms (predição em cache) a 10 min (busca de hiperparâmetros)
+LIMITES_DURACAO: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0,
+)
+DESCRICOES = {
+    METRICA_ETAPAS: "Duração das etapas instrumentadas",
+    "predicoes_total": "Predições do formulário por resultado do cache",
+    "requisicoes_total": "Requisições HTTP do servidor de inferência por rota e status",
+    "lote_tamanho": "Pacientes por micro-lote do servidor de inferência",
+}
+PORTA_METRICAS = 9100
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def _ativo_por_ambiente() -> bool:
+    return os.environ.get("OBESIDADE_METRICAS", "1").strip().lower() not in {"0", "false", "nao", "não", "off"}
+
+
+class Histograma:
+    """Histograma cumulativo com limites fixos (semântica do Prometheus).
+
+    Attributes:
+        limites: Limites superiores dos baldes, crescentes.
+        contagens: Observações por balde (o último é ``+Inf``).
+        soma: Soma das observações.
+        maximo: Maior observação.
+    """
+
+    def __init__(self, limites: Sequence[float] = LIMITES_DURACAO) -> None:
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    @property
+    def total(self) -> int:
+        """Quantidade de observações."""
+        return sum(self.contagens)
+
+    def observar(self, valor: float) -> None:
+        """Registra uma observação."""
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def quantil(self, q: float) -> float:
+        """Estimativa do quantil ``q`` por interpolação linear dentro do balde."""
+        total = self.total
+        if total == 0:
+            return 0.0
+        alvo = q * total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if acumulado + contagem >= alvo and contagem:
+                inferior = self.limites[i - 1] if i > 0 else 0.0
+                superior = self.limites[i] if i < len(self.limites) else self.maximo
+                return min(inferior + (superior - inferior) * (alvo - acumulado) / contagem, self.maximo)
+            acumulado += contagem
+        return self.maximo
+
+
+class _Cronometro:
+    """Contexto que mede uma etapa e a registra ao sair."""
+
+    __slots__ = ("_registro", "_etapa", "_rotulos", "_inicio")
+
+    def __init__(self, registro: "RegistroMetricas", etapa: str, rotulos: Dict[str, str]) -> None:
+        self._registro = registro
+        self._etapa = etapa
+        self._rotulos = rotulos
+        self._inicio = 0.0
+
+    def __enter__(self) -> "_Cronometro":
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._registro.observar(
+            METRICA_ETAPAS, time.perf_counter() - self._inicio, etapa=self._etapa, **self._rotulos
+        )
+
+
+class _Vazio:
+    """Contexto sem efeito usado quando a instrumentação está desligada."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_Vazio":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_VAZIO = _Vazio()
+
+
+def _rotulos(rotulos: Dict[str, object]) -> Rotulos:
+    return tuple(sorted((nome, str(valor)) for nome, valor in rotulos.items()))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class RegistroMetricas:
+    """Registro thread-safe de contadores e histogramas do processo.
+
+    Attributes:
+        ativo: Se False, ``contar``, ``observar`` e ``medir`` não fazem nada.
+    """
+
+    def __init__(self, ativo: Optional[bool] = None) -> None:
+        self.ativo = _ativo_por_ambiente() if ativo is None else ativo
+        self._contadores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, Histograma]] = {}
+        self._limites: Dict[str, Tuple[float, ...]] = {}
+        self._lock = threading.Lock()
+
+    def contar(self, nome: str, valor: float = 1, **rotulos: object) -> None:
+        """Incrementa o contador ``nome`` com os rótulos dados."""
+        if not self.ativo:
+            return
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(
+        self, nome: str, valor: float, limites: Optional[Sequence[float]] = None, **rotulos: object
+    ) -> None:
+        """Registra ``valor`` no histograma ``nome``.
+
+        Args:
+            nome: Nome da métrica (sem o prefixo).
+            valor: Observação.
+            limites: Limites dos baldes, usados na primeira observação da
+                métrica (padrão: ``LIMITES_DURACAO``).
+            **rotulos: Rótulos da série.
+        """
+        if not self.ativo:
+            return
+        chave = _rotulos(rotulos)
+        with self._lock:
+            limites_metrica = self._limites.setdefault(nome, tuple(limites or LIMITES_DURACAO))
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma(limites_metrica)
+            histograma.observar(valor)
+
+    def medir(self, etapa: str, **rotulos: object):
+        """Contexto que registra a duração de ``etapa``."""
+        if not self.ativo:
+            return _VAZIO
+        return _Cronometro(self, etapa, rotulos)
+
+    def limpar(self) -> None:
+        """Descarta todas as séries."""
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+            self._limites.clear()
+
+    def prometheus(self) -> str:
+        """Exporta as séries no formato texto do Prometheus (versão 0.0.4)."""
+        linhas: List[str] = []
+        with self._lock:
+            for nome, serie in sorted(self._contadores.items()):
+                completo = PREFIXO + nome
+                if nome in DESCRICOES:
+                    linhas.append(f"# HELP {completo} {DESCRICOES[nome]}")
+                linhas.append(f"# TYPE {completo} counter")
+                for rotulos, valor in sorted(serie.items()):
+                    linhas.append(f"{completo}{_formatar_rotulos(rotulos)} {_formatar_numero(valor)}")
+            for nome, serie in sorted(self._histogramas.items()):
+                completo = PREFIXO + nome
+                if nome in DESCRICOES:
+                    linhas.append(f"# HELP {completo} {DESCRICOES[nome]}")
+                linhas.append(f"# TYPE {completo} histogram")
+                for rotulos, histograma in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(histograma.limites + (float("inf"),), histograma.contagens):
+                        acumulado += contagem
+                        le = ("le", _formatar_numero(limite))
+                        linhas.append(f"{completo}_bucket{_formatar_rotulos(rotulos, le)} {acumulado}")
+                    linhas.append(f"{completo}_sum{_formatar_rotulos(rotulos)} {_formatar_numero(histograma.soma)}")
+                    linhas.append(f"{completo}_count{_formatar_rotulos(rotulos)} {acumulado}")
+        return "\n".join(linhas) + "\n"
+
+    def resumo(self) -> Dict[str, object]:
+        """Resumo JSON-serializável: etapas, demais histogramas e contadores.
+
+        Returns:
+            Dicionário ``{"etapas": {etapa: {chamadas, total_s, media_s,
+            p50_s, p95_s, p99_s, max_s}}, "histogramas": {...},
+            "contadores": {...}}``; séries com rótulos além de ``etapa``
+            usam a chave ``nome{rotulo=valor,...}``.
+        """
+        def descrever(histograma: Histograma, sufixo: str = "") -> Dict[str, float]:
+            total = histograma.total
+            return {
+                "chamadas": total,
+                f"total{sufixo}": histograma.soma,
+                f"media{sufixo}": histograma.soma / total if total else 0.0,
+                f"p50{sufixo}": histograma.quantil(0.5),
+                f"p95{sufixo}": histograma.quantil(0.95),
+                f"p99{sufixo}": histograma.quantil(0.99),
+                f"max{sufixo}": histograma.maximo,
+            }
+
+        def chave(nome: str, rotulos: Rotulos) -> str:
+            return nome + (_formatar_rotulos(rotulos).replace('"', "") if rotulos else "")
+
+        with self._lock:
+            etapas = {}
+            for rotulos, histograma in self._histogramas.get(METRICA_ETAPAS, {}).items():
+                etapa = dict(rotulos)["etapa"]
+                outros = tuple(par for par in rotulos if par[0] != "etapa")
+                etapas[chave(etapa, outros)] = descrever(histograma, "_s")
+            histogramas = {
+                chave(nome, rotulos): descrever(histograma)
+                for nome, serie in self._histogramas.items()
+                if nome != METRICA_ETAPAS
+                for rotulos, histograma in serie.items()
+            }
+            contadores = {
+                chave(nome, rotulos): valor for nome, serie in self._contadores.items() for rotulos, valor in serie.items()
+            }
+        return {"etapas": etapas, "histogramas": histogramas, "contadores": contadores}
+
+    def salvar_resumo(self, caminho: Path, **extras: object) -> None:
+        """Grava ``resumo()`` (mais ``extras``) em JSON."""
+        caminho.write_text(json.dumps({**extras, **self.resumo()}, indent=2, ensure_ascii=False))
+
+
+REGISTRO = RegistroMetricas()
+
+
+def medir(etapa: str, **rotulos: object):
+    """Atalho para ``REGISTRO.medir``."""
+    return REGISTRO.medir(etapa, **rotulos)
+
+
+def contar(nome: str, valor: float = 1, **rotulos: object) -> None:
+    """Atalho para ``REGISTRO.contar``."""
+    REGISTRO.contar(nome, valor, **rotulos)
+
+
+def observar(nome: str, valor: float, limites: Optional[Sequence[float]] = None, **rotulos: object) -> None:
+    """Atalho para ``REGISTRO.observar``."""
+    REGISTRO.observar(nome, valor, limites, **rotulos)
+
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    registro: RegistroMetricas = REGISTRO
+
+    def do_GET(self) -> None:  # noqa: N802 - nome exigido por BaseHTTPRequestHandler
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = self.registro.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args: object) -> None:
+        return None
+
+
+def servir_metricas(
+    porta: int = PORTA_METRICAS, host: str = "127.0.0.1", registro: RegistroMetricas = REGISTRO
+) -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` em uma thread de segundo plano.
+
+    Args:
+        porta: Porta de escuta.
+        host: Interface de escuta.
+        registro: Registro exportado.
+
+    Returns:
+        Servidor em execução (``shutdown()`` encerra a thread).
+    """
+    manipulador = type("ManipuladorMetricas", (_ManipuladorMetricas,), {"registro": registro})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="exportador-metricas", daemon=True).start()
+    return servidor
+
+
+__all__ = [
+    "REGISTRO",
+    "Histograma",
+    "RegistroMetricas",
+    "contar",
+    "medir",
+    "observar",
+    "servir_metricas",
+]
@@ -0,0 +1,358 @@
+"""Monitor de drift das predições do formulário, com estatísticas de uma passada.
+
+A cada paciente pontuado, ``MonitorDrift.registrar`` atualiza em O(1) e com
+memória constante (nenhum registro é guardado):
+
+- **numéricas** (``Age``, ``Height``, ``Weight``, ``BMI`` e as escalas):
+  momentos corridos (média e variância de Welford, mínimo, máximo) e um
+  esboço de quantis em baldes fixos sobre a faixa aceita pelo formulário;
+- **categóricas**: contagem por nível;
+- **classe prevista**: contagem por nível de obesidade.
+
+Todas as estatísticas são combináveis (``combinar``), então monitores de
+processos diferentes podem ser somados. A base é calculada uma vez a partir
+do dataset de treino (com a classe real no lugar da prevista), e
+``relatorio`` compara base e fluxo atual pelo PSI (population stability
+index) em decis da base, além da diferença de médias em desvios padrão.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from artefatos import carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+
+# Faixas dos esboços: cobrem os limites dos widgets do formulário e os do
+# dataset; valores de fora caem no primeiro ou no último balde
+FAIXAS: Dict[str, Tuple[float, float]] = {
+    "Age": (14.0, 80.0),
+    "Height": (1.40, 2.20),
+    "Weight": (30.0, 200.0),
+    "FCVC": (1.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "CH2O": (1.0, 3.0),
+    "FAF": (0.0, 3.0),
+    "TUE": (0.0, 2.0),
+    BMI_COLUMN: (10.0, 70.0),
+}
+BALDES = 200
+DECIS = np.linspace(0.1, 0.9, 9)
+# Limiares usuais do PSI: < 0.1 estável, 0.1–0.25 moderado, > 0.25 alto
+PSI_MODERADO = 0.1
+PSI_ALTO = 0.25
+MINIMO_AMOSTRAS = 30
+EPSILON = 1e-4
+
+
+class Momentos:
+    """Contagem, média, variância (Welford), mínimo e máximo corridos."""
+
+    __slots__ = ("n", "media", "m2", "minimo", "maximo")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def atualizar(self, valor: float) -> None:
+        """Incorpora uma observação."""
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def atualizar_lote(self, valores: np.ndarray) -> None:
+        """Incorpora um array de observações (combinação de Chan)."""
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        lote = Momentos()
+        lote.n = len(valores)
+        lote.media = float(valores.mean())
+        lote.m2 = float(((valores - lote.media) ** 2).sum())
+        lote.minimo = float(valores.min())
+        lote.maximo = float(valores.max())
+        self.combinar(lote)
+
+    def combinar(self, outro: "Momentos") -> None:
+        """Soma as observações de ``outro`` a estas."""
+        if outro.n == 0:
+            return
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        self.m2 += outro.m2 + delta * delta * self.n * outro.n / n
+        self.media += delta * outro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+
+    @property
+    def desvio(self) -> float:
+        """Desvio padrão amostral."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class EsbocoQuantis:
+    """Histograma de baldes fixos sobre ``[inicio, fim]``, combinável por soma.
+
+    O erro dos quantis é de no máximo um balde (``(fim - inicio) / baldes``).
+    """
+
+    __slots__ = ("inicio", "fim", "contagens", "_escala")
+
+    def __init__(self, inicio: float, fim: float, baldes: int = BALDES) -> None:
+        self.inicio = inicio
+        self.fim = fim
+        self.contagens = [0] * baldes
+        self._escala = baldes / (fim - inicio)
+
+    @property
+    def total(self) -> int:
+        """Quantidade de observações."""
+        return sum(self.contagens)
+
+    def atualizar(self, valor: float) -> None:
+        """Incorpora uma observação."""
+        indice = int((valor - self.inicio) * self._escala)
+        self.contagens[min(max(indice, 0), len(self.contagens) - 1)] += 1
+
+    def atualizar_lote(self, valores: np.ndarray) -> None:
+        """Incorpora um array de observações."""
+        valores = valores[~np.isnan(valores)]
+        indices = np.clip(((valores - self.inicio) * self._escala).astype(np.intp), 0, len(self.contagens) - 1)
+        for indice, contagem in enumerate(np.bincount(indices, minlength=len(self.contagens))):
+            self.contagens[indice] += int(contagem)
+
+    def combinar(self, outro: "EsbocoQuantis") -> None:
+        """Soma as contagens de ``outro`` (mesma faixa e número de baldes)."""
+        if (outro.inicio, outro.fim, len(outro.contagens)) != (self.inicio, self.fim, len(self.contagens)):
+            raise ValueError("Esboços com faixas ou baldes diferentes não podem ser combinados")
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+
+    def _bordas(self) -> np.ndarray:
+        return np.linspace(self.inicio, self.fim, len(self.contagens) + 1)
+
+    def quantis(self, qs: Sequence[float]) -> np.ndarray:
+        """Quantis por interpolação linear dentro dos baldes."""
+        acumulada = np.concatenate([[0.0], np.cumsum(self.contagens)])
+        if acumulada[-1] == 0:
+            return np.full(len(qs), np.nan)
+        return np.interp(np.asarray(qs) * acumulada[-1], acumulada, self._bordas())
+
+    def fracoes(self, cortes: Sequence[float]) -> np.ndarray:
+        """Fração das observações em cada intervalo definido por ``cortes``."""
+        acumulada = np.concatenate([[0.0], np.cumsum(self.contagens)])
+        if acumulada[-1] == 0:
+            return np.zeros(len(cortes) + 1)
+        cdf = np.interp(cortes, self._bordas(), acumulada / acumulada[-1])
+        return np.diff(np.concatenate([[0.0], cdf, [1.0]]))
+
+
+class EstatisticasFluxo:
+    """Estatísticas de uma população de pacientes (base ou fluxo atual).
+
+    Attributes:
+        momentos: ``Momentos`` por variável numérica.
+        esbocos: ``EsbocoQuantis`` por variável numérica.
+        categoricas: Contagem por nível de cada variável categórica.
+        classes: Contagem por classe (prevista no fluxo, real na base).
+    """
+
+    NUMERICAS: List[str] = NUMERIC_FEATURES + [BMI_COLUMN]
+    CATEGORICAS: List[str] = CATEGORICAL_FEATURES + ORDINAL_FEATURES
+
+    def __init__(self) -> None:
+        self.momentos = {coluna: Momentos() for coluna in self.NUMERICAS}
+        self.esbocos = {coluna: EsbocoQuantis(*FAIXAS[coluna]) for coluna in self.NUMERICAS}
+        self.categoricas: Dict[str, Counter] = {coluna: Counter() for coluna in self.CATEGORICAS}
+        self.classes: Counter = Counter()
+
+    @property
+    def n(self) -> int:
+        """Quantidade de pacientes observados."""
+        return sum(self.classes.values())
+
+    def atualizar(self, registro: Mapping[str, object], classe: str) -> None:
+        """Incorpora um paciente pontuado (O(1))."""
+        for coluna in self.NUMERICAS:
+            valor = float(registro[coluna])
+            if valor == valor:  # ignora NaN
+                self.momentos[coluna].atualizar(valor)
+                self.esbocos[coluna].atualizar(valor)
+        for coluna in self.CATEGORICAS:
+            self.categoricas[coluna][str(registro[coluna])] += 1
+        self.classes[str(classe)] += 1
+
+    def atualizar_lote(self, df: pd.DataFrame, classes: Sequence[object]) -> None:
+        """Incorpora um DataFrame de pacientes (vetorizado)."""
+        for coluna in self.NUMERICAS:
+            valores = df[coluna].to_numpy(dtype=float)
+            self.momentos[coluna].atualizar_lote(valores)
+            self.esbocos[coluna].atualizar_lote(valores)
+        for coluna in self.CATEGORICAS:
+            self.categoricas[coluna].update(df[coluna].astype(str).value_counts().to_dict())
+        self.classes.update(pd.Series(classes).astype(str).value_counts().to_dict())
+
+    def combinar(self, outra: "EstatisticasFluxo") -> None:
+        """Soma as estatísticas de ``outra`` a estas."""
+        for coluna in self.NUMERICAS:
+            self.momentos[coluna].combinar(outra.momentos[coluna])
+            self.esbocos[coluna].combinar(outra.esbocos[coluna])
+        for coluna in self.CATEGORICAS:
+            self.categoricas[coluna].update(outra.categoricas[coluna])
+        self.classes.update(outra.classes)
+
+    @classmethod
+    def do_dataset(cls, df: pd.DataFrame) -> "EstatisticasFluxo":
+        """Base a partir do dataset de treino (com BMI e target)."""
+        estatisticas = cls()
+        estatisticas.atualizar_lote(df, df[TARGET_COLUMN].to_numpy())
+        return estatisticas
+
+
+def psi(base: np.ndarray, atual: np.ndarray) -> float:
+    """Population stability index entre duas distribuições de frações."""
+    base = np.clip(np.asarray(base, dtype=float), EPSILON, None)
+    atual = np.clip(np.asarray(atual, dtype=float), EPSILON, None)
+    return float(np.sum((atual - base) * np.log(atual / base)))
+
+
+def _fracoes_contagem(contagem: Counter, niveis: List[str]) -> np.ndarray:
+    total = sum(contagem.values())
+    return np.array([contagem.get(nivel, 0) / total if total else 0.0 for nivel in niveis])
+
+
+def _status(valor: float, n: int) -> str:
+    if n < MINIMO_AMOSTRAS:
+        return "insuficiente"
+    if valor > PSI_ALTO:
+        return "alto"
+    if valor > PSI_MODERADO:
+        return "moderado"
+    return "estável"
+
+
+class MonitorDrift:
+    """Compara o fluxo de pacientes pontuados com a base de treino.
+
+    Attributes:
+        base: Estatísticas do dataset de treino.
+        atual: Estatísticas acumuladas desde a criação (ou ``reiniciar``).
+    """
+
+    def __init__(self, base: EstatisticasFluxo) -> None:
+        self.base = base
+        self.atual = EstatisticasFluxo()
+        self._lock = threading.Lock()
+        # Decis da base, fixos: definem os intervalos do PSI numérico
+        self._cortes = {coluna: base.esbocos[coluna].quantis(DECIS) for coluna in EstatisticasFluxo.NUMERICAS}
+        self._fracoes_base = {coluna: base.esbocos[coluna].fracoes(cortes) for coluna, cortes in self._cortes.items()}
+
+    def registrar(self, registro: Mapping[str, object], classe: str) -> None:
+        """Incorpora um paciente pontuado e sua classe prevista."""
+        with self._lock:
+            self.atual.atualizar(registro, classe)
+
+    def registrar_lote(self, df: pd.DataFrame, classes: Sequence[object]) -> None:
+        """Incorpora vários pacientes de uma vez (ex.: lidos da auditoria)."""
+        with self._lock:
+            self.atual.atualizar_lote(df, classes)
+
+    def reiniciar(self) -> None:
+        """Descarta o fluxo acumulado (a base é mantida)."""
+        with self._lock:
+            self.atual = EstatisticasFluxo()
+
+    def relatorio(self) -> List[Dict[str, object]]:
+        """Compara cada variável e a classe prevista com a base.
+
+        Returns:
+            Uma linha por variável com tipo, amostras, média da base e atual,
+            diferença padronizada das médias (numéricas), PSI e status
+            (``estável``, ``moderado``, ``alto`` ou ``insuficiente`` abaixo de
+            ``MINIMO_AMOSTRAS``).
+        """
+        with self._lock:
+            n = self.atual.n
+            linhas: List[Dict[str, object]] = []
+            for coluna in EstatisticasFluxo.NUMERICAS:
+                base, atual = self.base.momentos[coluna], self.atual.momentos[coluna]
+                valor = psi(self._fracoes_base[coluna], self.atual.esbocos[coluna].fracoes(self._cortes[coluna]))
+                linhas.append({
+                    "variavel": coluna,
+                    "tipo": "numérica",
+                    "amostras": atual.n,
+                    "media_base": base.media,
+                    "media_atual": atual.media if atual.n else None,
+                    "diferenca_padronizada": (atual.media - base.media) / base.desvio if atual.n and base.desvio else None,
+                    "psi": valor if atual.n else None,
+                    "status": _status(valor, atual.n),
+                })
+            for coluna in EstatisticasFluxo.CATEGORICAS:
+                niveis = sorted(set(self.base.categoricas[coluna]) | set(self.atual.categoricas[coluna]))
+                valor = psi(
+                    _fracoes_contagem(self.base.categoricas[coluna], niveis),
+                    _fracoes_contagem(self.atual.categoricas[coluna], niveis),
+                )
+                linhas.append({
+                    "variavel": coluna,
+                    "tipo": "categórica",
+                    "amostras": n,
+                    "psi": valor if n else None,
+                    "status": _status(valor, n),
+                })
+            niveis = sorted(set(self.base.classes) | set(self.atual.classes))
+            valor = psi(_fracoes_contagem(self.base.classes, niveis), _fracoes_contagem(self.atual.classes, niveis))
+            linhas.append({
+                "variavel": "classe_prevista",
+                "tipo": "classe",
+                "amostras": n,
+                "psi": valor if n else None,
+                "status": _status(valor, n),
+            })
+        return linhas
+
+
+def criar_monitor(caminho: Path) -> MonitorDrift:
+    """Cria o monitor com a base calculada do dataset de treino.
+
+    Args:
+        caminho: CSV do dataset (em precisão total, como no treino).
+
+    Returns:
+        Monitor com a base pronta e o fluxo atual vazio.
+    """
+    df = preprocessing_module.carregar_dados(caminho)
+    if BMI_COLUMN not in df:
+        df = preprocessing_module.criar_bmi(df)
+    return MonitorDrift(EstatisticasFluxo.do_dataset(df))
+
+
+__all__ = [
+    "EsbocoQuantis",
+    "EstatisticasFluxo",
+    "Momentos",
+    "MonitorDrift",
+    "criar_monitor",
+    "psi",
+]
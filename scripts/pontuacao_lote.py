@@ -0,0 +1,240 @@
+"""Pontuação em lote de arquivos de pacientes com o pipeline treinado.
+
+Lê um arquivo CSV ou Parquet com o mesmo esquema de ``Obesity.csv`` em
+blocos de tamanho fixo, calcula o BMI exatamente como ``criar_bmi`` e grava
+o rótulo previsto e as probabilidades de cada classe bloco a bloco. O uso
+de memória depende apenas do tamanho do bloco, não do tamanho do arquivo.
+Com ``--atribuicoes`` também grava a contribuição de cada variável para a
+classe prevista (``atribuicao_floresta.py``), na mesma passada pela floresta.
+
+Uso:
+    python scripts/pontuacao_lote.py entrada.csv saida.parquet --chunk-size 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from artefatos import ENCODER_PATH, MODEL_PATH, carregar_artefatos, carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+criar_bmi = preprocessing_module.criar_bmi
+
+FEATURES_ENTRADA: List[str] = NUMERIC_FEATURES + ORDINAL_FEATURES + CATEGORICAL_FEATURES
+PREDICTION_COLUMN = "Obesity_pred"
+PROBA_PREFIX = "proba_"
+CONTRIB_PREFIX = "contrib_"
+CHUNK_SIZE = 50_000
+
+
+@dataclass
+class ResumoPontuacao:
+    """Resumo de uma execução de pontuação em lote."""
+
+    linhas: int
+    blocos: int
+    segundos: float
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        """Vazão média da execução."""
+        return self.linhas / self.segundos if self.segundos > 0 else 0.0
+
+
+def _eh_parquet(caminho: Path) -> bool:
+    return caminho.suffix.lower() in {".parquet", ".pq"}
+
+
+def ler_blocos(caminho: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Itera sobre o arquivo de entrada em blocos de ``chunk_size`` linhas.
+
+    Args:
+        caminho: Arquivo CSV ou Parquet com o esquema de ``Obesity.csv``.
+        chunk_size: Quantidade máxima de linhas por bloco.
+
+    Yields:
+        DataFrames com no máximo ``chunk_size`` linhas.
+
+    Raises:
+        FileNotFoundError: Caso o caminho informado não exista.
+    """
+    if not caminho.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {caminho}")
+
+    if _eh_parquet(caminho):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for batch in arquivo.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # Numéricas como float64 para que todos os blocos tenham o mesmo tipo
+        dtypes = {coluna: "float64" for coluna in NUMERIC_FEATURES}
+        yield from pd.read_csv(caminho, chunksize=chunk_size, dtype=dtypes)
+
+
+def pontuar_dataframe(
+    modelo: object, encoder: object, df: pd.DataFrame, atribuidor: Optional[object] = None
+) -> pd.DataFrame:
+    """Pontua um bloco de pacientes.
+
+    Args:
+        modelo: Pipeline treinado (preprocessor + classificador).
+        encoder: LabelEncoder do target.
+        df: DataFrame com as features de entrada (BMI é recalculado).
+        atribuidor: ``AtribuidorFloresta`` do modelo; se informado, as
+            probabilidades vêm dele junto com as contribuições.
+
+    Returns:
+        DataFrame com as colunas originais, BMI, rótulo previsto, uma
+        coluna de probabilidade por classe e, com ``atribuidor``, uma coluna
+        de contribuição para a classe prevista por variável.
+
+    Raises:
+        ValueError: Caso faltem colunas obrigatórias na entrada.
+    """
+    faltantes = [coluna for coluna in FEATURES_ENTRADA if coluna not in df.columns]
+    if faltantes:
+        raise ValueError(f"Colunas ausentes na entrada: {faltantes}")
+
+    resultado = criar_bmi(df)
+    if atribuidor is not None:
+        probas, contribuicoes = atribuidor.contribuicoes_classe(resultado)
+    else:
+        probas = modelo.predict_proba(resultado)
+    # Equivalente a modelo.predict, sem percorrer a floresta duas vezes
+    classes = modelo.classes_.take(np.argmax(probas, axis=1))
+    resultado[PREDICTION_COLUMN] = encoder.inverse_transform(classes)
+
+    nomes = encoder.inverse_transform(modelo.classes_)
+    for indice, nome in enumerate(nomes):
+        resultado[f"{PROBA_PREFIX}{nome}"] = probas[:, indice]
+    if atribuidor is not None:
+        for indice, campo in enumerate(atribuidor.campos):
+            resultado[f"{CONTRIB_PREFIX}{campo}"] = contribuicoes[:, indice]
+    return resultado
+
+
+class _EscritorSaida:
+    """Grava blocos sucessivos em CSV ou Parquet sem reter dados em memória."""
+
+    def __init__(self, caminho: Path) -> None:
+        self.caminho = caminho
+        self._parquet = _eh_parquet(caminho)
+        self._writer = None
+        self._primeiro = True
+
+    def escrever(self, df: pd.DataFrame) -> None:
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.caminho, tabela.schema)
+            else:
+                tabela = tabela.cast(self._writer.schema)
+            self._writer.write_table(tabela)
+        else:
+            df.to_csv(
+                self.caminho,
+                mode="w" if self._primeiro else "a",
+                header=self._primeiro,
+                index=False,
+            )
+        self._primeiro = False
+
+    def fechar(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def pontuar_arquivo(
+    entrada: Path,
+    saida: Path,
+    chunk_size: int = CHUNK_SIZE,
+    model_path: Path = MODEL_PATH,
+    encoder_path: Path = ENCODER_PATH,
+    atribuicoes: bool = False,
+) -> ResumoPontuacao:
+    """Pontua um arquivo inteiro, bloco a bloco.
+
+    Os artefatos são carregados uma única vez e cada bloco é gravado na
+    saída assim que pontuado.
+
+    Args:
+        entrada: Arquivo CSV ou Parquet com o esquema de ``Obesity.csv``.
+        saida: Arquivo de saída (formato definido pela extensão).
+        chunk_size: Quantidade de linhas por bloco.
+        model_path: Caminho do pipeline serializado.
+        encoder_path: Caminho do LabelEncoder serializado.
+        atribuicoes: Grava também as contribuições por variável.
+
+    Returns:
+        Resumo com total de linhas, blocos e tempo decorrido.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size deve ser positivo")
+
+    modelo, encoder = carregar_artefatos(model_path, encoder_path)
+    atribuidor = None
+    if atribuicoes:
+        from atribuicao_floresta import AtribuidorFloresta
+
+        atribuidor = AtribuidorFloresta.de_modelo(modelo)
+    escritor = _EscritorSaida(saida)
+
+    linhas = 0
+    blocos = 0
+    inicio = time.perf_counter()
+    try:
+        for bloco in ler_blocos(entrada, chunk_size):
+            escritor.escrever(pontuar_dataframe(modelo, encoder, bloco, atribuidor))
+            linhas += len(bloco)
+            blocos += 1
+    finally:
+        escritor.fechar()
+
+    return ResumoPontuacao(linhas=linhas, blocos=blocos, segundos=time.perf_counter() - inicio)
+
+
+def main() -> None:
+    """Executa a pontuação em lote a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entrada", type=Path, help="Arquivo CSV ou Parquet de entrada")
+    parser.add_argument("saida", type=Path, help="Arquivo CSV ou Parquet de saída")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Linhas por bloco")
+    parser.add_argument("--modelo", type=Path, default=MODEL_PATH, help="Pipeline serializado")
+    parser.add_argument("--encoder", type=Path, default=ENCODER_PATH, help="LabelEncoder serializado")
+    parser.add_argument(
+        "--atribuicoes", action="store_true", help="Grava a contribuição de cada variável para a classe prevista"
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PONTUAÇÃO EM LOTE")
+    print("=" * 60)
+    print(f"     - Entrada: {args.entrada}")
+    print(f"     - Saída: {args.saida}")
+    print(f"     - Tamanho do bloco: {args.chunk_size}")
+    print(f"     - Atribuições: {'sim' if args.atribuicoes else 'não'}")
+
+    resumo = pontuar_arquivo(args.entrada, args.saida, args.chunk_size, args.modelo, args.encoder, args.atribuicoes)
+
+    print(f"\n     - Linhas pontuadas: {resumo.linhas} em {resumo.blocos} blocos")
+    print(f"     - Tempo total: {resumo.segundos:.2f} s")
+    print(f"     - Vazão: {resumo.linhas_por_segundo:,.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
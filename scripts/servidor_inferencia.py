@@ -0,0 +1,407 @@
+"""Servidor HTTP/JSON de inferência com micro-lotes dinâmicos.
+
+Expõe o modelo para outros sistemas sem passar pela interface Streamlit.
+Cada requisição traz um único paciente; as requisições concorrentes são
+agrupadas em micro-lotes (até ``max_lote`` pacientes ou ``max_espera_ms``
+após a chegada do primeiro) e avaliadas com uma única chamada vetorizada
+de ``predict_proba``. Usa apenas a biblioteca padrão (asyncio).
+
+Rotas:
+    POST /predict  - corpo JSON com os campos de ``Obesity.csv``
+    GET  /health   - verificação de disponibilidade
+    GET  /metricas - contadores de requisições e tamanho médio dos lotes
+    GET  /metrics  - histogramas e contadores no formato texto do Prometheus
+
+Uso:
+    python scripts/servidor_inferencia.py --porta 8000 --max-lote 64 --max-espera-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from artefatos import ENCODER_PATH, MODEL_PATH, carregar_modelo_compilado, carregar_preprocessing
+from instrumentacao import REGISTRO, contar, medir, observar
+
+preprocessing_module = carregar_preprocessing()
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+
+HOST = "127.0.0.1"
+PORTA = 8000
+MAX_LOTE = 64
+MAX_ESPERA_MS = 5.0
+TAMANHO_MAXIMO_CORPO = 64 * 1024
+LIMITES_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+ROTAS = {"/predict", "/health", "/metricas", "/metrics"}
+STATUS_HTTP = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class ErroRequisicao(ValueError):
+    """Erro de validação que deve ser devolvido ao cliente com status 400."""
+
+
+def validar_paciente(dados: object) -> Dict[str, object]:
+    """Valida e normaliza o corpo JSON de uma requisição.
+
+    Args:
+        dados: Objeto JSON decodificado.
+
+    Returns:
+        Dicionário com numéricos convertidos para float e categóricos como str.
+
+    Raises:
+        ErroRequisicao: Caso o corpo não seja um objeto, falte algum campo ou
+            um numérico não seja finito.
+    """
+    if not isinstance(dados, dict):
+        raise ErroRequisicao("O corpo deve ser um objeto JSON")
+
+    faltantes = [c for c in NUMERIC_FEATURES + ORDINAL_FEATURES + CATEGORICAL_FEATURES if c not in dados]
+    if faltantes:
+        raise ErroRequisicao(f"Campos ausentes: {faltantes}")
+
+    paciente: Dict[str, object] = {}
+    for coluna in NUMERIC_FEATURES:
+        try:
+            valor = float(dados[coluna])
+        except (TypeError, ValueError):
+            raise ErroRequisicao(f"Campo numérico inválido: {coluna}") from None
+        # NaN e ±Infinity passam pelo float() mas não são medidas válidas
+        if not math.isfinite(valor):
+            raise ErroRequisicao(f"Campo numérico inválido: {coluna}")
+        paciente[coluna] = valor
+    for coluna in ORDINAL_FEATURES + CATEGORICAL_FEATURES:
+        paciente[coluna] = str(dados[coluna])
+    return paciente
+
+
+class AgrupadorMicroLotes:
+    """Agrupa chamadas concorrentes em lotes avaliados de uma só vez.
+
+    Attributes:
+        max_lote: Quantidade máxima de pacientes por lote.
+        max_espera: Espera máxima (s) após o primeiro paciente do lote.
+        lotes: Quantidade de lotes executados.
+        itens: Quantidade de pacientes avaliados.
+    """
+
+    def __init__(
+        self,
+        funcao_lote: Callable[[List[Dict[str, object]]], List[dict]],
+        max_lote: int = MAX_LOTE,
+        max_espera_ms: float = MAX_ESPERA_MS,
+    ) -> None:
+        if max_lote <= 0:
+            raise ValueError("max_lote deve ser positivo")
+        self.funcao_lote = funcao_lote
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self.lotes = 0
+        self.itens = 0
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        # Um único worker: enquanto um lote roda, o próximo se acumula na fila
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-lote")
+
+    def iniciar(self) -> None:
+        """Cria a fila e a tarefa de agrupamento no loop corrente."""
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def parar(self) -> None:
+        """Cancela a tarefa de agrupamento e libera o executor."""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submeter(self, paciente: Dict[str, object]) -> dict:
+        """Enfileira um paciente e aguarda o resultado do seu lote."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((paciente, futuro))
+        return await futuro
+
+    async def _coletar(self) -> List[Tuple[Dict[str, object], asyncio.Future]]:
+        lote = [await self._fila.get()]
+        prazo = time.monotonic() + self.max_espera
+        while len(lote) < self.max_lote:
+            # Primeiro esvazia o que já está na fila, sem esperar
+            try:
+                lote.append(self._fila.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self._fila.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _executar(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._coletar()
+            pacientes = [paciente for paciente, _ in lote]
+            try:
+                resultados = await loop.run_in_executor(self._executor, self.funcao_lote, pacientes)
+            except Exception as erro:  # noqa: BLE001 - repassado a cada requisição do lote
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+                continue
+            self.lotes += 1
+            self.itens += len(lote)
+            observar("lote_tamanho", len(lote), limites=LIMITES_LOTE)
+            for (_, futuro), resultado in zip(lote, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+    def metricas(self) -> Dict[str, float]:
+        """Contadores de lotes e tamanho médio."""
+        return {
+            "lotes": self.lotes,
+            "itens": self.itens,
+            "tamanho_medio_lote": self.itens / self.lotes if self.lotes else 0.0,
+            "max_lote": self.max_lote,
+            "max_espera_ms": self.max_espera * 1000,
+        }
+
+
+def criar_funcao_lote(modelo: object, encoder: object) -> Callable[[List[Dict[str, object]]], List[dict]]:
+    """Cria a função que avalia um lote de pacientes com um único predict_proba.
+
+    Args:
+        modelo: Modelo compilado (aceita dicionário campo -> sequência).
+        encoder: LabelEncoder do target.
+
+    Returns:
+        Função que recebe uma lista de pacientes e devolve uma lista de
+        respostas JSON-serializáveis na mesma ordem.
+    """
+    nomes = list(encoder.inverse_transform(modelo.classes_))
+
+    def avaliar(pacientes: List[Dict[str, object]]) -> List[dict]:
+        with medir("servidor.montagem"):
+            colunas = {coluna: [paciente[coluna] for paciente in pacientes] for coluna in pacientes[0]}
+        with medir("servidor.predict_proba"):
+            probas = modelo.predict_proba(colunas)
+        indices = np.argmax(probas, axis=1)
+        return [
+            {
+                "classe": nomes[indice],
+                "probabilidades": dict(zip(nomes, linha.tolist())),
+            }
+            for indice, linha in zip(indices, probas)
+        ]
+
+    return avaliar
+
+
+class ServidorInferencia:
+    """Servidor HTTP/1.1 mínimo (com keep-alive) sobre asyncio."""
+
+    def __init__(self, agrupador: AgrupadorMicroLotes) -> None:
+        self.agrupador = agrupador
+        self.requisicoes = 0
+        self.erros = 0
+        self.inicio = time.monotonic()
+
+    async def iniciar(self, host: str = HOST, porta: int = PORTA) -> asyncio.AbstractServer:
+        """Inicia o agrupador e abre o socket de escuta."""
+        self.agrupador.iniciar()
+        return await asyncio.start_server(self._atender_conexao, host, porta)
+
+    async def _atender_conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                try:
+                    metodo, caminho, _ = linhas[0].split(" ", 2)
+                except ValueError:
+                    await self._responder(writer, 400, {"erro": "Requisição malformada"}, manter=False)
+                    break
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    if ":" in linha:
+                        nome, valor = linha.split(":", 1)
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length", 0) or 0)
+                except ValueError:
+                    tamanho = -1
+                if tamanho < 0:
+                    await self._responder(writer, 400, {"erro": "Content-Length inválido"}, manter=False)
+                    break
+                if tamanho > TAMANHO_MAXIMO_CORPO:
+                    await self._responder(writer, 413, {"erro": "Corpo muito grande"}, manter=False)
+                    break
+                try:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b""
+                except asyncio.IncompleteReadError:
+                    # O cliente encerrou o envio antes do fim do corpo
+                    await self._responder(writer, 400, {"erro": "Corpo incompleto"}, manter=False)
+                    break
+                manter = cabecalhos.get("connection", "").lower() != "close"
+
+                inicio = time.perf_counter()
+                try:
+                    status, resposta = await self._rotear(metodo, caminho, corpo)
+                except Exception as erro:  # noqa: BLE001 - qualquer falha vira 500, sem derrubar a conexão
+                    self.erros += 1
+                    status, resposta = 500, {"erro": f"Erro interno: {type(erro).__name__}"}
+                rota = caminho if caminho in ROTAS else "outra"
+                observar("etapa_duracao_segundos", time.perf_counter() - inicio, etapa="servidor.requisicao", rota=rota)
+                contar("requisicoes_total", rota=rota, status=status)
+                await self._responder(writer, status, resposta, manter)
+                if not manter:
+                    break
+        except ConnectionError:
+            # Conexão encerrada pelo cliente durante a leitura ou a resposta
+            pass
+        finally:
+            writer.close()
+
+    async def _rotear(self, metodo: str, caminho: str, corpo: bytes) -> Tuple[int, object]:
+        self.requisicoes += 1
+        if caminho == "/health":
+            return 200, {"status": "ok"}
+        if caminho == "/metrics":
+            return 200, REGISTRO.prometheus()
+        if caminho == "/metricas":
+            tempo = time.monotonic() - self.inicio
+            return 200, {
+                "requisicoes": self.requisicoes,
+                "erros": self.erros,
+                "requisicoes_por_segundo": self.requisicoes / tempo if tempo else 0.0,
+                **self.agrupador.metricas(),
+            }
+        if caminho != "/predict":
+            self.erros += 1
+            return 404, {"erro": f"Rota não encontrada: {caminho}"}
+        if metodo != "POST":
+            self.erros += 1
+            return 405, {"erro": "Use POST"}
+        try:
+            paciente = validar_paciente(json.loads(corpo or b"null"))
+        except ValueError as erro:
+            # ErroRequisicao, JSONDecodeError e UnicodeDecodeError são ValueError
+            self.erros += 1
+            return 400, {"erro": str(erro)}
+        except RecursionError:
+            self.erros += 1
+            return 400, {"erro": "JSON aninhado demais"}
+        try:
+            return 200, await self.agrupador.submeter(paciente)
+        except Exception as erro:  # noqa: BLE001 - falha do lote vira 500 para o cliente
+            self.erros += 1
+            return 500, {"erro": f"Falha na predição: {type(erro).__name__}"}
+
+    async def _responder(self, writer: asyncio.StreamWriter, status: int, corpo: object, manter: bool) -> None:
+        # Texto (exposição do Prometheus) vai como text/plain; o resto, JSON
+        if isinstance(corpo, str):
+            dados = corpo.encode("utf-8")
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+            tipo = "application/json; charset=utf-8"
+        cabecalho = (
+            f"HTTP/1.1 {status} {STATUS_HTTP.get(status, '')}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {len(dados)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+        ).encode("latin-1")
+        writer.write(cabecalho + dados)
+        await writer.drain()
+
+
+async def servir(
+    host: str = HOST,
+    porta: int = PORTA,
+    max_lote: int = MAX_LOTE,
+    max_espera_ms: float = MAX_ESPERA_MS,
+    model_path: Path = MODEL_PATH,
+    encoder_path: Path = ENCODER_PATH,
+    binario: Optional[bool] = None,
+) -> None:
+    """Carrega os artefatos uma única vez e atende requisições até ser interrompido."""
+    modelo, encoder = carregar_modelo_compilado(model_path, encoder_path, binario=binario)
+    agrupador = AgrupadorMicroLotes(criar_funcao_lote(modelo, encoder), max_lote, max_espera_ms)
+    servidor = ServidorInferencia(agrupador)
+    socket_servidor = await servidor.iniciar(host, porta)
+    print(f"     - Servindo em http://{host}:{porta} (max_lote={max_lote}, max_espera_ms={max_espera_ms})")
+    try:
+        async with socket_servidor:
+            await socket_servidor.serve_forever()
+    finally:
+        await agrupador.parar()
+
+
+def main() -> None:
+    """Inicia o servidor a partir da linha de comando."""
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de inferência com micro-lotes")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE, help="Pacientes por micro-lote")
+    parser.add_argument("--max-espera-ms", type=float, default=MAX_ESPERA_MS, help="Espera máxima para formar um lote")
+    parser.add_argument("--modelo", type=Path, default=MODEL_PATH, help="Pipeline serializado")
+    parser.add_argument("--encoder", type=Path, default=ENCODER_PATH, help="LabelEncoder serializado")
+    parser.add_argument(
+        "--binario",
+        action="store_true",
+        help="Serve modelo.bin (thresholds float32, folhas quantizadas) quando atual; "
+        "também via OBESIDADE_MODELO_BINARIO=1",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SERVIDOR DE INFERÊNCIA")
+    print("=" * 60)
+    try:
+        asyncio.run(
+            servir(
+                args.host,
+                args.porta,
+                args.max_lote,
+                args.max_espera_ms,
+                args.modelo,
+                args.encoder,
+                # Sem a flag, vale OBESIDADE_MODELO_BINARIO
+                binario=args.binario or None,
+            )
+        )
+    except KeyboardInterrupt:
+        print("\n     - Servidor encerrado")
+
+
+if __name__ == "__main__":
+    main()
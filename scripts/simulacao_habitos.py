@@ -0,0 +1,274 @@
+"""Simulação "e se" de mudanças de hábitos para um paciente.
+
+A partir do perfil diagnosticado, monta a grade completa (produto
+cartesiano) de perfis modificados nos eixos de hábito — mais atividade
+física (``FAF``), mais vegetais (``FCVC``), menos tempo em eletrônicos
+(``TUE``), menos beliscos (``CAEC``) e álcool (``CALC``) e um peso alvo em
+direção ao IMC normal — e pontua todas as variantes em uma única chamada
+vetorizada de ``predict_proba``. Em seguida seleciona as menores mudanças
+que aproximam a classe prevista de ``Normal_Weight``.
+
+Uma mudança é menor que outra quando altera menos variáveis e, empatando,
+quando a soma das variações normalizadas (fração da amplitude de cada eixo)
+é menor. Variantes que só acrescentam mudanças a uma sugestão já escolhida
+são descartadas.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from artefatos import carregar_preprocessing
+
+preprocessing_module = carregar_preprocessing()
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+ORDINAL_ORDER = preprocessing_module.ORDINAL_ORDER
+
+# Da menor para a maior classe de peso
+ORDEM_CLASSES = [
+    "Insufficient_Weight",
+    "Normal_Weight",
+    "Overweight_Level_I",
+    "Overweight_Level_II",
+    "Obesity_Type_I",
+    "Obesity_Type_II",
+    "Obesity_Type_III",
+]
+CLASSE_ALVO = "Normal_Weight"
+# IMC de referência para a direção do peso alvo (faixa normal: 18.5–24.9)
+IMC_REFERENCIA = 21.7
+VARIACOES_PESO = (0.05, 0.10, 0.15, 0.20)
+PASSO_ESCALAS = 0.5
+# Amplitude de cada eixo, usada para normalizar o tamanho das mudanças
+AMPLITUDES = {"FAF": 3.0, "FCVC": 2.0, "TUE": 2.0, "CAEC": 3.0, "CALC": 3.0}
+QUANTIDADE_SUGESTOES = 5
+MAXIMO_VARIANTES = 20_000
+ROTULOS = {
+    "FAF": "Atividade física semanal",
+    "FCVC": "Consumo de vegetais",
+    "TUE": "Tempo em eletrônicos",
+    "CAEC": "Consumo entre refeições",
+    "CALC": "Consumo de álcool",
+    "Weight": "Peso (kg)",
+}
+
+
+@dataclass
+class Sugestao:
+    """Conjunto de mudanças que melhora a classe prevista.
+
+    Attributes:
+        alteracoes: Variável -> (valor atual, valor simulado).
+        classe: Classe prevista com as mudanças.
+        probabilidade: Probabilidade dessa classe.
+        custo: Soma das variações normalizadas.
+    """
+
+    alteracoes: Dict[str, Tuple[object, object]]
+    classe: str
+    probabilidade: float
+    custo: float
+
+
+@dataclass
+class ResultadoSimulacao:
+    """Resultado de ``simular_habitos``.
+
+    Attributes:
+        classe_atual: Classe prevista para o perfil sem mudanças.
+        variantes: Perfis avaliados.
+        melhoram: Perfis cuja classe fica mais perto de ``CLASSE_ALVO``.
+        segundos: Tempo total (montagem da grade, predição e seleção).
+        sugestoes: Menores mudanças encontradas, da menor para a maior.
+        distribuicao: Quantidade de variantes por classe prevista.
+    """
+
+    classe_atual: str
+    variantes: int
+    melhoram: int
+    segundos: float
+    sugestoes: List[Sugestao] = field(default_factory=list)
+    distribuicao: Dict[str, int] = field(default_factory=dict)
+
+
+def _distancia_alvo(classes: np.ndarray) -> np.ndarray:
+    posicoes = {classe: indice for indice, classe in enumerate(ORDEM_CLASSES)}
+    alvo = posicoes[CLASSE_ALVO]
+    return np.abs(np.array([posicoes[classe] for classe in classes]) - alvo)
+
+
+def eixos_padrao(paciente: Mapping[str, object]) -> Dict[str, list]:
+    """Valores simulados de cada eixo, sempre incluindo o valor atual.
+
+    Só entram mudanças na direção saudável, em passos de ``PASSO_ESCALAS``
+    nas escalas: atividade física e vegetais maiores, eletrônicos, beliscos
+    e álcool menores, e peso em direção ao ``IMC_REFERENCIA``. No pior caso
+    a grade tem 7 × 5 × 5 × 4 × 4 × 5 = 14.000 variantes.
+    """
+    faf, fcvc, tue = float(paciente["FAF"]), float(paciente["FCVC"]), float(paciente["TUE"])
+    eixos = {
+        "FAF": [faf] + [v for v in np.arange(0.0, 3.0 + PASSO_ESCALAS, PASSO_ESCALAS) if v > faf],
+        "FCVC": [fcvc] + [v for v in np.arange(1.0, 3.0 + PASSO_ESCALAS, PASSO_ESCALAS) if v > fcvc],
+        "TUE": [tue] + [v for v in np.arange(2.0, -PASSO_ESCALAS, -PASSO_ESCALAS) if v < tue],
+    }
+    for coluna in ("CAEC", "CALC"):
+        atual = ORDINAL_ORDER.index(paciente[coluna])
+        eixos[coluna] = ORDINAL_ORDER[atual::-1]
+    peso = float(paciente["Weight"])
+    imc = peso / float(paciente["Height"]) ** 2
+    sinal = -1.0 if imc > IMC_REFERENCIA else 1.0
+    eixos["Weight"] = [peso] + [round(peso * (1 + sinal * v), 1) for v in VARIACOES_PESO]
+    return eixos
+
+
+def montar_grade(paciente: Mapping[str, object], eixos: Mapping[str, Sequence[object]]) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Monta o produto cartesiano dos eixos sobre o perfil do paciente.
+
+    Args:
+        paciente: Registro do paciente (campos do formulário).
+        eixos: Variável -> valores simulados; o primeiro é o valor atual.
+
+    Returns:
+        Tupla com o DataFrame das variantes (BMI recalculado) e a matriz
+        (n_variantes, n_eixos) dos índices de cada eixo; o índice 0 é o
+        valor atual.
+    """
+    tamanhos = [len(valores) for valores in eixos.values()]
+    indices = np.indices(tamanhos).reshape(len(tamanhos), -1).T
+    n_variantes = len(indices)
+
+    colunas: Dict[str, np.ndarray] = {}
+    for nome, valor in paciente.items():
+        if nome != BMI_COLUMN:
+            colunas[nome] = np.full(n_variantes, valor, dtype=object if isinstance(valor, str) else np.float64)
+    for posicao, (nome, valores) in enumerate(eixos.items()):
+        colunas[nome] = np.asarray(valores, dtype=object if isinstance(valores[0], str) else np.float64)[indices[:, posicao]]
+    colunas[BMI_COLUMN] = colunas["Weight"] / colunas["Height"] ** 2
+    return pd.DataFrame(colunas), indices
+
+
+def _variacoes(paciente: Mapping[str, object], eixos: Mapping[str, Sequence[object]]) -> List[np.ndarray]:
+    """Variação normalizada de cada valor de cada eixo em relação ao atual."""
+    variacoes = []
+    for nome, valores in eixos.items():
+        if nome == "Weight":
+            atual = float(paciente["Weight"])
+            variacoes.append(np.abs(np.asarray(valores, dtype=np.float64) - atual) / atual / max(VARIACOES_PESO))
+        elif isinstance(valores[0], str):
+            atual = ORDINAL_ORDER.index(paciente[nome])
+            variacoes.append(np.array([abs(ORDINAL_ORDER.index(v) - atual) for v in valores]) / AMPLITUDES[nome])
+        else:
+            variacoes.append(np.abs(np.asarray(valores, dtype=np.float64) - float(paciente[nome])) / AMPLITUDES[nome])
+    return variacoes
+
+
+def simular_habitos(
+    modelo: object,
+    encoder: object,
+    paciente: Mapping[str, object],
+    eixos: Optional[Mapping[str, Sequence[object]]] = None,
+    quantidade: int = QUANTIDADE_SUGESTOES,
+    maximo_variantes: int = MAXIMO_VARIANTES,
+) -> ResultadoSimulacao:
+    """Avalia a grade de mudanças de hábito e seleciona as menores que melhoram.
+
+    Args:
+        modelo: Modelo com ``predict_proba`` e ``classes_`` (pipeline sklearn
+            ou motor compilado).
+        encoder: LabelEncoder do target.
+        paciente: Registro do paciente (campos do formulário).
+        eixos: Valores simulados por variável (``eixos_padrao`` se None); o
+            primeiro valor de cada eixo deve ser o atual.
+        quantidade: Número máximo de sugestões.
+        maximo_variantes: Limite de tamanho da grade.
+
+    Returns:
+        ResultadoSimulacao com a classe atual e as sugestões.
+
+    Raises:
+        ValueError: Se a grade passar de ``maximo_variantes``.
+    """
+    inicio = time.perf_counter()
+    eixos = eixos_padrao(paciente) if eixos is None else eixos
+    n_variantes = int(np.prod([len(valores) for valores in eixos.values()]))
+    if n_variantes > maximo_variantes:
+        raise ValueError(f"Grade com {n_variantes} variantes excede o limite de {maximo_variantes}")
+
+    grade, indices = montar_grade(paciente, eixos)
+    # Uma única chamada para todas as variantes
+    probas = np.asarray(modelo.predict_proba(grade))
+    vencedoras = probas.argmax(axis=1)
+    nomes = encoder.inverse_transform(modelo.classes_)
+    classes = nomes[vencedoras]
+    probabilidades = probas[np.arange(n_variantes), vencedoras]
+
+    # A linha 0 da grade é o perfil sem mudanças
+    distancias = _distancia_alvo(classes)
+    candidatas = np.flatnonzero(distancias < distancias[0])
+
+    variacoes = _variacoes(paciente, eixos)
+    tamanhos = np.column_stack([variacao[indices[:, posicao]] for posicao, variacao in enumerate(variacoes)])
+    alteradas = indices != 0
+    ordem = np.lexsort((-probabilidades[candidatas], tamanhos[candidatas].sum(axis=1), alteradas[candidatas].sum(axis=1)))
+
+    nomes_eixos = list(eixos)
+    escolhidas: List[int] = []
+    for variante in candidatas[ordem]:
+        # Descarta quem contém uma sugestão escolhida com mudanças maiores ou iguais
+        if any(
+            np.all(~alteradas[e] | ((indices[variante] == indices[e]) | (alteradas[variante] & (tamanhos[variante] >= tamanhos[e]))))
+            for e in escolhidas
+        ):
+            continue
+        escolhidas.append(variante)
+        if len(escolhidas) == quantidade:
+            break
+
+    sugestoes = [
+        Sugestao(
+            alteracoes={
+                nome: (eixos[nome][0], eixos[nome][indice])
+                for nome, indice in zip(nomes_eixos, indices[variante])
+                if indice != 0
+            },
+            classe=str(classes[variante]),
+            probabilidade=float(probabilidades[variante]),
+            custo=float(tamanhos[variante].sum()),
+        )
+        for variante in escolhidas
+    ]
+    valores, contagens = np.unique(classes, return_counts=True)
+    return ResultadoSimulacao(
+        classe_atual=str(classes[0]),
+        variantes=n_variantes,
+        melhoram=len(candidatas),
+        segundos=time.perf_counter() - inicio,
+        sugestoes=sugestoes,
+        distribuicao=dict(zip(map(str, valores), map(int, contagens))),
+    )
+
+
+def descrever_alteracoes(sugestao: Sugestao) -> str:
+    """Texto curto das mudanças de uma sugestão (ex.: ``FAF: 1.0 → 2.0``)."""
+    partes = []
+    for nome, (atual, novo) in sugestao.alteracoes.items():
+        if isinstance(atual, str):
+            partes.append(f"{ROTULOS.get(nome, nome)}: {atual} → {novo}")
+        else:
+            partes.append(f"{ROTULOS.get(nome, nome)}: {float(atual):g} → {float(novo):g}")
+    return "; ".join(partes)
+
+
+__all__ = [
+    "ResultadoSimulacao",
+    "Sugestao",
+    "descrever_alteracoes",
+    "eixos_padrao",
+    "montar_grade",
+    "simular_habitos",
+]
@@ -0,0 +1,406 @@
+"""Treinamento out-of-core: o dataset é lido em blocos e nunca inteiro em memória.
+
+O arquivo (CSV ou Parquet com o esquema de ``Obesity.csv``) é percorrido
+duas vezes por ``ler_blocos``:
+
+1. **Varredura**: ajusta o ``StandardScaler`` com ``partial_fit`` e
+   descobre os níveis de cada variável categórica e as classes do target.
+2. **Embaralhamento**: cada bloco é transformado pelo pré-processador
+   montado na varredura, separa uma parte para teste e tem as linhas de
+   treino distribuídas entre baldes em disco (um arquivo binário temporário
+   por balde, com cerca de ``chunk_size`` linhas, aberto em modo append só
+   durante a escrita de cada bloco: no máximo um arquivo aberto por vez,
+   qualquer que seja a quantidade de baldes). Teste e balde vêm do hash de
+   64 bits de cada linha, embaralhado com a semente: cada balde é uma
+   amostra aleatória do arquivo inteiro, mesmo que ele esteja ordenado (por
+   classe, por clínica, por data). As linhas com chave abaixo de
+   ``test_size`` são candidatas ao teste e um reservatório guarda as
+   ``LINHAS_TESTE`` de menor chave do arquivo todo; as que saem do
+   reservatório voltam para o treino.
+
+Como linhas iguais têm o mesmo hash, duplicatas caem sempre no mesmo balde
+(ou juntas no teste) e são removidas dentro do bloco, do reservatório e de
+cada balde, mantendo só a primeira ocorrência como em ``carregar_dados``;
+nenhuma estrutura cresce com o tamanho do arquivo.
+
+Depois, cada balde treina uma sub-floresta com um número de árvores
+proporcional às suas linhas e as sub-florestas são unidas em um único
+``RandomForestClassifier``.
+
+O pico de memória depende do tamanho do bloco (mais o modelo e o conjunto
+de teste limitado a ``LINHAS_TESTE``), não do tamanho do arquivo. O pipeline resultante tem o mesmo formato do gerado por
+``3_training.py`` e pode ser salvo, compilado e exportado da mesma forma.
+"""
+
+from __future__ import annotations
+
+import copy
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.tree._tree import Tree
+
+from artefatos import carregar_preprocessing
+from pontuacao_lote import ler_blocos
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+NUMERIC_FEATURES = preprocessing_module.NUMERIC_FEATURES
+CATEGORICAL_FEATURES = preprocessing_module.CATEGORICAL_FEATURES
+ORDINAL_FEATURES = preprocessing_module.ORDINAL_FEATURES
+ORDINAL_ORDER = preprocessing_module.ORDINAL_ORDER
+criar_bmi = preprocessing_module.criar_bmi
+obter_preprocessor = preprocessing_module.obter_preprocessor
+
+CHUNK_SIZE = 200_000
+TEST_SIZE = 0.2
+LINHAS_TESTE = 100_000
+RANDOM_STATE = 42
+
+
+@dataclass
+class Varredura:
+    """Estatísticas coletadas na primeira passada sobre o arquivo.
+
+    Attributes:
+        escalador: ``StandardScaler`` ajustado com ``partial_fit``.
+        categorias: Níveis observados de cada variável categórica nominal.
+        classes: Classes do target, ordenadas.
+        colunas: Colunas de features na ordem do arquivo (com BMI).
+        linhas_lidas: Linhas do arquivo, com duplicatas.
+        blocos: Blocos lidos.
+        duplicatas: Linhas duplicadas descartadas (preenchido por
+            ``treinar_fora_da_memoria``).
+    """
+
+    escalador: StandardScaler
+    categorias: Dict[str, List[object]]
+    classes: List[object]
+    colunas: List[str]
+    linhas_lidas: int = 0
+    blocos: int = 0
+    duplicatas: int = 0
+
+    @property
+    def linhas(self) -> int:
+        """Total de linhas mantidas."""
+        return self.linhas_lidas - self.duplicatas
+
+
+def _com_bmi(bloco: pd.DataFrame) -> pd.DataFrame:
+    return bloco if BMI_COLUMN in bloco else criar_bmi(bloco)
+
+
+def varrer_dataset(caminho: Path, chunk_size: int = CHUNK_SIZE) -> Varredura:
+    """Primeira passada: escala, níveis categóricos e classes.
+
+    Args:
+        caminho: Arquivo CSV ou Parquet com o esquema de ``Obesity.csv``.
+        chunk_size: Linhas por bloco.
+
+    Returns:
+        ``Varredura`` com as estatísticas do arquivo.
+
+    Raises:
+        ValueError: Caso o arquivo não tenha linhas.
+    """
+    escalador = StandardScaler()
+    niveis: Dict[str, set] = {coluna: set() for coluna in CATEGORICAL_FEATURES}
+    classes: set = set()
+    colunas: Optional[List[str]] = None
+    linhas = blocos = 0
+
+    for bloco in ler_blocos(caminho, chunk_size):
+        linhas += len(bloco)
+        blocos += 1
+        bloco = _com_bmi(bloco)
+        if colunas is None:
+            colunas = [coluna for coluna in bloco.columns if coluna != TARGET_COLUMN]
+        escalador.partial_fit(bloco[NUMERIC_FEATURES + [BMI_COLUMN]])
+        for coluna in CATEGORICAL_FEATURES:
+            niveis[coluna].update(bloco[coluna].dropna().unique().tolist())
+        classes.update(bloco[TARGET_COLUMN].dropna().unique().tolist())
+
+    if colunas is None:
+        raise ValueError(f"Arquivo sem linhas: {caminho}")
+
+    return Varredura(
+        escalador=escalador,
+        categorias={coluna: sorted(valores) for coluna, valores in niveis.items()},
+        classes=sorted(classes),
+        colunas=colunas,
+        linhas_lidas=linhas,
+        blocos=blocos,
+    )
+
+
+def montar_preprocessor(varredura: Varredura) -> ColumnTransformer:
+    """Monta o ``ColumnTransformer`` ajustado a partir da varredura.
+
+    O transformer de ``obter_preprocessor`` é ajustado em um DataFrame
+    sintético com todos os níveis categóricos (o que define ``categories_``
+    como um ajuste sobre o arquivo inteiro) e o scaler é trocado pelo
+    ajustado incrementalmente.
+
+    Args:
+        varredura: Resultado de ``varrer_dataset``.
+
+    Returns:
+        ``ColumnTransformer`` pronto para ``transform``.
+    """
+    n = max(max(len(niveis) for niveis in varredura.categorias.values()), len(ORDINAL_ORDER))
+    sintetico = {}
+    for coluna in varredura.colunas:
+        if coluna in varredura.categorias:
+            niveis = varredura.categorias[coluna]
+            sintetico[coluna] = [niveis[i % len(niveis)] for i in range(n)]
+        elif coluna in ORDINAL_FEATURES:
+            sintetico[coluna] = [ORDINAL_ORDER[i % len(ORDINAL_ORDER)] for i in range(n)]
+        else:
+            sintetico[coluna] = np.zeros(n)
+
+    preprocessor = obter_preprocessor().fit(pd.DataFrame(sintetico, columns=varredura.colunas))
+    preprocessor.named_transformers_["numeric"].steps[-1] = ("scaler", varredura.escalador)
+    return preprocessor
+
+
+def distribuir_arvores(linhas_por_balde: List[int], n_estimators: int) -> List[int]:
+    """Divide as árvores entre os baldes proporcionalmente às linhas.
+
+    Usa o método dos maiores restos; todo balde com linhas recebe ao menos
+    uma árvore, então o total passa de ``n_estimators`` quando há mais
+    baldes que árvores.
+    """
+    linhas = np.asarray(linhas_por_balde, dtype=float)
+    cotas = linhas / linhas.sum() * n_estimators
+    arvores = np.floor(cotas).astype(int)
+    sobra = n_estimators - arvores.sum()
+    arvores[np.argsort(-(cotas - arvores), kind="stable")[:sobra]] += 1
+    arvores[(linhas > 0) & (arvores == 0)] = 1
+    return arvores.tolist()
+
+
+def expandir_classes(arvore: object, classes: np.ndarray, n_classes: int) -> object:
+    """Retorna a árvore com a distribuição das folhas sobre todas as classes.
+
+    Uma sub-floresta treinada em um balde sem alguma classe tem menos
+    colunas em ``predict_proba``; as ausentes recebem probabilidade zero.
+
+    Args:
+        arvore: ``DecisionTreeClassifier`` de uma sub-floresta.
+        classes: Classes globais (índices) correspondentes às colunas da árvore.
+        n_classes: Total de classes do modelo unido.
+
+    Returns:
+        Cópia da árvore com ``n_classes`` colunas.
+    """
+    if len(classes) == n_classes:
+        return arvore
+    estado = arvore.tree_.__getstate__()
+    valores = np.zeros((estado["node_count"], 1, n_classes), dtype=estado["values"].dtype)
+    valores[:, :, classes] = estado["values"]
+
+    tree = Tree(arvore.tree_.n_features, np.asarray([n_classes], dtype=np.intp), 1)
+    tree.__setstate__({**estado, "values": valores})
+    nova = copy.copy(arvore)
+    nova.tree_ = tree
+    nova.classes_ = np.arange(n_classes, dtype=float)
+    nova.n_classes_ = n_classes
+    return nova
+
+
+def unir_florestas(florestas: List[RandomForestClassifier], n_classes: int) -> RandomForestClassifier:
+    """Une sub-florestas em um único ``RandomForestClassifier``.
+
+    Args:
+        florestas: Sub-florestas treinadas sobre o target codificado.
+        n_classes: Total de classes do target.
+
+    Returns:
+        Floresta com todas as árvores e ``classes_ = 0..n_classes-1``.
+    """
+    arvores = [
+        expandir_classes(arvore, floresta.classes_, n_classes)
+        for floresta in florestas
+        for arvore in floresta.estimators_
+    ]
+    unida = copy.copy(florestas[0])
+    unida.estimators_ = arvores
+    unida.n_estimators = len(arvores)
+    unida.classes_ = np.arange(n_classes)
+    unida.n_classes_ = n_classes
+    return unida
+
+
+def _misturar(hashes: np.ndarray, semente: int) -> np.ndarray:
+    """Embaralha hashes de 64 bits com a semente (finalizador do splitmix64)."""
+    z = hashes + np.uint64(0x9E3779B97F4A7C15 * (semente + 1) % 2**64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _primeiras(hashes: np.ndarray) -> np.ndarray:
+    """Posições (em ordem) da primeira ocorrência de cada hash."""
+    _, primeiras = np.unique(hashes, return_index=True)
+    return np.sort(primeiras)
+
+
+def _atualizar_reservatorio(
+    reservatorio: Tuple[np.ndarray, ...],
+    candidatas: Tuple[np.ndarray, ...],
+    limite: int,
+    deduplicar: bool = True,
+) -> Tuple[Tuple[np.ndarray, ...], Tuple[np.ndarray, ...], int]:
+    """Mantém as ``limite`` linhas de menor chave entre reservatório e candidatas.
+
+    Args:
+        reservatorio: Tupla (chaves, hashes, X, y) das linhas de teste atuais.
+        candidatas: Tupla (chaves, hashes, X, y) das candidatas do bloco.
+        limite: Tamanho máximo do reservatório.
+        deduplicar: Se True, descarta candidatas já presentes no reservatório.
+
+    Returns:
+        Tupla com o novo reservatório, as linhas (hashes, X, y) que saíram
+        dele e a quantidade de duplicatas descartadas.
+    """
+    unidas = tuple(np.concatenate(partes) for partes in zip(reservatorio, candidatas))
+    duplicatas = 0
+    if deduplicar:
+        # O reservatório vem antes: a primeira ocorrência é a que fica
+        primeiras = _primeiras(unidas[1])
+        duplicatas = len(unidas[1]) - len(primeiras)
+        unidas = tuple(parte[primeiras] for parte in unidas)
+    chaves = unidas[0]
+    if len(chaves) <= limite:
+        return unidas, tuple(parte[:0] for parte in unidas[1:]), duplicatas
+    ordem = np.argpartition(chaves, limite)
+    ficam, saem = ordem[:limite], ordem[limite:]
+    return tuple(parte[ficam] for parte in unidas), tuple(parte[saem] for parte in unidas[1:]), duplicatas
+
+
+def treinar_fora_da_memoria(
+    caminho: Path,
+    parametros: Dict[str, object],
+    chunk_size: int = CHUNK_SIZE,
+    test_size: float = TEST_SIZE,
+    linhas_teste: int = LINHAS_TESTE,
+    random_state: int = RANDOM_STATE,
+    deduplicar: bool = True,
+) -> Tuple[Pipeline, LabelEncoder, np.ndarray, np.ndarray, Varredura]:
+    """Treina o pipeline lendo o arquivo em blocos.
+
+    Args:
+        caminho: Arquivo CSV ou Parquet com o esquema de ``Obesity.csv``.
+        parametros: Hiperparâmetros do ``RandomForestClassifier``
+            (``n_estimators`` é o total de árvores, dividido entre os blocos).
+        chunk_size: Linhas por bloco de leitura e, aproximadamente, por balde.
+        test_size: Fração das linhas separadas para teste.
+        linhas_teste: Máximo de linhas de teste mantidas em memória, sorteadas
+            uniformemente no arquivo todo.
+        random_state: Semente do split, dos baldes e das sub-florestas.
+        deduplicar: Se True, apenas a primeira ocorrência de cada linha é
+            usada, como em ``carregar_dados``.
+
+    Returns:
+        Tupla com o pipeline (preprocessor + floresta unida), o LabelEncoder,
+        as features de teste pré-processadas, o target de teste codificado e
+        a varredura (com as duplicatas descartadas).
+    """
+    varredura = varrer_dataset(caminho, chunk_size)
+    preprocessor = montar_preprocessor(varredura)
+    label_encoder = LabelEncoder().fit(varredura.classes)
+
+    n_baldes = max(1, -(-varredura.linhas_lidas // chunk_size))
+    reservatorio: Optional[Tuple[np.ndarray, ...]] = None
+    duplicatas = 0
+    florestas: List[RandomForestClassifier] = []
+    with tempfile.TemporaryDirectory(prefix="treino_blocos_") as temporario:
+        pasta = Path(temporario)
+        # Uma linha por registro: hash, target e features
+        registro: Optional[np.dtype] = None
+        for bloco in ler_blocos(caminho, chunk_size):
+            hashes = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+            if deduplicar:
+                primeiras = _primeiras(hashes)
+                duplicatas += len(hashes) - len(primeiras)
+                bloco, hashes = bloco.iloc[primeiras], hashes[primeiras]
+            bloco = _com_bmi(bloco)
+
+            X = np.ascontiguousarray(preprocessor.transform(bloco[varredura.colunas]), dtype=np.float64)
+            y = label_encoder.transform(bloco[TARGET_COLUMN]).astype(np.int64)
+            if registro is None:
+                registro = np.dtype([("hash", np.uint64), ("y", np.int64), ("X", np.float64, (X.shape[1],))])
+            # Chave de teste em [0, 1) derivada do hash: linhas iguais têm a mesma
+            chaves = (_misturar(hashes, random_state) >> np.uint64(11)) / 2.0**53
+            teste = chaves < test_size
+            if reservatorio is None:
+                reservatorio = (chaves[:0], hashes[:0], X[:0], y[:0])
+            reservatorio, (h_saem, X_saem, y_saem), repetidas = _atualizar_reservatorio(
+                reservatorio, (chaves[teste], hashes[teste], X[teste], y[teste]), linhas_teste, deduplicar
+            )
+            duplicatas += repetidas
+            h_treino = np.concatenate([hashes[~teste], h_saem])
+            X_treino = np.concatenate([X[~teste], X_saem])
+            y_treino = np.concatenate([y[~teste], y_saem])
+
+            baldes = _misturar(h_treino, random_state + 1) % np.uint64(n_baldes)
+            linhas = np.empty(len(y_treino), dtype=registro)
+            linhas["hash"], linhas["y"], linhas["X"] = h_treino, y_treino, X_treino
+            for b in np.unique(baldes):
+                with open(pasta / f"balde_{b}.bin", "ab") as arquivo:
+                    arquivo.write(linhas[baldes == b].tobytes())
+
+        # Duplicatas entre blocos caem no mesmo balde; só os hashes são lidos aqui
+        linhas_balde = []
+        for b in range(n_baldes):
+            arquivo = pasta / f"balde_{b}.bin"
+            if not arquivo.exists():
+                linhas_balde.append(0)
+                continue
+            hashes = np.array(np.memmap(arquivo, dtype=registro, mode="r")["hash"])
+            unicas = len(_primeiras(hashes)) if deduplicar else len(hashes)
+            duplicatas += len(hashes) - unicas
+            linhas_balde.append(unicas)
+
+        arvores_por_balde = distribuir_arvores(linhas_balde, parametros["n_estimators"])
+        for b in range(n_baldes):
+            if linhas_balde[b] == 0:
+                continue
+            linhas = np.fromfile(pasta / f"balde_{b}.bin", dtype=registro)
+            if deduplicar:
+                linhas = linhas[_primeiras(linhas["hash"])]
+            X, y = np.ascontiguousarray(linhas["X"]), linhas["y"]
+            del linhas
+            floresta = RandomForestClassifier(
+                **{**parametros, "n_estimators": arvores_por_balde[b]},
+                random_state=random_state + b,
+                n_jobs=-1,
+            )
+            florestas.append(floresta.fit(X, y))
+            del X, y
+
+    varredura.duplicatas = duplicatas
+    modelo = unir_florestas(florestas, len(label_encoder.classes_))
+    pipeline = Pipeline([("preprocessor", preprocessor), ("classifier", modelo)])
+    _, _, X_teste, y_teste = reservatorio
+    return pipeline, label_encoder, X_teste, y_teste, varredura
+
+
+__all__ = [
+    "Varredura",
+    "distribuir_arvores",
+    "montar_preprocessor",
+    "treinar_fora_da_memoria",
+    "unir_florestas",
+    "varrer_dataset",
+]
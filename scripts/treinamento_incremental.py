@@ -0,0 +1,254 @@
+"""Retreino incremental: cresce a floresta com registros novos.
+
+Em vez de refazer o treino completo, o modelo em produção é reaproveitado:
+
+1. os registros novos (arquivo com o esquema de ``Obesity.csv`` ou o
+   diretório da auditoria com um rótulo confirmado) são transformados pelo
+   pré-processador já ajustado, que fica congelado;
+2. uma parte é separada como holdout e o restante treina ``novas_arvores``
+   árvores com os mesmos hiperparâmetros da floresta atual;
+3. as árvores novas são acrescentadas ao final da floresta e, se pedido, as
+   ``aposentar`` árvores mais antigas (as primeiras) são removidas;
+4. modelo atual e atualizado são comparados no holdout.
+
+O custo depende só do volume de registros novos. Cada atualização é gravada
+como uma versão em ``modelos/<versao>/`` com uma entrada em
+``modelos/historico.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from artefatos import PROJECT_ROOT, carregar_preprocessing
+from treinamento_fora_memoria import unir_florestas
+
+preprocessing_module = carregar_preprocessing()
+TARGET_COLUMN = preprocessing_module.TARGET_COLUMN
+BMI_COLUMN = preprocessing_module.BMI_COLUMN
+
+MODELOS_DIR = PROJECT_ROOT / "modelos"
+HISTORICO = "historico.json"
+NOVAS_ARVORES = 20
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+# Queda máxima de acurácia no holdout aceita para promover a versão nova
+TOLERANCIA = 0.01
+
+
+@dataclass
+class ResultadoIncremental:
+    """Resumo de uma atualização incremental.
+
+    Attributes:
+        versao: Identificador da versão (carimbo UTC com microssegundos).
+        registros_treino: Registros novos usados nas árvores novas.
+        registros_holdout: Registros novos reservados para avaliação.
+        arvores_novas: Árvores acrescentadas.
+        arvores_aposentadas: Árvores mais antigas removidas.
+        arvores_total: Árvores do modelo atualizado.
+        acuracia_anterior: Acurácia do modelo atual no holdout.
+        acuracia_nova: Acurácia do modelo atualizado no holdout.
+        segundos: Tempo do treino e da avaliação.
+        promovido: Se a versão nova pode substituir o modelo em produção.
+    """
+
+    versao: str
+    registros_treino: int
+    registros_holdout: int
+    arvores_novas: int
+    arvores_aposentadas: int
+    arvores_total: int
+    acuracia_anterior: float
+    acuracia_nova: float
+    segundos: float
+    promovido: bool
+
+
+def carregar_registros(
+    caminho: Path, coluna_rotulo: str = TARGET_COLUMN, desde: Optional[datetime] = None
+) -> pd.DataFrame:
+    """Lê os registros novos com BMI e target.
+
+    Args:
+        caminho: Arquivo CSV/Parquet com o esquema de ``Obesity.csv`` ou
+            diretório da auditoria (``auditoria.py``).
+        coluna_rotulo: Na auditoria, coluna com o diagnóstico confirmado
+            (use ``predicao`` para treinar com os rótulos do próprio modelo).
+        desde: Na auditoria, só eventos a partir deste instante (UTC).
+
+    Returns:
+        DataFrame com as features, BMI e ``TARGET_COLUMN``.
+
+    Raises:
+        ValueError: Se não houver registros ou faltar a coluna de rótulo.
+    """
+    if caminho.is_dir():
+        from auditoria import como_dataset, ler_auditoria
+
+        eventos = ler_auditoria(caminho, desde)
+        if not eventos.empty and coluna_rotulo not in eventos:
+            raise ValueError(
+                f"A auditoria não tem a coluna de rótulo '{coluna_rotulo}'; junte o diagnóstico confirmado "
+                "aos eventos ou informe outra coluna"
+            )
+        df = como_dataset(eventos, coluna_rotulo) if not eventos.empty else eventos
+    else:
+        df = preprocessing_module.carregar_dados(caminho)
+    if df.empty:
+        raise ValueError(f"Nenhum registro novo em {caminho}")
+    if BMI_COLUMN not in df:
+        df = preprocessing_module.criar_bmi(df)
+    return df
+
+
+def _separar_holdout(
+    X: pd.DataFrame, y: np.ndarray, test_size: float, random_state: int
+) -> Tuple[pd.DataFrame, pd.DataFrame, np.ndarray, np.ndarray]:
+    # Estratifica quando todas as classes presentes têm ao menos dois registros
+    _, contagens = np.unique(y, return_counts=True)
+    estratificar = y if contagens.min() >= 2 and len(y) * test_size >= len(contagens) else None
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=estratificar)
+
+
+def crescer_floresta(
+    pipeline: Pipeline,
+    label_encoder: object,
+    df: pd.DataFrame,
+    novas_arvores: int = NOVAS_ARVORES,
+    aposentar: int = 0,
+    test_size: float = TEST_SIZE,
+    random_state: int = RANDOM_STATE,
+    tolerancia: float = TOLERANCIA,
+) -> Tuple[Pipeline, ResultadoIncremental]:
+    """Acrescenta árvores treinadas nos registros novos ao pipeline atual.
+
+    Args:
+        pipeline: Pipeline em produção (``preprocessor`` + ``classifier``).
+        label_encoder: LabelEncoder do target (não é reajustado).
+        df: Registros novos com BMI e ``TARGET_COLUMN``.
+        novas_arvores: Árvores a acrescentar.
+        aposentar: Árvores mais antigas a remover.
+        test_size: Fração dos registros novos reservada para o holdout.
+        random_state: Semente do holdout e das árvores novas.
+        tolerancia: Queda máxima de acurácia no holdout para promover.
+
+    Returns:
+        Tupla com o pipeline atualizado (o original não é alterado) e o
+        resumo da atualização.
+
+    Raises:
+        ValueError: Se houver classes desconhecidas pelo encoder ou se a
+            floresta ficar sem árvores.
+    """
+    inicio = time.perf_counter()
+    floresta = pipeline.named_steps["classifier"]
+    if aposentar >= len(floresta.estimators_) + novas_arvores:
+        raise ValueError("A floresta ficaria sem árvores")
+    desconhecidas = set(df[TARGET_COLUMN].unique()) - set(label_encoder.classes_)
+    if desconhecidas:
+        raise ValueError(f"Classes fora do encoder: {sorted(desconhecidas)}")
+
+    X = df.drop(columns=[TARGET_COLUMN])
+    y = label_encoder.transform(df[TARGET_COLUMN])
+    X_treino, X_holdout, y_treino, y_holdout = _separar_holdout(X, y, test_size, random_state)
+
+    # Pré-processador congelado: apenas transform
+    preprocessor = pipeline.named_steps["preprocessor"]
+    nova = clone(floresta).set_params(n_estimators=novas_arvores, random_state=random_state, oob_score=False)
+    nova.fit(preprocessor.transform(X_treino), y_treino)
+
+    unida = unir_florestas([floresta, nova], len(label_encoder.classes_))
+    unida.estimators_ = unida.estimators_[aposentar:]
+    unida.n_estimators = len(unida.estimators_)
+    for atributo in ("oob_score_", "oob_decision_function_"):
+        if hasattr(unida, atributo):
+            delattr(unida, atributo)
+    atualizado = Pipeline([("preprocessor", preprocessor), ("classifier", unida)])
+
+    X_holdout_t = preprocessor.transform(X_holdout)
+    acuracia_anterior = float(accuracy_score(y_holdout, floresta.predict(X_holdout_t)))
+    acuracia_nova = float(accuracy_score(y_holdout, unida.predict(X_holdout_t)))
+
+    resultado = ResultadoIncremental(
+        # Microssegundos: duas atualizações no mesmo segundo não dividem o diretório
+        versao=datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ"),
+        registros_treino=len(y_treino),
+        registros_holdout=len(y_holdout),
+        arvores_novas=novas_arvores,
+        arvores_aposentadas=aposentar,
+        arvores_total=unida.n_estimators,
+        acuracia_anterior=acuracia_anterior,
+        acuracia_nova=acuracia_nova,
+        segundos=time.perf_counter() - inicio,
+        promovido=acuracia_nova >= acuracia_anterior - tolerancia,
+    )
+    return atualizado, resultado
+
+
+def salvar_versao(
+    pipeline: Pipeline,
+    label_encoder: object,
+    resultado: ResultadoIncremental,
+    versao_base: str,
+    diretorio: Path = MODELOS_DIR,
+) -> Path:
+    """Grava a versão em ``diretorio/<versao>/`` e a registra no histórico.
+
+    Args:
+        pipeline: Pipeline atualizado.
+        label_encoder: LabelEncoder do target.
+        resultado: Resumo devolvido por ``crescer_floresta``.
+        versao_base: Identificação do modelo de origem (``identificar_modelo``).
+        diretorio: Diretório das versões.
+
+    Returns:
+        Diretório da versão gravada.
+
+    Raises:
+        FileExistsError: Caso a versão já exista em ``diretorio``.
+    """
+    from auditoria import identificar_modelo
+
+    destino = diretorio / resultado.versao
+    # Uma versão nunca sobrescreve outra
+    destino.mkdir(parents=True)
+    joblib.dump(pipeline, destino / "modelo.joblib")
+    joblib.dump(label_encoder, destino / "label_encoder.joblib")
+
+    historico_path = diretorio / HISTORICO
+    historico = json.loads(historico_path.read_text(encoding="utf-8")) if historico_path.exists() else []
+    historico.append(
+        {
+            **asdict(resultado),
+            # Mesmo identificador gravado na auditoria (versao_modelo)
+            "versao_modelo": identificar_modelo(destino / "modelo.joblib", destino / "label_encoder.joblib"),
+            "versao_base": versao_base,
+        }
+    )
+    temporario = historico_path.with_suffix(".tmp")
+    temporario.write_text(json.dumps(historico, indent=2, ensure_ascii=False), encoding="utf-8")
+    temporario.replace(historico_path)
+    return destino
+
+
+__all__ = [
+    "MODELOS_DIR",
+    "ResultadoIncremental",
+    "carregar_registros",
+    "crescer_floresta",
+    "salvar_versao",
+]